@@ -164,10 +164,8 @@ class AzureRMGalleries(AzureRMModuleBaseExt):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
-        resource_group = self.get_resource_group(self.resource_group)
-
         if 'location' not in self.body:
-            self.body['location'] = resource_group.location
+            self.body['location'] = self.get_resource_group_location(self.resource_group)
 
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -29,6 +29,32 @@ options:
     description:
       - Resource name
     type: str
+  depth:
+    description:
+      - How deep to walk the gallery tree.
+      - C(images) adds image definitions of every gallery, C(versions) also adds image versions of every image definition.
+      - Images and versions are listed concurrently.
+    type: str
+    default: galleries
+    choices:
+      - galleries
+      - images
+      - versions
+  older_than_days:
+    description:
+      - Only return image versions published more than this number of days ago.
+      - Used with I(depth=versions).
+    type: int
+  target_region:
+    description:
+      - Only return image versions replicated to this region.
+      - Used with I(depth=versions).
+    type: str
+  max_concurrency:
+    description:
+      - Maximum number of list requests sent at the same time.
+    type: int
+    default: 10
 extends_documentation_fragment:
   - azure
 author:
@@ -46,6 +72,11 @@ EXAMPLES = '''
   azure_rm_gallery_info:
     resource_group: myResourceGroup
     name: myGallery
+- name: Get image versions older than 30 days in all galleries of a resource group.
+  azure_rm_gallery_info:
+    resource_group: myResourceGroup
+    depth: versions
+    older_than_days: 30
 
 '''
 
@@ -92,12 +123,20 @@ galleries:
           - The current state of the gallery.
         type: str
         sample: "Succeeded"
+    images:
+      description:
+        - Image definitions of the gallery, in the same format as M(azure_rm_galleryimage_info) returns them.
+        - Every image definition contains I(versions), in the same format as M(azure_rm_galleryimageversion_info) returns them,
+          when I(depth=versions).
+      returned: when I(depth) is C(images) or C(versions)
+      type: list
 
 '''
 
 import time
 import json
-from ansible.module_utils.azure_rm_common import AzureRMModuleBase
+from datetime import datetime, timedelta
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 from ansible.module_utils.azure_rm_common_rest import GenericRestClient
 from copy import deepcopy
 try:
@@ -107,7 +146,7 @@ except Exception:
     pass
 
 
-class AzureRMGalleriesInfo(AzureRMModuleBase):
+class AzureRMGalleriesInfo(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
             resource_group=dict(
@@ -115,11 +154,30 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
             ),
             name=dict(
                 type='str'
+            ),
+            depth=dict(
+                type='str',
+                default='galleries',
+                choices=['galleries', 'images', 'versions']
+            ),
+            older_than_days=dict(
+                type='int'
+            ),
+            target_region=dict(
+                type='str'
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
             )
         )
 
         self.resource_group = None
         self.name = None
+        self.depth = None
+        self.older_than_days = None
+        self.target_region = None
+        self.max_concurrency = None
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -152,8 +210,60 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
         else:
             # self.results['galleries'] = [self.format_item(self.list())]
             self.results['galleries'] = self.list()
+
+        if self.depth != 'galleries':
+            galleries = self.results['galleries']
+            self.walk(galleries if isinstance(galleries, list) else [galleries])
         return self.results
 
+    def walk(self, galleries):
+        outcomes = self.run_concurrently(self.list_images, galleries, self.max_concurrency)
+        images = []
+        for gallery, (result, exc) in zip(galleries, outcomes):
+            if exc is not None:
+                self.fail('Error listing images of gallery {0}: {1}'.format(gallery['name'], str(exc)))
+            gallery['images'] = result
+            images.extend(result)
+
+        if self.depth != 'versions':
+            return
+
+        outcomes = self.run_concurrently(self.list_versions, images, self.max_concurrency)
+        for image, (result, exc) in zip(images, outcomes):
+            if exc is not None:
+                self.fail('Error listing versions of image {0}: {1}'.format(image['name'], str(exc)))
+            image['versions'] = result
+
+    def list_images(self, gallery):
+        items = self.mgmt_client.query_paged(gallery['id'] + '/images',
+                                             self.query_parameters,
+                                             self.header_parameters,
+                                             self.status_code)
+        return [self.format_image(x) for x in items]
+
+    def list_versions(self, image):
+        items = self.mgmt_client.query_paged(image['id'] + '/versions',
+                                             self.query_parameters,
+                                             self.header_parameters,
+                                             self.status_code)
+        return [self.format_version(x) for x in items if self.version_matches(x)]
+
+    def version_matches(self, item):
+        profile = item['properties'].get('publishingProfile', {})
+        if self.older_than_days is not None:
+            published = profile.get('publishedDate')
+            if not published:
+                return False
+            # publishedDate is UTC, e.g. 2019-10-01T12:34:56.1234567+00:00
+            published = datetime.strptime(published[:19], '%Y-%m-%dT%H:%M:%S')
+            if datetime.utcnow() - published < timedelta(days=self.older_than_days):
+                return False
+        if self.target_region is not None:
+            region = self.target_region.replace(' ', '').lower()
+            if not any(x['name'].replace(' ', '').lower() == region for x in profile.get('targetRegions', [])):
+                return False
+        return True
+
     def get(self):
         response = None
         results = {}
@@ -187,8 +297,6 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
         return self.format_item(results)
 
     def listbyresourcegroup(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -201,24 +309,17 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
         self.url = self.url.replace('{{ resource_group }}', self.resource_group)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def list(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -228,20 +329,15 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
         self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def format_item(self, item):
         d = {
@@ -254,6 +350,29 @@ class AzureRMGalleriesInfo(AzureRMModuleBase):
         }
         return d
 
+    def format_image(self, item):
+        d = {
+            'id': item['id'],
+            'name': item['name'],
+            'location': item['location'],
+            'tags': item.get('tags'),
+            'os_state': item['properties']['osState'],
+            'os_type': item['properties']['osType'],
+            'identifier': item['properties']['identifier']
+        }
+        return d
+
+    def format_version(self, item):
+        d = {
+            'id': item['id'],
+            'name': item['name'],
+            'location': item['location'],
+            'tags': item.get('tags'),
+            'publishing_profile': item['properties']['publishingProfile'],
+            'provisioning_state': item['properties']['provisioningState']
+        }
+        return d
+
 
 def main():
     AzureRMGalleriesInfo()
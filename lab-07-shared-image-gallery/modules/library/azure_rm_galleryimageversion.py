@@ -115,6 +115,23 @@ options:
             Specifies the storage account type to be used to store the image.
             This property is not updatable.
         type: str
+  required_regions:
+    description:
+      - Regions which must complete replication before the module returns.
+      - Replication to the other target regions continues in the background.
+      - If not specified, the module waits until replication to all target regions is done.
+    type: list
+  replication_timeout:
+    description:
+      - Maximum time in seconds to wait for replication.
+      - If not specified, the module waits until replication is done.
+    type: int
+  async_operation:
+    description:
+      - Return as soon as the create, update or delete operation was accepted by Azure instead of waiting for it to complete.
+      - The operation is recorded in a state file and can be tracked with M(azure_rm_asyncoperation).
+    type: bool
+    default: false
   state:
     description:
       - Assert the state of the GalleryImageVersion.
@@ -135,6 +152,24 @@ author:
 '''
 
 EXAMPLES = '''
+- name: Create gallery Image Version, return as soon as it's available in West US.
+  azure_rm_galleryimageversion:
+    resource_group: myResourceGroup
+    gallery_name: myGallery1283
+    gallery_image_name: myImage
+    name: 10.1.4
+    location: West US
+    publishing_profile:
+      target_regions:
+        - name: West US
+        - name: East US
+        - name: West Europe
+      managed_image:
+        name: myImage
+        resource_group: myResourceGroup
+    required_regions:
+      - West US
+
 - name: Create or update a simple gallery Image Version.
   azure_rm_galleryimageversion:
     resource_group: myResourceGroup
@@ -166,6 +201,60 @@ id:
   type: str
   sample: "/subscriptions/xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx/resourceGroups/myResourceGroup/providers/Microsoft.Compute/galleries/myGalle
            ry1283/images/myImage/versions/10.1.3"
+async_operation:
+  description:
+    - Operation started in asynchronous mode, pass I(id) to M(azure_rm_asyncoperation) to track it.
+  returned: when I(async_operation=true) and the resource was changed
+  type: complex
+  contains:
+    id:
+      description:
+        - Operation ID.
+      returned: always
+      type: str
+      sample: 3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f
+    state_file:
+      description:
+        - Path of the state file of the operation.
+      returned: always
+      type: str
+      sample: /home/user/.ansible/azure_async/3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f.json
+    status:
+      description:
+        - Operation status when the module returned.
+      returned: always
+      type: str
+      sample: InProgress
+replication:
+  description:
+    - Replication progress in every target region when the module returned.
+  returned: when image version was created or updated
+  type: complex
+  contains:
+    region:
+      description:
+        - Region name.
+      returned: always
+      type: str
+      sample: West US
+    state:
+      description:
+        - Replication state, C(Unknown), C(Replicating), C(Completed) or C(Failed).
+      returned: always
+      type: str
+      sample: Completed
+    progress:
+      description:
+        - Replication progress in percent.
+      returned: always
+      type: int
+      sample: 100
+    completed_after:
+      description:
+        - Time in seconds after which the replication to the region was seen completed.
+      returned: when replication to the region completed
+      type: float
+      sample: 754.1
 '''
 
 import time
@@ -181,10 +270,19 @@ except ImportError:
     pass
 
 
+MIN_POLL_INTERVAL = 15
+
+MAX_POLL_INTERVAL = 120
+
+
 class Actions:
     NoAction, Create, Update, Delete = range(4)
 
 
+def normalize_region(name):
+    return name.replace(' ', '').lower()
+
+
 class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
@@ -275,6 +373,16 @@ class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
                     )
                 )
             ),
+            required_regions=dict(
+                type='list'
+            ),
+            replication_timeout=dict(
+                type='int'
+            ),
+            async_operation=dict(
+                type='bool',
+                default=False
+            ),
             state=dict(
                 type='str',
                 default='present',
@@ -287,6 +395,10 @@ class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
         self.gallery_image_name = None
         self.name = None
         self.gallery_image_version = None
+        self.required_regions = None
+        self.replication_timeout = None
+
+        self.async_operation = None
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -320,10 +432,8 @@ class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
-        resource_group = self.get_resource_group(self.resource_group)
-
         if 'location' not in self.body:
-            self.body['location'] = resource_group.location
+            self.body['location'] = self.get_resource_group_location(self.resource_group)
 
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -412,20 +522,69 @@ class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
                                               self.header_parameters,
                                               self.body,
                                               self.status_code,
-                                              600,
+                                              0 if self.async_operation else 600,
                                               30)
         except CloudError as exc:
             self.log('Error attempting to create the GalleryImageVersion instance.')
             self.fail('Error creating the GalleryImageVersion instance: {0}'.format(str(exc)))
 
+        if self.async_operation:
+            self.results['async_operation'] = self.save_async_operation(response, self.url, 'PUT',
+                                                                        self.query_parameters['api-version'])
+
         try:
             response = json.loads(response.text)
         except Exception:
             response = {'text': response.text}
 
-        while response['properties']['provisioningState'] == 'Creating':
-            time.sleep(60)
-            response = self.get_resource()
+        if self.async_operation:
+            return response
+        return self.wait_for_replication(response)
+
+    def wait_for_replication(self, response):
+        '''
+        Wait until the image version is replicated to all target regions, or to required_regions only.
+        Polling is fast while replication progresses and backs off when nothing changes.
+        '''
+        start = time.time()
+        delay = MIN_POLL_INTERVAL
+        progress = {}
+        completed = {}
+        required = set(normalize_region(x) for x in self.required_regions or [])
+        query_parameters = dict(self.query_parameters)
+        query_parameters['$expand'] = 'ReplicationStatus'
+
+        while True:
+            changed = False
+            summary = response.get('properties', {}).get('replicationStatus', {}).get('summary', [])
+            for region in summary:
+                name = normalize_region(region.get('region', ''))
+                if region.get('state') == 'Failed':
+                    self.fail('Replication of the GalleryImageVersion instance to {0} failed: {1}'.format(region.get('region'),
+                                                                                                          region.get('details')))
+                if progress.get(name) != region.get('progress'):
+                    progress[name] = region.get('progress')
+                    changed = True
+                if region.get('state') == 'Completed' and name not in completed:
+                    completed[name] = time.time() - start
+                    self.log('Replication to {0} completed after {1:.0f}s'.format(region.get('region'), completed[name]))
+            self.results['replication'] = [dict(region=region.get('region'),
+                                                state=region.get('state'),
+                                                progress=region.get('progress'),
+                                                completed_after=completed.get(normalize_region(region.get('region', ''))))
+                                           for region in summary]
+
+            if response.get('properties', {}).get('provisioningState') not in ['Creating', 'Updating']:
+                break
+            if required and summary and required.issubset(completed):
+                self.log('Required regions replicated, others continue in the background')
+                break
+            if self.replication_timeout and time.time() - start > self.replication_timeout:
+                self.fail('Timed out waiting for replication of the GalleryImageVersion instance', **self.results)
+
+            delay = MIN_POLL_INTERVAL if changed else min(delay * 2, MAX_POLL_INTERVAL)
+            time.sleep(delay)
+            response = self.get_resource(query_parameters) or response
 
         return response
 
@@ -438,20 +597,24 @@ class AzureRMGalleryImageVersions(AzureRMModuleBaseExt):
                                               self.header_parameters,
                                               None,
                                               self.status_code,
-                                              600,
+                                              0 if self.async_operation else 600,
                                               30)
         except CloudError as e:
             self.log('Error attempting to delete the GalleryImageVersion instance.')
             self.fail('Error deleting the GalleryImageVersion instance: {0}'.format(str(e)))
+        if self.async_operation:
+            self.results['async_operation'] = self.save_async_operation(response, self.url, 'DELETE',
+                                                                        self.query_parameters['api-version'])
+
         return True
 
-    def get_resource(self):
+    def get_resource(self, query_parameters=None):
         # self.log('Checking if the GalleryImageVersion instance {0} is present'.format(self.))
         found = False
         try:
             response = self.mgmt_client.query(self.url,
                                               'GET',
-                                              self.query_parameters,
+                                              query_parameters or self.query_parameters,
                                               self.header_parameters,
                                               None,
                                               self.status_code,
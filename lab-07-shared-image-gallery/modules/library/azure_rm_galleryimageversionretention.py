@@ -0,0 +1,361 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_galleryimageversionretention
+version_added: '2.9'
+short_description: Delete old Azure SIG Image Versions according to a retention policy.
+description:
+  - 'Apply a retention policy to image versions of Azure Shared Image Gallery image definitions.'
+  - Versions not kept by any rule of the policy are deleted, several at the same time.
+options:
+  resource_group:
+    description:
+      - The name of the resource group.
+    required: true
+    type: str
+  gallery_name:
+    description:
+      - The name of the Shared Image Gallery.
+    required: true
+    type: str
+  gallery_image_name:
+    description:
+      - The name of the gallery Image Definition.
+      - If omitted, the policy is applied to every image definition in the gallery.
+    type: str
+  keep_last:
+    description:
+      - Keep this number of most recently published versions of every image definition.
+    type: int
+  keep_newer_than_days:
+    description:
+      - Keep versions published less than this number of days ago.
+    type: int
+  keep_in_use:
+    description:
+      - Keep versions referenced by a virtual machine scale set model in the subscription.
+      - A scale set referencing the image definition itself keeps the latest version of it.
+    type: bool
+    default: true
+  max_concurrency:
+    description:
+      - Maximum number of versions deleted at the same time.
+    type: int
+    default: 5
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Keep last 5 versions and anything published during last 30 days
+  azure_rm_galleryimageversionretention:
+    resource_group: myResourceGroup
+    gallery_name: myGallery
+    keep_last: 5
+    keep_newer_than_days: 30
+'''
+
+RETURN = '''
+deleted:
+  description:
+    - Deleted image versions.
+  returned: always
+  type: complex
+  contains:
+    id:
+      description:
+        - Resource Id of the version.
+      returned: always
+      type: str
+    image:
+      description:
+        - Name of the image definition.
+      returned: always
+      type: str
+      sample: myImage
+    name:
+      description:
+        - Name of the version.
+      returned: always
+      type: str
+      sample: 1.0.3
+    replicas:
+      description:
+        - Number of replicas of the version in all regions.
+      returned: always
+      type: int
+      sample: 4
+    elapsed:
+      description:
+        - Time in seconds the delete took.
+      returned: when deleted
+      type: float
+      sample: 41.7
+kept:
+  description:
+    - Number of kept versions.
+  returned: always
+  type: int
+  sample: 12
+reclaimed_replicas:
+  description:
+    - Total number of replicas of deleted versions.
+  returned: always
+  type: int
+  sample: 36
+elapsed:
+  description:
+    - Time in seconds all deletes took.
+  returned: always
+  type: float
+  sample: 95.2
+'''
+
+import time
+from datetime import datetime, timedelta
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+class AzureRMGalleryImageVersionRetention(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            gallery_name=dict(
+                type='str',
+                required=True
+            ),
+            gallery_image_name=dict(
+                type='str'
+            ),
+            keep_last=dict(
+                type='int'
+            ),
+            keep_newer_than_days=dict(
+                type='int'
+            ),
+            keep_in_use=dict(
+                type='bool',
+                default=True
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=5
+            )
+        )
+
+        self.resource_group = None
+        self.gallery_name = None
+        self.gallery_image_name = None
+        self.keep_last = None
+        self.keep_newer_than_days = None
+        self.keep_in_use = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.url = None
+        self.status_code = [200, 201, 202, 204]
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2019-07-01'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMGalleryImageVersionRetention, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                                  supports_check_mode=True,
+                                                                  supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        if self.keep_last is None and self.keep_newer_than_days is None:
+            self.fail("Parameter error: at least one of keep_last or keep_newer_than_days is required.")
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        self.url = ('/subscriptions' +
+                    '/{{ subscription_id }}' +
+                    '/resourceGroups' +
+                    '/{{ resource_group }}' +
+                    '/providers' +
+                    '/Microsoft.Compute' +
+                    '/galleries' +
+                    '/{{ gallery_name }}' +
+                    '/images')
+        self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
+        self.url = self.url.replace('{{ resource_group }}', self.resource_group)
+        self.url = self.url.replace('{{ gallery_name }}', self.gallery_name)
+
+        if self.gallery_image_name is not None:
+            images = [self.gallery_image_name]
+        else:
+            try:
+                images = [x['name'] for x in self.list(self.url)]
+            except CloudError as exc:
+                self.fail("Error listing images of gallery {0} - {1}".format(self.gallery_name, str(exc)))
+
+        outcomes = self.run_concurrently(lambda image: self.list(self.url + '/' + image + '/versions'), images, self.max_concurrency)
+        in_use = self.list_referenced_images() if self.keep_in_use else set()
+
+        to_delete = []
+        kept = 0
+        for image, (versions, exc) in zip(images, outcomes):
+            if exc is not None:
+                self.fail("Error listing versions of image {0} - {1}".format(image, str(exc)))
+            selected = self.select_versions(image, versions, in_use)
+            for version in selected:
+                to_delete.append(dict(id=version['id'],
+                                      image=image,
+                                      name=version['name'],
+                                      replicas=self.count_replicas(version)))
+            kept += len(versions) - len(selected)
+
+        self.results['deleted'] = to_delete
+        self.results['kept'] = kept
+        self.results['reclaimed_replicas'] = sum(x['replicas'] for x in to_delete)
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(to_delete) > 0
+
+        if self.check_mode or not to_delete:
+            return self.results
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.delete_version, to_delete, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for version, (elapsed, exc) in zip(to_delete, outcomes):
+            if exc is not None:
+                version['error'] = str(exc)
+                failed.append('{0}/{1}'.format(version['image'], version['name']))
+            else:
+                version['elapsed'] = elapsed
+
+        if failed:
+            self.fail("Error deleting image versions {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def select_versions(self, image, versions, in_use):
+        '''
+        Return versions of an image definition which are not kept by any rule of the policy.
+        '''
+        # most recently published first
+        versions = sorted(versions, key=lambda x: (self.get_published_date(x) or datetime.min,
+                                                   [int(p) for p in x['name'].split('.') if p.isdigit()]),
+                          reverse=True)
+        image_id = self.url.lower() + '/' + image.lower()
+
+        delete = []
+        for index, version in enumerate(versions):
+            if self.keep_last is not None and index < self.keep_last:
+                continue
+            published = self.get_published_date(version)
+            if (self.keep_newer_than_days is not None and
+                    (published is None or datetime.utcnow() - published < timedelta(days=self.keep_newer_than_days))):
+                continue
+            if version['id'].lower() in in_use:
+                continue
+            if index == 0 and image_id in in_use:
+                # scale sets using the image definition run its latest version
+                continue
+            delete.append(version)
+        return delete
+
+    def get_published_date(self, version):
+        published = version['properties'].get('publishingProfile', {}).get('publishedDate')
+        if not published:
+            return None
+        # publishedDate is UTC, e.g. 2019-10-01T12:34:56.1234567+00:00
+        return datetime.strptime(published[:19], '%Y-%m-%dT%H:%M:%S')
+
+    def count_replicas(self, version):
+        profile = version['properties'].get('publishingProfile', {})
+        default = profile.get('replicaCount', 1)
+        return sum(x.get('regionalReplicaCount', default) for x in profile.get('targetRegions', []))
+
+    def list_referenced_images(self):
+        '''
+        Return lower case ids of images referenced by scale set models in the subscription.
+        '''
+        url = '/subscriptions/' + self.subscription_id + '/providers/Microsoft.Compute/virtualMachineScaleSets'
+        try:
+            scale_sets = self.list(url)
+        except CloudError as exc:
+            self.fail("Error listing virtual machine scale sets - {0}".format(str(exc)))
+        referenced = set()
+        for vmss in scale_sets:
+            profile = vmss['properties'].get('virtualMachineProfile', {})
+            image_id = profile.get('storageProfile', {}).get('imageReference', {}).get('id')
+            if image_id:
+                referenced.add(image_id.lower())
+        return referenced
+
+    def list(self, url):
+        return self.mgmt_client.query_paged(url,
+                                            self.query_parameters,
+                                            self.header_parameters,
+                                            [200])
+
+    def delete_version(self, version):
+        start = time.time()
+        self.mgmt_client.query(version['id'],
+                               'DELETE',
+                               self.query_parameters,
+                               self.header_parameters,
+                               None,
+                               self.status_code,
+                               600,
+                               30)
+
+        # the version stays visible for some time after the delete operation completed
+        while True:
+            try:
+                self.mgmt_client.query(version['id'],
+                                       'GET',
+                                       self.query_parameters,
+                                       self.header_parameters,
+                                       None,
+                                       [200],
+                                       0,
+                                       0)
+            except CloudError:
+                break
+            time.sleep(20)
+        return time.time() - start
+
+
+def main():
+    AzureRMGalleryImageVersionRetention()
+
+
+if __name__ == '__main__':
+    main()
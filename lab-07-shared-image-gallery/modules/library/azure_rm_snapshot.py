@@ -68,16 +68,54 @@ options:
       create_option:
         description:
           - This enumerates the possible sources of a disk's creation.
+          - Use C(Copy) to snapshot a managed disk or copy a snapshot given by I(source_resource_id).
+          - Use C(CopyStart) to copy an incremental snapshot to another region.
         type: str
         default: Import
         choices:
           - Import
+          - Copy
+          - CopyStart
       source_uri:
         description:
           - >-
             If createOption is Import, this is the URI of a blob to be imported
             into a managed disk.
         type: str
+      source_resource_id:
+        description:
+          - >-
+            If createOption is Copy or CopyStart, this is the ARM id of the source
+            managed disk or snapshot.
+        type: str
+  incremental:
+    description:
+      - >-
+        Create an incremental snapshot, which only stores changes since the last
+        snapshot of the same disk.
+      - Can't be changed after the snapshot has been created.
+    type: bool
+  chain_name:
+    description:
+      - Name of a snapshot chain the new snapshot is added to.
+      - Snapshots of the chain in I(resource_group) are tagged with their sequence number and parent snapshot.
+    type: str
+  retention:
+    description:
+      - Maximum number of snapshots kept in the chain given by I(chain_name).
+      - Oldest snapshots of the chain and their copies in other regions are deleted.
+    type: int
+  target_locations:
+    description:
+      - Regions the snapshot is copied to, copies are named <name>-<location>.
+      - Only supported for incremental snapshots, only changes since the previous copy are transferred.
+    type: list
+  async_operation:
+    description:
+      - Return as soon as the create, update or delete operation was accepted by Azure instead of waiting for it to complete.
+      - The operation is recorded in a state file and can be tracked with M(azure_rm_asyncoperation).
+    type: bool
+    default: false
   state:
     description:
       - Assert the state of the Snapshot.
@@ -106,6 +144,20 @@ EXAMPLES = '''
     creation_data:
       create_option: Import
       source_uri: 'https://mystorageaccount.blob.core.windows.net/osimages/osimage.vhd'
+
+- name: Add a nightly incremental snapshot of a managed disk to a chain, keep a week and copy it to a second region.
+  azure_rm_snapshot:
+    resource_group: myResourceGroup
+    name: "myDisk-{{ ansible_date_time.date }}"
+    location: eastus
+    incremental: yes
+    creation_data:
+      create_option: Copy
+      source_resource_id: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Compute/disks/myDisk
+    chain_name: myDisk
+    retention: 7
+    target_locations:
+      - westus
 '''
 
 RETURN = '''
@@ -115,6 +167,89 @@ id:
   returned: always
   type: str
   sample: /subscriptions/xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxxx/resourceGroups/myResourceGroup/providers/Microsoft.Compute/snapshots/mySnapshot
+chain:
+  description:
+    - Snapshot chain the snapshot was added to.
+  returned: when I(chain_name) is specified
+  type: complex
+  contains:
+    name:
+      description:
+        - Name of the chain.
+      returned: always
+      type: str
+      sample: myDisk
+    sequence:
+      description:
+        - Sequence number of the snapshot in the chain.
+      returned: when snapshot was created
+      type: int
+      sample: 12
+    parent:
+      description:
+        - Name of the previous snapshot in the chain.
+      returned: when snapshot was created
+      type: str
+      sample: myDisk-2019-10-01
+    pruned:
+      description:
+        - Names of snapshots deleted because of I(retention).
+      returned: always
+      type: list
+      sample: ["myDisk-2019-09-24"]
+copies:
+  description:
+    - Copies of the snapshot in I(target_locations).
+  returned: when I(target_locations) is specified
+  type: complex
+  contains:
+    location:
+      description:
+        - Region of the copy.
+      returned: always
+      type: str
+      sample: westus
+    id:
+      description:
+        - Resource Id of the copy.
+      returned: always
+      type: str
+    status:
+      description:
+        - C(Created) or C(Exists).
+      returned: always
+      type: str
+      sample: Created
+    completion_percent:
+      description:
+        - Progress of the background copy.
+      returned: when available
+      type: float
+      sample: 100.0
+async_operation:
+  description:
+    - Operation started in asynchronous mode, pass I(id) to M(azure_rm_asyncoperation) to track it.
+  returned: when I(async_operation=true) and the resource was changed
+  type: complex
+  contains:
+    id:
+      description:
+        - Operation ID.
+      returned: always
+      type: str
+      sample: 3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f
+    state_file:
+      description:
+        - Path of the state file of the operation.
+      returned: always
+      type: str
+      sample: /home/user/.ansible/azure_async/3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f.json
+    status:
+      description:
+        - Operation status when the module returned.
+      returned: always
+      type: str
+      sample: InProgress
 '''
 
 import time
@@ -182,15 +317,39 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
                     create_option=dict(
                         type='str',
                         disposition='createOption',
-                        choices=['Import'],
+                        choices=['Import',
+                                 'Copy',
+                                 'CopyStart'],
                         default='Import'
                     ),
                     source_uri=dict(
                         type='str',
                         disposition='sourceUri'
+                    ),
+                    source_resource_id=dict(
+                        type='str',
+                        disposition='sourceResourceId'
                     )
                 )
             ),
+            incremental=dict(
+                type='bool',
+                updatable=False,
+                disposition='/properties/incremental'
+            ),
+            chain_name=dict(
+                type='str'
+            ),
+            retention=dict(
+                type='int'
+            ),
+            target_locations=dict(
+                type='list'
+            ),
+            async_operation=dict(
+                type='bool',
+                default=False
+            ),
             state=dict(
                 type='str',
                 default='present',
@@ -205,6 +364,11 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
         self.type = None
         self.managed_by = None
 
+        self.chain_name = None
+        self.retention = None
+        self.target_locations = None
+        self.async_operation = None
+
         self.results = dict(changed=False)
         self.mgmt_client = None
         self.state = None
@@ -214,7 +378,7 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
 
         self.body = {}
         self.query_parameters = {}
-        self.query_parameters['api-version'] = '2018-09-30'
+        self.query_parameters['api-version'] = '2022-03-02'
         self.header_parameters = {}
         self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
 
@@ -237,10 +401,8 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
-        resource_group = self.get_resource_group(self.resource_group)
-
         if 'location' not in self.body:
-            self.body['location'] = resource_group.location
+            self.body['location'] = self.get_resource_group_location(self.resource_group)
 
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -277,6 +439,23 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
                 if not self.default_compare(modifiers, self.body, old_response, '', self.results):
                     self.to_do = Actions.Update
 
+        if self.retention is not None and self.retention < 1:
+            self.fail('Parameter error: retention must be greater than 0.')
+
+        if self.target_locations and self.state == 'present':
+            if not self.body.get('properties', {}).get('incremental'):
+                self.fail('Parameter error: target_locations require incremental snapshot.')
+            if self.async_operation:
+                self.fail('Parameter error: target_locations are not supported with async_operation.')
+
+        if self.chain_name and self.to_do == Actions.Create:
+            self.add_to_chain()
+        elif self.to_do == Actions.Update:
+            # PUT replaces all tags, keep the snapshot in its chain
+            chain_tags = dict((k, v) for k, v in (old_response.get('tags') or {}).items() if k.startswith('_chain_'))
+            if chain_tags:
+                self.body['tags'] = dict(chain_tags, **(self.body.get('tags') or {}))
+
         if (self.to_do == Actions.Create) or (self.to_do == Actions.Update):
             self.log('Need to Create / Update the Snapshot instance')
 
@@ -297,7 +476,7 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
 
             # make sure instance is actually deleted, for some Azure resources, instance is hanging around
             # for some time after deletion -- this should be really fixed in Azure
-            while self.get_resource():
+            while not self.async_operation and self.get_resource():
                 time.sleep(20)
         else:
             self.log('Snapshot instance unchanged')
@@ -307,8 +486,143 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
         if response:
             self.results["id"] = response["id"]
 
+        if self.state == 'present' and not self.check_mode:
+            if self.target_locations:
+                self.copy_to_locations(self.results.get("id", self.url))
+            if self.chain_name and self.retention:
+                self.prune_chain()
+
         return self.results
 
+    def add_to_chain(self):
+        '''
+        Tag the new snapshot with its position in the chain.
+        '''
+        links = self.list_chain()
+        parent = links[-1] if links else None
+        sequence = int(parent['tags']['_chain_sequence_']) + 1 if parent else 1
+
+        tags = self.body.setdefault('tags', {})
+        tags['_chain_'] = self.chain_name
+        tags['_chain_sequence_'] = str(sequence)
+        if parent:
+            tags['_chain_parent_'] = parent['name']
+
+        self.results['chain'] = dict(name=self.chain_name,
+                                     sequence=sequence,
+                                     parent=parent['name'] if parent else None,
+                                     pruned=[])
+
+    def list_chain(self):
+        '''
+        List snapshots of the chain in the resource group, oldest first. Copies in other regions are not included.
+        '''
+        links = []
+        for snapshot in self.list_snapshots():
+            tags = snapshot.get('tags') or {}
+            if tags.get('_chain_') == self.chain_name and '_chain_copy_of_' not in tags and '_chain_sequence_' in tags:
+                links.append(snapshot)
+        return sorted(links, key=lambda x: int(x['tags']['_chain_sequence_']))
+
+    def list_snapshots(self):
+        try:
+            return self.mgmt_client.query_paged(self.url.rsplit('/', 1)[0],
+                                                self.query_parameters,
+                                                self.header_parameters,
+                                                [200])
+        except CloudError as exc:
+            self.fail('Error listing Snapshot instances: {0}'.format(str(exc)))
+
+    def prune_chain(self):
+        '''
+        Delete oldest snapshots of the chain, with their copies, above the retention limit.
+        '''
+        links = self.list_chain()
+        pruned = [x['name'] for x in links[:max(0, len(links) - self.retention)]]
+        if not pruned:
+            return
+
+        ids = []
+        for snapshot in self.list_snapshots():
+            tags = snapshot.get('tags') or {}
+            if snapshot['name'] in pruned or tags.get('_chain_copy_of_') in pruned:
+                ids.append(snapshot['id'])
+
+        outcomes = self.run_concurrently(self.delete_snapshot, ids)
+        for id, (result, exc) in zip(ids, outcomes):
+            if exc is not None:
+                self.fail('Error deleting the Snapshot instance {0}: {1}'.format(id, str(exc)))
+
+        self.results['changed'] = True
+        self.results.setdefault('chain', dict(name=self.chain_name))['pruned'] = pruned
+
+    def delete_snapshot(self, id):
+        return self.mgmt_client.query(url=id,
+                                      method='DELETE',
+                                      query_parameters=self.query_parameters,
+                                      header_parameters=self.header_parameters,
+                                      body=None,
+                                      expected_status_codes=self.status_code,
+                                      polling_timeout=600,
+                                      polling_interval=30)
+
+    def copy_to_locations(self, source_id):
+        '''
+        Copy the snapshot to all target locations at the same time. As the snapshot is incremental,
+        Azure only transfers changes since the copy of the previous snapshot.
+        '''
+        outcomes = self.run_concurrently(lambda location: self.copy_snapshot(source_id, location), self.target_locations)
+        copies = []
+        for location, (copy, exc) in zip(self.target_locations, outcomes):
+            if exc is not None:
+                self.fail('Error copying the Snapshot instance to {0}: {1}'.format(location, str(exc)), copies=copies)
+            copies.append(copy)
+            if copy['status'] == 'Created':
+                self.results['changed'] = True
+        self.results['copies'] = copies
+
+    def copy_snapshot(self, source_id, location):
+        name = '{0}-{1}'.format(self.name, location.replace(' ', '').lower())
+        url = self.url.rsplit('/', 1)[0] + '/' + name
+
+        try:
+            response = self.mgmt_client.query(url=url,
+                                              method='GET',
+                                              query_parameters=self.query_parameters,
+                                              header_parameters=self.header_parameters,
+                                              body=None,
+                                              expected_status_codes=[200],
+                                              polling_timeout=0,
+                                              polling_interval=0)
+            status = 'Exists'
+        except CloudError:
+            tags = dict(_chain_copy_of_=self.name)
+            if self.chain_name:
+                tags['_chain_'] = self.chain_name
+            body = dict(location=location,
+                        tags=tags,
+                        properties=dict(incremental=True,
+                                        creationData=dict(createOption='CopyStart',
+                                                          sourceResourceId=source_id)))
+            response = self.mgmt_client.query(url=url,
+                                              method='PUT',
+                                              query_parameters=self.query_parameters,
+                                              header_parameters=self.header_parameters,
+                                              body=body,
+                                              expected_status_codes=self.status_code,
+                                              polling_timeout=600,
+                                              polling_interval=30)
+            status = 'Created'
+
+        try:
+            response = json.loads(response.text)
+        except Exception:
+            response = {}
+        copy = dict(location=location, id=response.get('id', url), status=status)
+        if response.get('properties', {}).get('completionPercent') is not None:
+            copy['completion_percent'] = response['properties']['completionPercent']
+        return copy
+
     def create_update_resource(self):
         # self.log('Creating / Updating the Snapshot instance {0}'.format(self.))
         try:
@@ -318,12 +632,16 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
                                               header_parameters=self.header_parameters,
                                               body=self.body,
                                               expected_status_codes=self.status_code,
-                                              polling_timeout=600,
+                                              polling_timeout=0 if self.async_operation else 600,
                                               polling_interval=30)
         except CloudError as exc:
             self.log('Error attempting to create the Snapshot instance.')
             self.fail('Error creating the Snapshot instance: {0}'.format(str(exc)))
 
+        if self.async_operation:
+            self.results['async_operation'] = self.save_async_operation(response, self.url, 'PUT',
+                                                                        self.query_parameters['api-version'])
+
         try:
             response = json.loads(response.text)
         except Exception:
@@ -340,12 +658,16 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
                                               header_parameters=self.header_parameters,
                                               body=None,
                                               expected_status_codes=self.status_code,
-                                              polling_timeout=600,
+                                              polling_timeout=0 if self.async_operation else 600,
                                               polling_interval=30)
         except CloudError as e:
             self.log('Error attempting to delete the Snapshot instance.')
             self.fail('Error deleting the Snapshot instance: {0}'.format(str(e)))
 
+        if self.async_operation:
+            self.results['async_operation'] = self.save_async_operation(response, self.url, 'DELETE',
+                                                                        self.query_parameters['api-version'])
+
         return True
 
     def get_resource(self):
@@ -360,6 +682,7 @@ class AzureRMSnapshots(AzureRMModuleBaseExt):
                                               expected_status_codes=self.status_code,
                                               polling_timeout=600,
                                               polling_interval=30)
+            response = json.loads(response.text)
             found = True
             self.log("Response : {0}".format(response))
             # self.log("Snapshot instance : {0} found".format(response.name))
@@ -128,6 +128,13 @@ options:
             - If not specified for a new VM, a new storage account named <vm name>01 will be created using storage type C(Standard_LRS).
         aliases:
             - storage_account
+    deterministic_storage_account:
+        description:
+            - Derive the name of the default storage account from a hash of the resource group and VM name instead of a random number.
+            - Repeated runs for the same VM pick the same name, and an existing account with that name in I(resource_group) is reused.
+        type: bool
+        default: false
+        version_added: "2.9"
     storage_container_name:
         description:
             - Name of the container to use within the storage account to store VHD blobs.
@@ -364,6 +371,14 @@ options:
                 description:
                     - The certificate store on the VM to which the certificate should be added.
                     - The specified certificate store is implicitly in the LocalMachine account.
+    return_fields:
+        description:
+            - List of paths of the VM facts to return, for example C(properties.hardwareProfile) or C(powerstate).
+            - Paths are dot separated keys of the returned I(azure_vm) dict, only the requested parts are serialized.
+            - Network interface and public IP details are only fetched when a path under them is requested.
+            - If not specified, all facts are returned.
+        type: list
+        version_added: "2.9"
     boot_diagnostics:
         description:
             - Manage boot diagnostics settings for a VM.
@@ -768,6 +783,7 @@ azure_vm:
 '''  # NOQA
 
 import base64
+import hashlib
 import random
 import re
 
@@ -780,13 +796,18 @@ except ImportError:
     pass
 
 from ansible.module_utils.basic import to_native, to_bytes
-from ansible.module_utils.azure_rm_common import AzureRMModuleBase, azure_id_to_dict, normalize_location_name, format_resource_id
+from ansible.module_utils.azure_rm_common import azure_id_to_dict, normalize_location_name, format_resource_id
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 
 
 AZURE_OBJECT_CLASS = 'VirtualMachine'
 
 AZURE_ENUM_MODULES = ['azure.mgmt.compute.models']
 
+NIC_PROPERTIES_PATH = 'properties.networkProfile.networkInterfaces.properties'
+
+PIP_PROPERTIES_PATH = NIC_PROPERTIES_PATH + '.ipConfigurations.properties.publicIPAddress.properties'
+
 
 def extract_names_from_blob_uri(blob_uri, storage_suffix):
     # HACK: ditch this once python SDK supports get by URI
@@ -798,7 +819,7 @@ def extract_names_from_blob_uri(blob_uri, storage_suffix):
     return extracted_names
 
 
-class AzureRMVirtualMachine(AzureRMModuleBase):
+class AzureRMVirtualMachine(AzureRMModuleBaseExt):
 
     def __init__(self):
 
@@ -817,6 +838,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
             image=dict(type='raw'),
             availability_set=dict(type='str'),
             storage_account_name=dict(type='str', aliases=['storage_account']),
+            deterministic_storage_account=dict(type='bool', default=False),
             storage_container_name=dict(type='str', aliases=['storage_container'], default='vhds'),
             storage_blob_name=dict(type='str', aliases=['storage_blob']),
             os_disk_caching=dict(type='str', aliases=['disk_caching'], choices=['ReadOnly', 'ReadWrite'],
@@ -845,6 +867,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
             vm_identity=dict(type='str', choices=['SystemAssigned']),
             winrm=dict(type='list'),
             boot_diagnostics=dict(type='dict'),
+            return_fields=dict(type='list'),
         )
 
         self.resource_group = None
@@ -861,6 +884,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         self.image = None
         self.availability_set = None
         self.storage_account_name = None
+        self.deterministic_storage_account = None
         self.storage_container_name = None
         self.storage_blob_name = None
         self.os_type = None
@@ -889,6 +913,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         self.license_type = None
         self.vm_identity = None
         self.boot_diagnostics = None
+        self.return_fields = None
 
         self.results = dict(
             changed=False,
@@ -963,10 +988,9 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         image_reference = None
         custom_image = False
 
-        resource_group = self.get_resource_group(self.resource_group)
         if not self.location:
             # Set default location
-            self.location = resource_group.location
+            self.location = self.get_resource_group_location(self.resource_group)
 
         self.location = normalize_location_name(self.location)
 
@@ -1195,6 +1219,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         self.results['powerstate_change'] = powerstate_change
 
         if self.check_mode:
+            self.project_facts()
             return self.results
 
         if changed:
@@ -1599,7 +1624,7 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
                     self.power_off_vm()
                     self.generalize_vm()
 
-                self.results['ansible_facts']['azure_vm'] = self.serialize_vm(self.get_vm())
+                self.results['ansible_facts']['azure_vm'] = self.serialize_vm(self.get_vm(), self.return_fields)
 
             elif self.state == 'absent':
                 # delete the VM
@@ -1610,8 +1635,17 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         # until we sort out how we want to do this globally
         del self.results['actions']
 
+        self.project_facts()
         return self.results
 
+    def project_facts(self):
+        '''
+        Limit returned VM facts to return_fields.
+        '''
+        if self.return_fields and self.results['ansible_facts']['azure_vm']:
+            self.results['ansible_facts']['azure_vm'] = self.project_fields(self.results['ansible_facts']['azure_vm'],
+                                                                            self.return_fields)
+
     def get_vm(self):
         '''
         Get the VM with expanded instanceView
@@ -1624,15 +1658,19 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         except Exception as exc:
             self.fail("Error getting virtual machine {0} - {1}".format(self.name, str(exc)))
 
-    def serialize_vm(self, vm):
+    def serialize_vm(self, vm, fields=None):
         '''
         Convert a VirtualMachine object to dict.
 
         :param vm: VirtualMachine object
+        :param fields: list of paths to serialize, everything if not specified
         :return: dict
         '''
 
-        result = self.serialize_obj(vm, AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
+        if fields:
+            result = self.serialize_obj(self.trim_obj(vm, fields), AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
+        else:
+            result = self.serialize_obj(vm, AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
         result['id'] = vm.id
         result['name'] = vm.name
         result['type'] = vm.type
@@ -1647,34 +1685,40 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
                 if s.code.lower() == "osstate/generalized":
                     result['powerstate'] = 'generalized'
 
+        # Network interfaces and public IPs are only fetched when requested
+        expand_nics = not fields or any(self.paths_overlap(NIC_PROPERTIES_PATH, field) for field in fields)
+        expand_pips = not fields or any(self.paths_overlap(PIP_PROPERTIES_PATH, field) for field in fields)
+
         # Expand network interfaces to include config properties
-        for interface in vm.network_profile.network_interfaces:
-            int_dict = azure_id_to_dict(interface.id)
-            nic = self.get_network_interface(int_dict['resourceGroups'], int_dict['networkInterfaces'])
-            for interface_dict in result['properties']['networkProfile']['networkInterfaces']:
-                if interface_dict['id'] == interface.id:
-                    nic_dict = self.serialize_obj(nic, 'NetworkInterface')
-                    interface_dict['name'] = int_dict['networkInterfaces']
-                    interface_dict['properties'] = nic_dict['properties']
+        if expand_nics:
+            for interface in vm.network_profile.network_interfaces:
+                int_dict = azure_id_to_dict(interface.id)
+                nic = self.get_network_interface(int_dict['resourceGroups'], int_dict['networkInterfaces'])
+                for interface_dict in result['properties']['networkProfile']['networkInterfaces']:
+                    if interface_dict['id'] == interface.id:
+                        nic_dict = self.serialize_obj(nic, 'NetworkInterface')
+                        interface_dict['name'] = int_dict['networkInterfaces']
+                        interface_dict['properties'] = nic_dict['properties']
         # Expand public IPs to include config properties
-        for interface in result['properties']['networkProfile']['networkInterfaces']:
-            for config in interface['properties']['ipConfigurations']:
-                if config['properties'].get('publicIPAddress'):
-                    pipid_dict = azure_id_to_dict(config['properties']['publicIPAddress']['id'])
-                    try:
-                        pip = self.network_client.public_ip_addresses.get(pipid_dict['resourceGroups'],
-                                                                          pipid_dict['publicIPAddresses'])
-                    except Exception as exc:
-                        self.fail("Error fetching public ip {0} - {1}".format(pipid_dict['publicIPAddresses'],
-                                                                              str(exc)))
-                    pip_dict = self.serialize_obj(pip, 'PublicIPAddress')
-                    config['properties']['publicIPAddress']['name'] = pipid_dict['publicIPAddresses']
-                    config['properties']['publicIPAddress']['properties'] = pip_dict['properties']
+        if expand_pips:
+            for interface in result['properties']['networkProfile']['networkInterfaces']:
+                for config in interface['properties']['ipConfigurations']:
+                    if config['properties'].get('publicIPAddress'):
+                        pipid_dict = azure_id_to_dict(config['properties']['publicIPAddress']['id'])
+                        try:
+                            pip = self.network_client.public_ip_addresses.get(pipid_dict['resourceGroups'],
+                                                                              pipid_dict['publicIPAddresses'])
+                        except Exception as exc:
+                            self.fail("Error fetching public ip {0} - {1}".format(pipid_dict['publicIPAddresses'],
+                                                                                  str(exc)))
+                        pip_dict = self.serialize_obj(pip, 'PublicIPAddress')
+                        config['properties']['publicIPAddress']['name'] = pipid_dict['publicIPAddresses']
+                        config['properties']['publicIPAddress']['properties'] = pip_dict['properties']
 
         self.log(result, pretty_print=True)
         if self.state != 'absent' and not result['powerstate']:
             self.fail("Failed to determine PowerState of virtual machine {0}".format(self.name))
-        return result
+        return self.project_fields(result, fields) if fields else result
 
     def power_off_vm(self):
         self.log("Powered off virtual machine {0}".format(self.name))
@@ -1990,13 +2034,20 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         If this method is called multiple times across executions it will return the same
         storage account created with the random name which is stored in a tag on the VM.
 
+        With deterministic_storage_account the suffix is taken from a hash of the resource group
+        and VM name, so the same names are tried on every run and an account left behind by an
+        earlier run in our resource group is picked up again.
+
+        All candidate names are probed at the same time and the first usable one in candidate
+        order wins.
+
         vm_dict is passed in during an update, so we can obtain the _own_sa_ tag and return
         the default storage account we created in a previous invocation
 
         :return: storage account object
         '''
         account = None
-        valid_name = False
+        storage_account_name = None
         if self.tags is None:
             self.tags = {}
 
@@ -2010,26 +2061,28 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
             return self.get_storage_account(vm_dict['tags']['_own_sa_'])
 
         # Attempt to find a valid storage account name
-        storage_account_name_base = re.sub('[^a-zA-Z0-9]', '', self.name[:20].lower())
-        for i in range(0, 5):
-            rand = random.randrange(1000, 9999)
-            storage_account_name = storage_account_name_base + str(rand)
-            if self.check_storage_account_name(storage_account_name):
-                valid_name = True
+        candidates = self.default_storage_account_names()
+
+        # make sure the client is created before it's shared by worker threads
+        self.storage_client
+        outcomes = self.run_concurrently(self.probe_storage_account_name, candidates, len(candidates))
+
+        for name, (outcome, exc) in zip(candidates, outcomes):
+            if exc is not None:
+                self.fail("Error checking storage account name availability for {0} - {1}".format(name, str(exc)))
+            available, account = outcome
+            if available or account:
+                storage_account_name = name
                 break
 
-        if not valid_name:
+        if not storage_account_name:
             self.fail("Failed to create a unique storage account name for {0}. Try using a different VM name."
                       .format(self.name))
 
-        try:
-            account = self.storage_client.storage_accounts.get_properties(self.resource_group, storage_account_name)
-        except CloudError:
-            pass
-
         if account:
             self.log("Storage account {0} found.".format(storage_account_name))
             self.check_provisioning_state(account)
+            self.tags['_own_sa_'] = storage_account_name
             return account
         sku = self.storage_models.Sku(name=self.storage_models.SkuName.standard_lrs)
         sku.tier = self.storage_models.SkuTier.standard
@@ -2045,16 +2098,43 @@ class AzureRMVirtualMachine(AzureRMModuleBase):
         self.tags['_own_sa_'] = storage_account_name
         return self.get_storage_account(storage_account_name)
 
-    def check_storage_account_name(self, name):
+    def default_storage_account_names(self, count=5):
+        '''
+        Generate candidate names for the default storage account, at most 24 characters each.
+
+        :return: list of names in order of preference
+        '''
+        if not self.deterministic_storage_account:
+            base = re.sub('[^a-zA-Z0-9]', '', self.name[:20].lower())
+            return [base + str(random.randrange(1000, 9999)) for i in range(0, count)]
+
+        base = re.sub('[^a-zA-Z0-9]', '', self.name.lower())[:16]
+        names = []
+        for i in range(0, count):
+            seed = '{0}/{1}/{2}'.format(self.resource_group.lower(), self.name.lower(), i)
+            names.append(base + hashlib.sha1(to_bytes(seed)).hexdigest()[:8])
+        return names
+
+    def probe_storage_account_name(self, name):
+        '''
+        Check whether a storage account name can be used. Runs on a worker thread, so errors are
+        raised instead of failing the module.
+
+        :return: tuple of (name is available, existing account in our resource group or None)
+        '''
         self.log("Checking storage account name availability for {0}".format(name))
-        try:
-            response = self.storage_client.storage_accounts.check_name_availability(name)
-            if response.reason == 'AccountNameInvalid':
-                raise Exception("Invalid default storage account name: {0}".format(name))
-        except Exception as exc:
-            self.fail("Error checking storage account name availability for {0} - {1}".format(name, str(exc)))
+        response = self.storage_client.storage_accounts.check_name_availability(name)
+        if response.reason == 'AccountNameInvalid':
+            raise Exception("Invalid default storage account name: {0}".format(name))
+        if response.name_available or not self.deterministic_storage_account:
+            return (response.name_available, None)
 
-        return response.name_available
+        # the name is taken, it may be ours from an earlier run
+        try:
+            account = self.storage_client.storage_accounts.get_properties(self.resource_group, name)
+        except CloudError:
+            account = None
+        return (False, account)
 
     def create_default_nic(self):
         '''
@@ -0,0 +1,328 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_virtualmachinepower
+version_added: '2.9'
+short_description: Change power state of many Azure virtual machines at once.
+description:
+  - 'Start, power off, restart, deallocate or generalize a list of Azure virtual machines.'
+  - >-
+    Current power state of all selected virtual machines is read first, virtual machines already
+    in the requested state are skipped and state changes of all others are issued at the same time.
+options:
+  resource_group:
+    description:
+      - Name of the resource group of virtual machines given by name in I(vms).
+      - When I(vms) is omitted, limits virtual machines selected by I(tags) to this resource group.
+    type: str
+  vms:
+    description:
+      - List of virtual machines.
+      - Every item is a virtual machine name in I(resource_group), a virtual machine resource ID,
+        or a dict with I(name) and I(resource_group).
+      - If omitted, all virtual machines in I(resource_group) or in the subscription matching I(tags) are selected.
+    type: list
+  tags:
+    description:
+      - Limit selected virtual machines to those having these tags.
+      - Format tags as 'key' or 'key:value'.
+    type: list
+  action:
+    description:
+      - Power state change to apply.
+      - C(restart) is only applied to running virtual machines.
+      - C(generalize) powers off the virtual machine before generalizing it.
+    required: true
+    type: str
+    choices:
+      - start
+      - power_off
+      - restart
+      - deallocate
+      - generalize
+  max_concurrency:
+    description:
+      - Maximum number of virtual machines processed at the same time.
+    type: int
+    default: 10
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Deallocate all lab virtual machines at night
+  azure_rm_virtualmachinepower:
+    tags:
+      - environment:lab
+    action: deallocate
+
+- name: Start selected virtual machines
+  azure_rm_virtualmachinepower:
+    resource_group: myResourceGroup
+    vms:
+      - myVm1
+      - myVm2
+      - name: myVm3
+        resource_group: myOtherResourceGroup
+    action: start
+'''
+
+RETURN = '''
+vms:
+  description:
+    - Result for every selected virtual machine.
+  returned: always
+  type: complex
+  contains:
+    id:
+      description:
+        - Resource ID of the virtual machine.
+      returned: always
+      type: str
+      sample: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Compute/virtualMachines/myVm1
+    resource_group:
+      description:
+        - Resource group of the virtual machine.
+      returned: always
+      type: str
+      sample: myResourceGroup
+    name:
+      description:
+        - Name of the virtual machine.
+      returned: always
+      type: str
+      sample: myVm1
+    powerstate:
+      description:
+        - Power state of the virtual machine before the change.
+      returned: always
+      type: str
+      sample: running
+    status:
+      description:
+        - C(Succeeded), C(Failed), C(Skipped) when already in requested state or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds the state change of the virtual machine took to complete.
+      returned: when state was changed
+      type: float
+      sample: 64.8
+    error:
+      description:
+        - Error message if the state change failed.
+      returned: when state change failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds all state changes took to complete.
+  returned: always
+  type: float
+  sample: 71.3
+'''
+
+import time
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+try:
+    from msrestazure.azure_exceptions import CloudError
+    from msrestazure.tools import parse_resource_id
+    from msrest.polling import LROPoller
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+# power states in which the action has nothing to do
+SKIP_STATES = dict(
+    start=['starting', 'running'],
+    power_off=['stopping', 'stopped', 'deallocating', 'deallocated', 'generalized'],
+    deallocate=['deallocating', 'deallocated'],
+    generalize=['generalized']
+)
+
+
+class AzureRMVirtualMachinePower(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str'
+            ),
+            vms=dict(
+                type='list'
+            ),
+            tags=dict(
+                type='list'
+            ),
+            action=dict(
+                type='str',
+                required=True,
+                choices=['start', 'power_off', 'restart', 'deallocate', 'generalize']
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            )
+        )
+
+        self.resource_group = None
+        self.vms = None
+        self.tags = None
+        self.action = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+
+        super(AzureRMVirtualMachinePower, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                         supports_check_mode=True,
+                                                         supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        targets = self.select_vms()
+
+        # make sure the client is created before it's shared by worker threads
+        self.compute_client
+
+        # read current power state of all virtual machines at once
+        outcomes = self.run_concurrently(self.get_vm, targets, self.max_concurrency)
+        vms = []
+        for target, (vm, exc) in zip(targets, outcomes):
+            if exc is not None:
+                self.fail("Error getting virtual machine {0} - {1}".format(target['name'], str(exc)))
+            if self.tags and not self.has_tags(vm.tags, self.tags):
+                continue
+            item = dict(id=vm.id,
+                        resource_group=target['resource_group'],
+                        name=vm.name,
+                        powerstate=self.get_powerstate(vm),
+                        status='Pending')
+            if self.is_skipped(item['powerstate']):
+                item['status'] = 'Skipped'
+            vms.append(item)
+
+        pending = [item for item in vms if item['status'] == 'Pending']
+        self.results['vms'] = vms
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(pending) > 0
+
+        if self.check_mode or not pending:
+            return self.results
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.change_powerstate, pending, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for item, (elapsed, exc) in zip(pending, outcomes):
+            if exc is not None:
+                item['status'] = 'Failed'
+                item['error'] = str(exc)
+                failed.append(item['name'])
+            else:
+                item['status'] = 'Succeeded'
+                item['elapsed'] = elapsed
+
+        if failed:
+            self.fail("Error running {0} on virtual machines {1}".format(self.action, ', '.join(failed)), **self.results)
+
+        return self.results
+
+    def select_vms(self):
+        if self.vms is None:
+            if not self.tags:
+                self.fail("Parameter error: either vms or tags must be specified.")
+            try:
+                if self.resource_group:
+                    response = self.compute_client.virtual_machines.list(self.resource_group)
+                else:
+                    response = self.compute_client.virtual_machines.list_all()
+                found = list(response)
+            except CloudError as exc:
+                self.fail("Error listing virtual machines - {0}".format(str(exc)))
+            return [dict(resource_group=parse_resource_id(vm.id)['resource_group'], name=vm.name)
+                    for vm in found if self.has_tags(vm.tags, self.tags)]
+
+        targets = []
+        for vm in self.vms:
+            if isinstance(vm, dict):
+                target = dict(resource_group=vm.get('resource_group', self.resource_group), name=vm.get('name'))
+            elif '/' in vm:
+                parsed = parse_resource_id(vm)
+                target = dict(resource_group=parsed.get('resource_group'), name=parsed.get('name'))
+            else:
+                target = dict(resource_group=self.resource_group, name=vm)
+            if not target['resource_group'] or not target['name']:
+                self.fail("Parameter error: resource group and name of virtual machine {0} required.".format(vm))
+            targets.append(target)
+        return targets
+
+    def get_vm(self, target):
+        return self.compute_client.virtual_machines.get(target['resource_group'], target['name'], expand='instanceView')
+
+    def get_powerstate(self, vm):
+        powerstate = None
+        if vm.instance_view:
+            powerstate = next((s.code.replace('PowerState/', '')
+                               for s in vm.instance_view.statuses if s.code.startswith('PowerState')), None)
+            for s in vm.instance_view.statuses:
+                if s.code.lower() == "osstate/generalized":
+                    powerstate = 'generalized'
+        return powerstate
+
+    def is_skipped(self, powerstate):
+        if self.action == 'restart':
+            return powerstate != 'running'
+        return powerstate in SKIP_STATES[self.action]
+
+    def change_powerstate(self, item):
+        start = time.time()
+        operations = self.compute_client.virtual_machines
+        resource_group = item['resource_group']
+        name = item['name']
+
+        self.log("{0} virtual machine {1}".format(self.action, name))
+        if self.action == 'start':
+            self.get_poller_result(operations.start(resource_group, name))
+        elif self.action == 'power_off':
+            self.get_poller_result(operations.power_off(resource_group, name))
+        elif self.action == 'restart':
+            self.get_poller_result(operations.restart(resource_group, name))
+        elif self.action == 'deallocate':
+            self.get_poller_result(operations.deallocate(resource_group, name))
+        else:
+            if item['powerstate'] not in SKIP_STATES['power_off']:
+                self.get_poller_result(operations.power_off(resource_group, name))
+            response = operations.generalize(resource_group, name)
+            if isinstance(response, LROPoller):
+                self.get_poller_result(response)
+
+        return time.time() - start
+
+
+def main():
+    AzureRMVirtualMachinePower()
+
+
+if __name__ == '__main__':
+    main()
@@ -220,6 +220,13 @@ options:
               U(https://docs.microsoft.com/en-us/azure/virtual-machines/linux/using-cloud-init#cloud-init-overview),
               follow these steps U(https://docs.microsoft.com/en-us/azure/virtual-machines/linux/cloudinit-prepare-custom-image).
         version_added: "2.8"
+    return_fields:
+        description:
+            - List of paths of the VMSS facts to return, for example C(properties.virtualMachineProfile.storageProfile).
+            - Paths are dot separated keys of the returned I(azure_vmss) dict, only the requested parts are serialized.
+            - If not specified, all facts are returned.
+        type: list
+        version_added: "2.9"
 
 extends_documentation_fragment:
     - azure
@@ -397,6 +404,7 @@ azure_vmss:
     }
 '''  # NOQA
 
+import copy
 import random
 import re
 import base64
@@ -409,7 +417,8 @@ except ImportError:
     # This is handled in azure_rm_common
     pass
 
-from ansible.module_utils.azure_rm_common import AzureRMModuleBase, azure_id_to_dict, format_resource_id
+from ansible.module_utils.azure_rm_common import azure_id_to_dict, format_resource_id
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 from ansible.module_utils.basic import to_native, to_bytes
 
 
@@ -418,7 +427,7 @@ AZURE_OBJECT_CLASS = 'VirtualMachineScaleSet'
 AZURE_ENUM_MODULES = ['azure.mgmt.compute.models']
 
 
-class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
+class AzureRMVirtualMachineScaleSet(AzureRMModuleBaseExt):
 
     def __init__(self):
 
@@ -453,7 +462,8 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
             overprovision=dict(type='bool', default=True),
             single_placement_group=dict(type='bool', default=True),
             zones=dict(type='list'),
-            custom_data=dict(type='str')
+            custom_data=dict(type='str'),
+            return_fields=dict(type='list')
         )
 
         self.resource_group = None
@@ -487,6 +497,8 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         self.single_placement_group = None
         self.zones = None
         self.custom_data = None
+        self.return_fields = None
+        self.patch = None
 
         required_if = [
             ('state', 'present', [
@@ -540,12 +552,10 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         load_balancer = None
         application_gateway = None
         application_gateway_backend_address_pools = None
-        support_lb_change = True
 
-        resource_group = self.get_resource_group(self.resource_group)
         if not self.location:
             # Set default location
-            self.location = resource_group.location
+            self.location = self.get_resource_group_location(self.resource_group)
 
         if self.custom_data:
             self.custom_data = to_native(base64.b64encode(to_bytes(self.custom_data)))
@@ -625,62 +635,20 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
             vmss_dict = self.serialize_vmss(vmss)
 
             if self.state == 'present':
-                differences = []
                 results = vmss_dict
+                compare = dict(compare=[])
 
-                if self.os_disk_caching and \
-                   self.os_disk_caching != vmss_dict['properties']['virtualMachineProfile']['storageProfile']['osDisk']['caching']:
-                    self.log('CHANGED: virtual machine scale set {0} - OS disk caching'.format(self.name))
-                    differences.append('OS Disk caching')
-                    changed = True
-                    vmss_dict['properties']['virtualMachineProfile']['storageProfile']['osDisk']['caching'] = self.os_disk_caching
-
-                if self.capacity and \
-                   self.capacity != vmss_dict['sku']['capacity']:
-                    self.log('CHANGED: virtual machine scale set {0} - Capacity'.format(self.name))
-                    differences.append('Capacity')
-                    changed = True
-                    vmss_dict['sku']['capacity'] = self.capacity
-
-                if self.data_disks and \
-                   len(self.data_disks) != len(vmss_dict['properties']['virtualMachineProfile']['storageProfile'].get('dataDisks', [])):
-                    self.log('CHANGED: virtual machine scale set {0} - Data Disks'.format(self.name))
-                    differences.append('Data Disks')
-                    changed = True
-
-                if self.upgrade_policy and \
-                   self.upgrade_policy != vmss_dict['properties']['upgradePolicy']['mode']:
-                    self.log('CHANGED: virtual machine scale set {0} - Upgrade Policy'.format(self.name))
-                    differences.append('Upgrade Policy')
-                    changed = True
-                    vmss_dict['properties']['upgradePolicy']['mode'] = self.upgrade_policy
+                patch = self.create_patch({}, self.get_desired_vmss(image_reference), vmss_dict, '', compare) or {}
 
-                if image_reference and \
-                   image_reference.as_dict() != vmss_dict['properties']['virtualMachineProfile']['storageProfile']['imageReference']:
-                    self.log('CHANGED: virtual machine scale set {0} - Image'.format(self.name))
-                    differences.append('Image')
-                    changed = True
-                    vmss_dict['properties']['virtualMachineProfile']['storageProfile']['imageReference'] = image_reference.as_dict()
-
-                update_tags, vmss_dict['tags'] = self.update_tags(vmss_dict.get('tags', dict()))
+                update_tags, new_tags = self.update_tags(vmss_dict.get('tags', dict()))
                 if update_tags:
-                    differences.append('Tags')
-                    changed = True
+                    # tags are replaced as a whole on update
+                    compare['compare'].append('changed [/tags]')
+                    patch['tags'] = new_tags
 
-                if bool(self.overprovision) != bool(vmss_dict['properties']['overprovision']):
-                    differences.append('overprovision')
-                    changed = True
-
-                if bool(self.single_placement_group) != bool(vmss_dict['properties']['singlePlacementGroup']):
-                    differences.append('single_placement_group')
-                    changed = True
-
-                vmss_dict['zones'] = [int(i) for i in vmss_dict['zones']] if 'zones' in vmss_dict and vmss_dict['zones'] else None
-                if self.zones != vmss_dict['zones']:
-                    self.log("CHANGED: virtual machine scale sets {0} zones".format(self.name))
-                    differences.append('Zones')
-                    changed = True
-                    vmss_dict['zones'] = self.zones
+                current_zones = [int(i) for i in vmss_dict['zones']] if vmss_dict.get('zones') else None
+                if self.zones != current_zones:
+                    self.module.warn("property 'zones' cannot be updated ({0}->{1})".format(current_zones, self.zones))
 
                 nicConfigs = vmss_dict['properties']['virtualMachineProfile']['networkProfile']['networkInterfaceConfigurations']
 
@@ -688,7 +656,6 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
                 backend_address_pool += nicConfigs[0]['properties']['ipConfigurations'][0]['properties'].get('applicationGatewayBackendAddressPools', [])
                 lb_or_ag_id = None
                 if (len(nicConfigs) != 1 or len(backend_address_pool) != 1):
-                    support_lb_change = False  # Currently not support for the vmss contains more than one loadbalancer
                     self.module.warn('Updating more than one load balancer on VMSS is currently not supported')
                 else:
                     if load_balancer:
@@ -698,16 +665,19 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
 
                     backend_address_pool_id = backend_address_pool[0].get('id')
                     if bool(lb_or_ag_id) != bool(backend_address_pool_id) or not backend_address_pool_id.startswith(lb_or_ag_id):
-                        differences.append('load_balancer')
-                        changed = True
-
-                if self.custom_data:
-                    if self.custom_data != vmss_dict['properties']['virtualMachineProfile']['osProfile'].get('customData'):
-                        differences.append('custom_data')
-                        changed = True
-                        vmss_dict['properties']['virtualMachineProfile']['osProfile']['customData'] = self.custom_data
+                        compare['compare'].append('changed [/properties/virtualMachineProfile/networkProfile]')
+                        network_profile = self.get_backend_pools_patch(nicConfigs,
+                                                                       load_balancer_backend_address_pools,
+                                                                       load_balancer_inbound_nat_pools,
+                                                                       application_gateway_backend_address_pools)
+                        patch.setdefault('properties', {}).setdefault('virtualMachineProfile', {})['networkProfile'] = network_profile
+
+                if patch:
+                    self.log('CHANGED: virtual machine scale set {0} - {1}'.format(self.name, ', '.join(compare['compare'])))
+                    changed = True
 
-                self.differences = differences
+                self.differences = compare['compare']
+                self.patch = patch
 
             elif self.state == 'absent':
                 self.log("CHANGED: virtual machine scale set {0} exists and requested state is 'absent'".format(self.name))
@@ -724,6 +694,7 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         self.results['ansible_facts']['azure_vmss'] = results
 
         if self.check_mode:
+            self.project_facts()
             return self.results
 
         if changed:
@@ -859,52 +830,14 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
                     self.log("Create virtual machine with parameters:")
                     self.create_or_update_vmss(vmss_resource)
 
-                elif self.differences and len(self.differences) > 0:
+                elif self.patch:
                     self.log("Update virtual machine scale set {0}".format(self.name))
                     self.results['actions'].append('Updated VMSS {0}'.format(self.name))
+                    self.log("Update virtual machine scale set with patch:")
+                    self.log(self.patch, pretty_print=True)
+                    self.update_vmss(self.patch)
 
-                    vmss_resource = self.get_vmss()
-                    vmss_resource.virtual_machine_profile.storage_profile.os_disk.caching = self.os_disk_caching
-                    vmss_resource.sku.capacity = self.capacity
-                    vmss_resource.overprovision = self.overprovision
-                    vmss_resource.single_placement_group = self.single_placement_group
-
-                    if support_lb_change:
-                        if self.load_balancer:
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].load_balancer_backend_address_pools = load_balancer_backend_address_pools
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].load_balancer_inbound_nat_pools = load_balancer_inbound_nat_pools
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].application_gateway_backend_address_pools = None
-                        elif self.application_gateway:
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].application_gateway_backend_address_pools = application_gateway_backend_address_pools
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].load_balancer_backend_address_pools = None
-                            vmss_resource.virtual_machine_profile.network_profile.network_interface_configurations[0] \
-                                .ip_configurations[0].load_balancer_inbound_nat_pools = None
-
-                    if self.data_disks is not None:
-                        data_disks = []
-                        for data_disk in self.data_disks:
-                            data_disks.append(self.compute_models.VirtualMachineScaleSetDataDisk(
-                                lun=data_disk['lun'],
-                                caching=data_disk['caching'],
-                                create_option=self.compute_models.DiskCreateOptionTypes.empty,
-                                disk_size_gb=data_disk['disk_size_gb'],
-                                managed_disk=self.compute_models.VirtualMachineScaleSetManagedDiskParameters(
-                                    storage_account_type=data_disk['managed_disk_type']
-                                ),
-                            ))
-                        vmss_resource.virtual_machine_profile.storage_profile.data_disks = data_disks
-
-                    if image_reference is not None:
-                        vmss_resource.virtual_machine_profile.storage_profile.image_reference = image_reference
-                    self.log("Update virtual machine with parameters:")
-                    self.create_or_update_vmss(vmss_resource)
-
-                self.results['ansible_facts']['azure_vmss'] = self.serialize_vmss(self.get_vmss())
+                self.results['ansible_facts']['azure_vmss'] = self.serialize_vmss(self.get_vmss(), self.return_fields)
 
             elif self.state == 'absent':
                 # delete the VM
@@ -915,8 +848,17 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         # until we sort out how we want to do this globally
         del self.results['actions']
 
+        self.project_facts()
         return self.results
 
+    def project_facts(self):
+        '''
+        Limit returned VMSS facts to return_fields.
+        '''
+        if self.return_fields and self.results['ansible_facts']['azure_vmss']:
+            self.results['ansible_facts']['azure_vmss'] = self.project_fields(self.results['ansible_facts']['azure_vmss'],
+                                                                              self.return_fields)
+
     def get_vmss(self):
         '''
         Get the VMSS
@@ -961,22 +903,26 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         except CloudError as exc:
             self.fail("Error fetching application_gateway {0} - {1}".format(id, str(exc)))
 
-    def serialize_vmss(self, vmss):
+    def serialize_vmss(self, vmss, fields=None):
         '''
         Convert a VirtualMachineScaleSet object to dict.
 
         :param vm: VirtualMachineScaleSet object
+        :param fields: list of paths to serialize, everything if not specified
         :return: dict
         '''
 
-        result = self.serialize_obj(vmss, AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
+        if fields:
+            result = self.serialize_obj(self.trim_obj(vmss, fields), AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
+        else:
+            result = self.serialize_obj(vmss, AZURE_OBJECT_CLASS, enum_modules=AZURE_ENUM_MODULES)
         result['id'] = vmss.id
         result['name'] = vmss.name
         result['type'] = vmss.type
         result['location'] = vmss.location
         result['tags'] = vmss.tags
 
-        return result
+        return self.project_fields(result, fields) if fields else result
 
     def delete_vmss(self, vmss):
         self.log("Deleting virtual machine scale set {0}".format(self.name))
@@ -1036,6 +982,86 @@ class AzureRMVirtualMachineScaleSet(AzureRMModuleBase):
         except CloudError as exc:
             self.fail("Error creating or updating virtual machine {0} - {1}".format(self.name, str(exc)))
 
+    def get_desired_vmss(self, image_reference):
+        '''
+        Build the properties of the VMSS requested by module parameters, in the same form as serialize_vmss.
+
+        :param image_reference: ImageReference object or None
+        :return: dict
+        '''
+        storage_profile = dict()
+        if self.os_disk_caching:
+            storage_profile['osDisk'] = dict(caching=self.os_disk_caching)
+        if image_reference:
+            storage_profile['imageReference'] = self.serialize_obj(image_reference, 'ImageReference')
+        if self.data_disks is not None:
+            storage_profile['dataDisks'] = []
+            for data_disk in self.data_disks:
+                disk = self.compute_models.VirtualMachineScaleSetDataDisk(
+                    lun=data_disk.get('lun', None),
+                    caching=data_disk.get('caching', self.compute_models.CachingTypes.read_only),
+                    create_option=self.compute_models.DiskCreateOptionTypes.empty,
+                    disk_size_gb=data_disk.get('disk_size_gb', None),
+                    managed_disk=self.compute_models.VirtualMachineScaleSetManagedDiskParameters(
+                        storage_account_type=data_disk.get('managed_disk_type', None)
+                    ),
+                )
+                storage_profile['dataDisks'].append(self.serialize_obj(disk, 'VirtualMachineScaleSetDataDisk',
+                                                                       enum_modules=AZURE_ENUM_MODULES))
+
+        vm_profile = dict(storageProfile=storage_profile)
+        if self.custom_data:
+            vm_profile['osProfile'] = dict(customData=self.custom_data)
+
+        properties = dict(
+            virtualMachineProfile=vm_profile,
+            overprovision=bool(self.overprovision),
+            singlePlacementGroup=bool(self.single_placement_group)
+        )
+        if self.upgrade_policy:
+            properties['upgradePolicy'] = dict(mode=self.upgrade_policy)
+
+        desired = dict(properties=properties)
+        if self.capacity:
+            desired['sku'] = dict(capacity=self.capacity)
+        return desired
+
+    def get_backend_pools_patch(self, nic_configs, lb_backend_pools, lb_nat_pools, ag_backend_pools):
+        '''
+        Build the network profile patch switching the primary IP configuration to new backend pools.
+        Network interface configurations are a list, so the complete list is sent.
+
+        :return: dict
+        '''
+        def serialize_pools(pools):
+            return [self.serialize_obj(pool, 'SubResource') for pool in pools] if pools else None
+
+        nic_configs = copy.deepcopy(nic_configs)
+        ip_config = nic_configs[0]['properties']['ipConfigurations'][0]['properties']
+        if self.load_balancer:
+            ip_config['loadBalancerBackendAddressPools'] = serialize_pools(lb_backend_pools)
+            ip_config['loadBalancerInboundNatPools'] = serialize_pools(lb_nat_pools)
+            ip_config['applicationGatewayBackendAddressPools'] = None
+        elif self.application_gateway:
+            ip_config['applicationGatewayBackendAddressPools'] = serialize_pools(ag_backend_pools)
+            ip_config['loadBalancerBackendAddressPools'] = None
+            ip_config['loadBalancerInboundNatPools'] = None
+        return dict(networkInterfaceConfigurations=nic_configs)
+
+    def update_vmss(self, patch):
+        '''
+        Send only changed properties of the VMSS.
+
+        :param patch: dict in the same form as serialize_vmss
+        :return: VirtualMachineScaleSet object
+        '''
+        try:
+            parameters = self.compute_models.VirtualMachineScaleSetUpdate.deserialize(patch)
+            poller = self.compute_client.virtual_machine_scale_sets.update(self.resource_group, self.name, parameters)
+            return self.get_poller_result(poller)
+        except Exception as exc:
+            self.fail("Error updating virtual machine scale set {0} - {1}".format(self.name, str(exc)))
+
     def vm_size_is_valid(self):
         '''
         Validate self.vm_size against the list of virtual machine sizes available for the account and location.
@@ -0,0 +1,304 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_virtualmachinescalesetinstanceaction
+version_added: '2.9'
+short_description: Run an action on Azure virtual machine scale set instances.
+description:
+  - 'Reimage, upgrade, restart, start, power off or deallocate selected instances of Azure virtual machine scale set.'
+  - >-
+    Instances are split into batches, every batch is a single call to the scale set level bulk instance API
+    and several batches are processed at the same time.
+options:
+  resource_group:
+    description:
+      - The name of the resource group.
+    required: true
+    type: str
+  vmss_name:
+    description:
+      - The name of the virtual machine scale set.
+    required: true
+    type: str
+  action:
+    description:
+      - Action to run on the selected instances.
+      - C(upgrade) applies the latest scale set model to the instances, use it after changing the image of
+        a scale set with I(upgrade_policy=Manual).
+    required: true
+    type: str
+    choices:
+      - reimage
+      - upgrade
+      - restart
+      - start
+      - power_off
+      - deallocate
+  instance_ids:
+    description:
+      - List of instance IDs to run the action on.
+      - If omitted, all instances of the scale set are selected.
+    type: list
+  only_outdated:
+    description:
+      - Only select instances which are not running the latest scale set model.
+    type: bool
+    default: false
+  batch_size:
+    description:
+      - Maximum number of instances passed to a single bulk instance API call.
+    type: int
+    default: 20
+  max_concurrency:
+    description:
+      - Maximum number of batches processed at the same time.
+    type: int
+    default: 5
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Roll new gallery image version to all outdated instances
+  azure_rm_virtualmachinescalesetinstanceaction:
+    resource_group: myResourceGroup
+    vmss_name: myScaleSet
+    action: upgrade
+    only_outdated: yes
+    batch_size: 25
+    max_concurrency: 4
+
+- name: Restart selected instances
+  azure_rm_virtualmachinescalesetinstanceaction:
+    resource_group: myResourceGroup
+    vmss_name: myScaleSet
+    action: restart
+    instance_ids:
+      - "0"
+      - "3"
+'''
+
+RETURN = '''
+instance_ids:
+  description:
+    - List of instance IDs the action was run on.
+  returned: always
+  type: list
+  sample: ["0", "1", "2"]
+batches:
+  description:
+    - Progress of every batch.
+  returned: always
+  type: complex
+  contains:
+    instance_ids:
+      description:
+        - Instance IDs in the batch.
+      returned: always
+      type: list
+      sample: ["0", "1"]
+    status:
+      description:
+        - Status of the batch, C(Succeeded), C(Failed) or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds the batch took to complete.
+      returned: always
+      type: float
+      sample: 93.4
+    error:
+      description:
+        - Error message if the batch failed.
+      returned: when batch failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds the whole action took to complete.
+  returned: always
+  type: float
+  sample: 187.2
+'''
+
+import time
+import threading
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+class AzureRMVirtualMachineScaleSetInstanceAction(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            vmss_name=dict(
+                type='str',
+                required=True
+            ),
+            action=dict(
+                type='str',
+                required=True,
+                choices=['reimage', 'upgrade', 'restart', 'start', 'power_off', 'deallocate']
+            ),
+            instance_ids=dict(
+                type='list'
+            ),
+            only_outdated=dict(
+                type='bool',
+                default=False
+            ),
+            batch_size=dict(
+                type='int',
+                default=20
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=5
+            )
+        )
+
+        self.resource_group = None
+        self.vmss_name = None
+        self.action = None
+        self.instance_ids = None
+        self.only_outdated = None
+        self.batch_size = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+        self.lock = threading.Lock()
+        self.completed = 0
+
+        super(AzureRMVirtualMachineScaleSetInstanceAction, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                                          supports_check_mode=True,
+                                                                          supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        if self.batch_size < 1:
+            self.fail("Parameter error: batch_size must be greater than 0.")
+
+        instance_ids = self.select_instances()
+        batches = [dict(instance_ids=instance_ids[i:i + self.batch_size], status='Pending')
+                   for i in range(0, len(instance_ids), self.batch_size)]
+
+        self.results['instance_ids'] = instance_ids
+        self.results['batches'] = batches
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(instance_ids) > 0
+
+        if self.check_mode or not instance_ids:
+            return self.results
+
+        # make sure the client is created before it's shared by worker threads
+        self.compute_client
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.run_batch, batches, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for batch, (elapsed, exc) in zip(batches, outcomes):
+            if exc is not None:
+                batch['status'] = 'Failed'
+                batch['error'] = str(exc)
+                failed.extend(batch['instance_ids'])
+            else:
+                batch['status'] = 'Succeeded'
+                batch['elapsed'] = elapsed
+
+        if failed:
+            self.fail("Error running {0} on instances {1} of virtual machine scale set {2}".format(self.action,
+                                                                                                   ', '.join(failed),
+                                                                                                   self.vmss_name),
+                      **self.results)
+
+        return self.results
+
+    def select_instances(self):
+        if self.instance_ids is not None and not self.only_outdated:
+            return [str(x) for x in self.instance_ids]
+
+        try:
+            vms = self.compute_client.virtual_machine_scale_set_vms.list(self.resource_group, self.vmss_name)
+            vms = list(vms)
+        except CloudError as exc:
+            self.fail("Error listing instances of virtual machine scale set {0} - {1}".format(self.vmss_name, str(exc)))
+
+        requested = set(str(x) for x in self.instance_ids) if self.instance_ids is not None else None
+        instance_ids = []
+        for vm in vms:
+            if requested is not None and vm.instance_id not in requested:
+                continue
+            if self.only_outdated and vm.latest_model_applied:
+                continue
+            instance_ids.append(vm.instance_id)
+        return instance_ids
+
+    def run_batch(self, batch):
+        start = time.time()
+        instance_ids = batch['instance_ids']
+        operations = self.compute_client.virtual_machine_scale_sets
+
+        if self.action == 'reimage':
+            poller = operations.reimage(self.resource_group,
+                                        self.vmss_name,
+                                        vm_scale_set_reimage_input=self.compute_models.VirtualMachineScaleSetReimageParameters(
+                                            instance_ids=instance_ids))
+        elif self.action == 'upgrade':
+            poller = operations.update_instances(self.resource_group, self.vmss_name, instance_ids)
+        elif self.action == 'restart':
+            poller = operations.restart(self.resource_group, self.vmss_name, instance_ids=instance_ids)
+        elif self.action == 'start':
+            poller = operations.start(self.resource_group, self.vmss_name, instance_ids=instance_ids)
+        elif self.action == 'power_off':
+            poller = operations.power_off(self.resource_group, self.vmss_name, instance_ids=instance_ids)
+        else:
+            poller = operations.deallocate(self.resource_group, self.vmss_name, instance_ids=instance_ids)
+
+        self.get_poller_result(poller)
+        elapsed = time.time() - start
+
+        with self.lock:
+            self.completed += len(instance_ids)
+            self.log("Finished {0} of instances {1} in {2:.1f}s, {3}/{4} instances done".format(self.action,
+                                                                                                ', '.join(instance_ids),
+                                                                                                elapsed,
+                                                                                                self.completed,
+                                                                                                len(self.results['instance_ids'])))
+        return elapsed
+
+
+def main():
+    AzureRMVirtualMachineScaleSetInstanceAction()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+
+
+MANAGEMENT_GROUP_TYPE = '/providers/Microsoft.Management/managementGroups'
+
+
+class ManagementGroupTree(object):
+    '''
+    Index of a management group hierarchy, answers parent / child queries without further requests.
+
+    Nodes are dicts with id, name, type, display_name, parent and depth, keyed by lower case name.
+    '''
+
+    def __init__(self, root):
+        self.nodes = {}
+        self.children = {}
+        self.root = self.add(root['id'],
+                             root['name'],
+                             root.get('type', MANAGEMENT_GROUP_TYPE),
+                             root.get('properties', {}).get('displayName'),
+                             None,
+                             0)
+        # walk iteratively, hierarchies can be deeper than comfortable for recursion
+        pending = [(root['name'], root.get('properties', {}).get('children'), 1)]
+        while pending:
+            parent, children, depth = pending.pop()
+            for child in children or []:
+                self.add(child['id'], child['name'], child.get('type'), child.get('displayName'), parent, depth)
+                pending.append((child['name'], child.get('children'), depth + 1))
+
+    @classmethod
+    def fetch(cls, client, group_id, api_version='2018-03-01-preview'):
+        '''
+        Get the whole hierarchy under a management group with a single request.
+
+        :param client: GenericRestClient
+        :param group_id: name of the top management group, tenant ID for the tenant root group
+        '''
+        response = client.query('/providers/Microsoft.Management/managementGroups/' + group_id,
+                                'GET',
+                                {'api-version': api_version, '$expand': 'children', '$recurse': 'true'},
+                                None,
+                                None,
+                                [200],
+                                0,
+                                0)
+        return cls(json.loads(response.text))
+
+    def add(self, id, name, type, display_name, parent, depth):
+        node = dict(id=id,
+                    name=name,
+                    type=type,
+                    display_name=display_name,
+                    parent=parent,
+                    depth=depth)
+        self.nodes[name.lower()] = node
+        self.children.setdefault(name.lower(), [])
+        if parent is not None:
+            self.children[parent.lower()].append(name)
+        return node
+
+    def get(self, name):
+        return self.nodes.get(name.lower()) if name else None
+
+    def is_subscription(self, name):
+        node = self.get(name)
+        return node is not None and is_subscription_type(node['type'])
+
+    def ancestors(self, name):
+        '''
+        Return names of groups above a node, nearest first.
+        '''
+        result = []
+        node = self.get(name)
+        while node is not None and node['parent'] is not None:
+            result.append(node['parent'])
+            node = self.get(node['parent'])
+        return result
+
+    def descendants(self, name, include_subscriptions=True):
+        '''
+        Return names of all nodes below a node, breadth first.
+        '''
+        result = []
+        pending = list(self.children.get(name.lower(), []))
+        while pending:
+            child = pending.pop(0)
+            if include_subscriptions or not self.is_subscription(child):
+                result.append(child)
+            pending.extend(self.children.get(child.lower(), []))
+        return result
+
+    def is_descendant(self, name, ancestor):
+        return ancestor.lower() in [x.lower() for x in self.ancestors(name)]
+
+    def subscriptions(self):
+        return [x for x in self.nodes.values() if is_subscription_type(x['type'])]
+
+    def groups(self):
+        return [x for x in self.nodes.values() if not is_subscription_type(x['type'])]
+
+
+def is_subscription_type(type):
+    # older api versions return /subscriptions, newer Microsoft.Management/managementGroups/subscriptions
+    return (type or '').lower().endswith('subscriptions')
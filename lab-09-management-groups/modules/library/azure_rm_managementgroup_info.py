@@ -0,0 +1,182 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_managementgroup_info
+version_added: '2.9'
+short_description: Get Azure Management Group hierarchy.
+description:
+  - 'Get the whole hierarchy of Azure Management Groups and subscriptions below a management group.'
+  - The hierarchy is read with a single request, ancestor and descendant queries are answered from it.
+options:
+  group_id:
+    description:
+      - ID of the top management group of the hierarchy.
+      - Use tenant ID for the tenant root group.
+    required: true
+    type: str
+  name:
+    description:
+      - Name of a management group or subscription ID in the hierarchy.
+      - If specified, its ancestors and descendants are returned.
+    type: str
+  include_subscriptions:
+    description:
+      - Include subscriptions in returned lists.
+    type: bool
+    default: true
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Get whole hierarchy of the tenant
+  azure_rm_managementgroup_info:
+    group_id: "{{ lookup('env', 'AZURE_TENANT') }}"
+
+- name: Get groups and subscriptions below a management group
+  azure_rm_managementgroup_info:
+    group_id: "{{ lookup('env', 'AZURE_TENANT') }}"
+    name: ChildGroup
+'''
+
+RETURN = '''
+management_groups:
+  description:
+    - All management groups and subscriptions in the hierarchy, top first.
+  returned: always
+  type: complex
+  contains:
+    id:
+      description:
+        - The fully qualified ID.
+      returned: always
+      type: str
+      sample: /providers/Microsoft.Management/managementGroups/ChildGroup
+    name:
+      description:
+        - Name of the management group or subscription ID.
+      returned: always
+      type: str
+      sample: ChildGroup
+    type:
+      description:
+        - Type of the node.
+      returned: always
+      type: str
+      sample: /providers/Microsoft.Management/managementGroups
+    display_name:
+      description:
+        - The friendly name.
+      returned: always
+      type: str
+      sample: Child Group
+    parent:
+      description:
+        - Name of the parent management group.
+      returned: always
+      type: str
+      sample: RootGroup
+    depth:
+      description:
+        - Distance from I(group_id).
+      returned: always
+      type: int
+      sample: 1
+ancestors:
+  description:
+    - Names of management groups above I(name), nearest first.
+  returned: when name is specified
+  type: list
+  sample: ["ParentGroup", "RootGroup"]
+descendants:
+  description:
+    - Names of management groups and subscriptions below I(name).
+  returned: when name is specified
+  type: list
+  sample: ["GrandChildGroup", "00000000-0000-0000-0000-000000000000"]
+'''
+
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+from ansible.module_utils.azure_rm_managementgroup_tree import ManagementGroupTree
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+class AzureRMManagementGroupInfo(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            group_id=dict(
+                type='str',
+                required=True
+            ),
+            name=dict(
+                type='str'
+            ),
+            include_subscriptions=dict(
+                type='bool',
+                default=True
+            )
+        )
+
+        self.group_id = None
+        self.name = None
+        self.include_subscriptions = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+
+        super(AzureRMManagementGroupInfo, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                         supports_check_mode=True,
+                                                         supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        try:
+            tree = ManagementGroupTree.fetch(self.mgmt_client, self.group_id)
+        except CloudError as exc:
+            self.fail("Error getting hierarchy of management group {0} - {1}".format(self.group_id, str(exc)))
+
+        nodes = tree.groups() + (tree.subscriptions() if self.include_subscriptions else [])
+        self.results['management_groups'] = sorted(nodes, key=lambda x: (x['depth'], x['name']))
+
+        if self.name is not None:
+            if tree.get(self.name) is None:
+                self.fail("{0} not found in hierarchy of management group {1}".format(self.name, self.group_id))
+            self.results['ancestors'] = tree.ancestors(self.name)
+            self.results['descendants'] = tree.descendants(self.name, self.include_subscriptions)
+
+        return self.results
+
+
+def main():
+    AzureRMManagementGroupInfo()
+
+
+if __name__ == '__main__':
+    main()
@@ -24,7 +24,25 @@ options:
   group_id:
     description:
       - Management Group ID.
-    required: true
+      - Required unless I(subscriptions) is specified.
+  subscriptions:
+    description:
+      - Bulk mode, mapping of subscription IDs to management group IDs.
+      - >-
+        Current placement of all subscriptions is read once from the hierarchy below I(root_group_id)
+        and only subscriptions not in their target group are moved, several at the same time.
+      - With I(state=absent), subscriptions are removed from the mapped group if they are in it.
+    type: dict
+  root_group_id:
+    description:
+      - Top management group of the hierarchy used in bulk mode.
+      - Defaults to the tenant root group.
+    type: str
+  max_concurrency:
+    description:
+      - Maximum number of subscriptions moved at the same time in bulk mode.
+    type: int
+    default: 10
   state:
     description:
       - Assert the state of the ManagementGroupSubscription.
@@ -50,11 +68,64 @@ EXAMPLES = '''
   azure_rm_managementgroupsubscription:
     group_id: myManagementGroup
     state: absent
+- name: Place many subscriptions at once
+  azure_rm_managementgroupsubscription:
+    subscriptions:
+      00000000-0000-0000-0000-000000000001: Production
+      00000000-0000-0000-0000-000000000002: Production
+      00000000-0000-0000-0000-000000000003: Sandbox
+    max_concurrency: 20
 
 '''
 
 RETURN = '''
-{}
+subscriptions:
+  description:
+    - Result for every subscription in bulk mode.
+  returned: when subscriptions is specified
+  type: complex
+  contains:
+    subscription_id:
+      description:
+        - Subscription ID.
+      returned: always
+      type: str
+      sample: 00000000-0000-0000-0000-000000000001
+    group_id:
+      description:
+        - Target management group.
+      returned: always
+      type: str
+      sample: Production
+    previous_group_id:
+      description:
+        - Management group the subscription was in.
+      returned: always
+      type: str
+      sample: Sandbox
+    status:
+      description:
+        - C(Unchanged), C(Succeeded), C(Failed) or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds the move took.
+      returned: when moved
+      type: float
+      sample: 8.1
+    error:
+      description:
+        - Error message if the move failed.
+      returned: when move failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds all moves took.
+  returned: when subscriptions is specified
+  type: float
+  sample: 42.3
 
 '''
 
@@ -63,6 +134,7 @@ import json
 import re
 from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+from ansible.module_utils.azure_rm_managementgroup_tree import ManagementGroupTree
 from copy import deepcopy
 from msrestazure.azure_exceptions import CloudError
 
@@ -77,8 +149,17 @@ class AzureRMManagementGroupSubscriptions(AzureRMModuleBaseExt):
             group_id=dict(
                 type='str',
                 updatable=False,
-                disposition='groupId',
-                required=True
+                disposition='groupId'
+            ),
+            subscriptions=dict(
+                type='dict'
+            ),
+            root_group_id=dict(
+                type='str'
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
             ),
             state=dict(
                 type='str',
@@ -88,6 +169,9 @@ class AzureRMManagementGroupSubscriptions(AzureRMModuleBaseExt):
         )
 
         self.group_id = None
+        self.subscriptions = None
+        self.root_group_id = None
+        self.max_concurrency = None
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -121,6 +205,11 @@ class AzureRMManagementGroupSubscriptions(AzureRMModuleBaseExt):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
+        if self.subscriptions is not None:
+            return self.exec_bulk()
+        if self.group_id is None:
+            self.fail("Parameter error: either group_id or subscriptions must be specified.")
+
         self.url = ('/providers' +
                     '/Microsoft.Management' +
                     '/managementGroups' +
@@ -184,6 +273,77 @@ class AzureRMManagementGroupSubscriptions(AzureRMModuleBaseExt):
 
         return self.results
 
+    def exec_bulk(self):
+        root_group_id = self.root_group_id or self.azure_auth.credentials.get('tenant')
+        if not root_group_id:
+            self.fail("Parameter error: root_group_id is required when tenant is not known.")
+        try:
+            tree = ManagementGroupTree.fetch(self.mgmt_client, root_group_id, self.query_parameters['api-version'])
+        except CloudError as exc:
+            self.fail("Error getting hierarchy of management group {0} - {1}".format(root_group_id, str(exc)))
+
+        items = []
+        for subscription_id, group_id in sorted(self.subscriptions.items()):
+            node = tree.get(group_id)
+            if node is None or tree.is_subscription(group_id):
+                self.fail("Management group {0} not found in hierarchy of {1}".format(group_id, root_group_id))
+            current = tree.get(subscription_id)
+            previous = current['parent'] if current is not None else None
+            in_group = previous is not None and previous.lower() == group_id.lower()
+            item = dict(subscription_id=subscription_id,
+                        group_id=node['name'],
+                        previous_group_id=previous,
+                        status='Pending')
+            if in_group == (self.state == 'present'):
+                item['status'] = 'Unchanged'
+            items.append(item)
+
+        pending = [x for x in items if x['status'] == 'Pending']
+        self.results['subscriptions'] = items
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(pending) > 0
+
+        if self.check_mode or not pending:
+            return self.results
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.move_subscription, pending, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for item, (elapsed, exc) in zip(pending, outcomes):
+            if exc is not None:
+                item['status'] = 'Failed'
+                item['error'] = str(exc)
+                failed.append(item['subscription_id'])
+            else:
+                item['status'] = 'Succeeded'
+                item['elapsed'] = elapsed
+
+        if failed:
+            self.fail("Error placing subscriptions {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def move_subscription(self, item):
+        '''
+        Add subscription to, or remove it from, a management group. Runs on a worker thread.
+        '''
+        start = time.time()
+        url = ('/providers/Microsoft.Management/managementGroups/' + item['group_id'] +
+               '/subscriptions/' + item['subscription_id'])
+        method = 'PUT' if self.state == 'present' else 'DELETE'
+        self.retry_throttled(self.mgmt_client.query,
+                             url,
+                             method,
+                             self.query_parameters,
+                             self.header_parameters,
+                             None,
+                             self.status_code + [204],
+                             600,
+                             30)
+        return time.time() - start
+
     def create_update_resource(self):
         # self.log('Creating / Updating the ManagementGroupSubscription instance {0}'.format(self.))
 
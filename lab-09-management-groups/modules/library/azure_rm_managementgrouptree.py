@@ -0,0 +1,365 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_managementgrouptree
+version_added: '2.9'
+short_description: Reconcile Azure Management Group hierarchy.
+description:
+  - 'Create, move and delete Azure Management Groups to match a desired hierarchy.'
+  - >-
+    Live hierarchy is read with a single request. Groups are created and moved level by level from the top,
+    groups on the same level at the same time. Deleted groups are removed from the bottom up.
+options:
+  root_group_id:
+    description:
+      - Top management group of the hierarchy.
+      - Defaults to the tenant root group.
+    type: str
+  groups:
+    description:
+      - Desired management groups below I(root_group_id).
+    required: true
+    type: list
+    suboptions:
+      name:
+        description:
+          - Management group ID.
+        required: true
+        type: str
+      display_name:
+        description:
+          - The friendly name of the management group.
+          - Defaults to I(name) for new groups, not compared for existing groups when omitted.
+        type: str
+      parent:
+        description:
+          - Management group ID of the parent group.
+          - Defaults to I(root_group_id).
+        type: str
+  purge:
+    description:
+      - Delete management groups below I(root_group_id) which are not in I(groups).
+      - Subscriptions have to be moved out of deleted groups first, see M(azure_rm_managementgroupsubscription).
+    type: bool
+    default: false
+  max_concurrency:
+    description:
+      - Maximum number of management groups changed at the same time.
+    type: int
+    default: 10
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Landing zone hierarchy
+  azure_rm_managementgrouptree:
+    groups:
+      - name: Contoso
+        display_name: Contoso
+      - name: Platform
+        parent: Contoso
+      - name: LandingZones
+        display_name: Landing Zones
+        parent: Contoso
+      - name: Corp
+        parent: LandingZones
+      - name: Online
+        parent: LandingZones
+      - name: Sandbox
+        parent: Contoso
+'''
+
+RETURN = '''
+actions:
+  description:
+    - Changes applied to the hierarchy, in order.
+  returned: always
+  type: complex
+  contains:
+    name:
+      description:
+        - Management group ID.
+      returned: always
+      type: str
+      sample: Corp
+    action:
+      description:
+        - C(create), C(update) or C(delete).
+      returned: always
+      type: str
+      sample: create
+    parent:
+      description:
+        - Desired parent management group.
+      returned: when action is create or update
+      type: str
+      sample: LandingZones
+    level:
+      description:
+        - Step the change was applied in, changes with the same level are applied at the same time.
+      returned: always
+      type: int
+      sample: 2
+    status:
+      description:
+        - C(Succeeded), C(Failed), C(Skipped) when an earlier level failed or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds the change took.
+      returned: when applied
+      type: float
+      sample: 14.2
+    error:
+      description:
+        - Error message if the change failed.
+      returned: when change failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds all changes took.
+  returned: always
+  type: float
+  sample: 61.5
+'''
+
+import time
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+from ansible.module_utils.azure_rm_managementgroup_tree import ManagementGroupTree, MANAGEMENT_GROUP_TYPE
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+group_spec = dict(
+    name=dict(
+        type='str',
+        required=True
+    ),
+    display_name=dict(
+        type='str'
+    ),
+    parent=dict(
+        type='str'
+    )
+)
+
+
+class AzureRMManagementGroupTree(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            root_group_id=dict(
+                type='str'
+            ),
+            groups=dict(
+                type='list',
+                elements='dict',
+                options=group_spec,
+                required=True
+            ),
+            purge=dict(
+                type='bool',
+                default=False
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            )
+        )
+
+        self.root_group_id = None
+        self.groups = None
+        self.purge = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.status_code = [200, 201, 202, 204]
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2018-03-01-preview'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMManagementGroupTree, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                         supports_check_mode=True,
+                                                         supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        self.root_group_id = self.root_group_id or self.azure_auth.credentials.get('tenant')
+        if not self.root_group_id:
+            self.fail("Parameter error: root_group_id is required when tenant is not known.")
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        try:
+            tree = ManagementGroupTree.fetch(self.mgmt_client, self.root_group_id, self.query_parameters['api-version'])
+        except CloudError as exc:
+            self.fail("Error getting hierarchy of management group {0} - {1}".format(self.root_group_id, str(exc)))
+
+        actions = self.plan(tree)
+        self.results['actions'] = actions
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(actions) > 0
+
+        if self.check_mode or not actions:
+            return self.results
+
+        start = time.time()
+        failed = []
+        for level in sorted(set(x['level'] for x in actions)):
+            batch = [x for x in actions if x['level'] == level]
+            if failed:
+                for action in batch:
+                    action['status'] = 'Skipped'
+                continue
+            outcomes = self.run_concurrently(self.apply, batch, self.max_concurrency)
+            for action, (elapsed, exc) in zip(batch, outcomes):
+                if exc is not None:
+                    action['status'] = 'Failed'
+                    action['error'] = str(exc)
+                    failed.append(action['name'])
+                else:
+                    action['status'] = 'Succeeded'
+                    action['elapsed'] = elapsed
+        self.results['elapsed'] = time.time() - start
+
+        if failed:
+            self.fail("Error changing management groups {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def plan(self, tree):
+        '''
+        Compute ordered changes turning the live hierarchy into the desired one.
+
+        Creates and moves get level of the group in the desired hierarchy, so every parent is in place
+        before its children. Deletes follow, deepest groups first.
+        '''
+        root = tree.root['name']
+        desired = {}
+        for group in self.groups:
+            key = group['name'].lower()
+            if key == root.lower():
+                self.fail("Parameter error: {0} is the root of the hierarchy.".format(group['name']))
+            if key in desired:
+                self.fail("Parameter error: management group {0} specified more than once.".format(group['name']))
+            desired[key] = dict(group, parent=group['parent'] or root)
+
+        # level in the desired hierarchy, walking up parents also detects cycles
+        levels = {}
+        for key in desired:
+            chain = []
+            current = key
+            while current in desired and current not in levels:
+                if current in chain:
+                    self.fail("Parameter error: management groups {0} form a cycle.".format(', '.join(desired[x]['name'] for x in chain)))
+                chain.append(current)
+                parent = desired[current]['parent']
+                if parent.lower() not in desired:
+                    if parent.lower() != root.lower() and (self.purge or tree.get(parent) is None or tree.is_subscription(parent)):
+                        self.fail("Parameter error: parent {0} of management group {1} not found.".format(parent, desired[current]['name']))
+                    levels[current] = 1
+                    chain.pop()
+                    break
+                current = parent.lower()
+            base = levels.get(current, 0)
+            for x in reversed(chain):
+                base += 1
+                levels[x] = base
+
+        actions = []
+        for key, group in desired.items():
+            node = tree.get(group['name'])
+            if node is not None and tree.is_subscription(group['name']):
+                self.fail("Parameter error: {0} is a subscription.".format(group['name']))
+            if node is None:
+                action = 'create'
+            elif ((node['parent'] or '').lower() != group['parent'].lower() or
+                    (group['display_name'] is not None and group['display_name'] != node['display_name'])):
+                action = 'update'
+            else:
+                continue
+            actions.append(dict(name=group['name'],
+                                action=action,
+                                parent=group['parent'],
+                                display_name=group['display_name'] or (node or {}).get('display_name') or group['name'],
+                                level=levels[key],
+                                status='Pending'))
+
+        if self.purge:
+            top = max([x['level'] for x in actions] or [0])
+            deepest = max([x['depth'] for x in tree.groups()] or [0])
+            for node in tree.groups():
+                if node['parent'] is None or node['name'].lower() in desired:
+                    continue
+                actions.append(dict(name=node['name'],
+                                    action='delete',
+                                    level=top + 1 + deepest - node['depth'],
+                                    status='Pending'))
+
+        return sorted(actions, key=lambda x: (x['level'], x['name']))
+
+    def apply(self, action):
+        '''
+        Apply a single change. Runs on a worker thread.
+        '''
+        start = time.time()
+        url = MANAGEMENT_GROUP_TYPE + '/' + action['name']
+        if action['action'] == 'delete':
+            self.mgmt_client.query(url,
+                                   'DELETE',
+                                   self.query_parameters,
+                                   self.header_parameters,
+                                   None,
+                                   self.status_code,
+                                   600,
+                                   30)
+        else:
+            body = dict(name=action['name'],
+                        properties=dict(displayName=action['display_name'],
+                                        details=dict(parent=dict(id=MANAGEMENT_GROUP_TYPE + '/' + action['parent']))))
+            self.mgmt_client.query(url,
+                                   'PUT',
+                                   self.query_parameters,
+                                   self.header_parameters,
+                                   body,
+                                   self.status_code,
+                                   600,
+                                   30)
+        return time.time() - start
+
+
+def main():
+    AzureRMManagementGroupTree()
+
+
+if __name__ == '__main__':
+    main()
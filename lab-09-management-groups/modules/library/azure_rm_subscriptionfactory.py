@@ -57,6 +57,53 @@ options:
   subscription_link:
     description:
       - The link to the new subscription.
+  subscriptions:
+    description:
+      - Batch mode, list of subscriptions to create.
+      - >-
+        All creation requests are submitted at the same time and tracked until completion,
+        I(display_name), I(owners), I(offer_type) and I(additional_parameters) are ignored.
+    type: list
+    suboptions:
+      display_name:
+        description:
+          - The display name of the subscription.
+        required: true
+        type: str
+      enrollment_account_name:
+        description:
+          - The name of the enrollment account, defaults to I(enrollment_account_name).
+        type: str
+      owners:
+        description:
+          - List of principals granted Owner access on the subscription.
+        type: list
+        suboptions:
+          object_id:
+            description:
+              - Object id of the Principal
+            required: true
+      offer_type:
+        description:
+          - The offer type of the subscription.
+        type: str
+        choices:
+          - MS-AZR-0017P
+          - MS-AZR-0148P
+      additional_parameters:
+        description:
+          - Additional, untyped parameters.
+        type: raw
+  max_concurrency:
+    description:
+      - Maximum number of creation requests submitted or polled at the same time in batch mode.
+    type: int
+    default: 10
+  timeout:
+    description:
+      - Maximum time in seconds to wait for subscriptions created in batch mode.
+    type: int
+    default: 3600
   state:
     description:
       - Assert the state of the SubscriptionFactory.
@@ -87,6 +134,18 @@ EXAMPLES = '''
         customData:
           key1: value1
           key2: true
+- name: Create subscriptions for all teams
+  azure_rm_subscriptionfactory:
+    enrollment_account_name: myEnrollmentAccount
+    subscriptions:
+      - display_name: Team A Production
+        offer_type: MS-AZR-0017P
+        owners:
+          - object_id: 973034ff-acb7-409c-b731-e789672c7b31
+      - display_name: Team A Dev/Test
+        offer_type: MS-AZR-0148P
+        owners:
+          - object_id: 973034ff-acb7-409c-b731-e789672c7b31
 '''
 
 RETURN = '''
@@ -96,6 +155,53 @@ subscription_link:
   returned: always
   type: str
   sample: null
+subscriptions:
+  description:
+    - Result for every subscription in batch mode.
+  returned: when subscriptions is specified
+  type: complex
+  contains:
+    display_name:
+      description:
+        - The display name of the subscription.
+      returned: always
+      type: str
+      sample: Team A Production
+    subscription_id:
+      description:
+        - ID of the new subscription.
+      returned: when succeeded
+      type: str
+      sample: 00000000-0000-0000-0000-000000000000
+    subscription_link:
+      description:
+        - The link to the new subscription.
+      returned: when succeeded
+      type: str
+      sample: /subscriptions/00000000-0000-0000-0000-000000000000
+    status:
+      description:
+        - C(Succeeded), C(Failed), C(InProgress) after timeout or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds until the subscription was created.
+      returned: when succeeded
+      type: float
+      sample: 312.5
+    error:
+      description:
+        - Error message if creation failed.
+      returned: when failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds all subscriptions took to create.
+  returned: when subscriptions is specified
+  type: float
+  sample: 354.0
 
 '''
 
@@ -112,6 +218,11 @@ class Actions:
     NoAction, Create, Update, Delete = range(4)
 
 
+MIN_POLL_INTERVAL = 15
+
+MAX_POLL_INTERVAL = 120
+
+
 class AzureRMSubscriptionFactory(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
@@ -149,6 +260,45 @@ class AzureRMSubscriptionFactory(AzureRMModuleBaseExt):
                 updatable=False,
                 disposition='/additionalParameters'
             ),
+            subscriptions=dict(
+                type='list',
+                elements='dict',
+                options=dict(
+                    display_name=dict(
+                        type='str',
+                        required=True
+                    ),
+                    enrollment_account_name=dict(
+                        type='str'
+                    ),
+                    owners=dict(
+                        type='list',
+                        elements='dict',
+                        options=dict(
+                            object_id=dict(
+                                type='str',
+                                required=True
+                            )
+                        )
+                    ),
+                    offer_type=dict(
+                        type='str',
+                        choices=['MS-AZR-0017P',
+                                 'MS-AZR-0148P']
+                    ),
+                    additional_parameters=dict(
+                        type='raw'
+                    )
+                )
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            ),
+            timeout=dict(
+                type='int',
+                default=3600
+            ),
             state=dict(
                 type='str',
                 default='present',
@@ -158,6 +308,9 @@ class AzureRMSubscriptionFactory(AzureRMModuleBaseExt):
 
         self.enrollment_account_name = None
         self.subscription_link = None
+        self.subscriptions = None
+        self.max_concurrency = None
+        self.timeout = None
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -199,6 +352,9 @@ class AzureRMSubscriptionFactory(AzureRMModuleBaseExt):
                     '/createSubscription')
         self.url = self.url.replace('{{ enrollment_account_name }}', self.enrollment_account_name)
 
+        if self.subscriptions is not None:
+            return self.exec_batch()
+
         if self.check_mode:
             self.results['changed'] = True
             return self.results
@@ -211,6 +367,99 @@ class AzureRMSubscriptionFactory(AzureRMModuleBaseExt):
 
         return self.results
 
+    def exec_batch(self):
+        items = [dict(display_name=x['display_name'], status='Pending') for x in self.subscriptions]
+        self.results['subscriptions'] = items
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(items) > 0
+
+        if self.check_mode or not items:
+            return self.results
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.submit_subscription, self.subscriptions, self.max_concurrency)
+        pending = []
+        for item, (response, exc) in zip(items, outcomes):
+            if exc is not None:
+                item['status'] = 'Failed'
+                item['error'] = str(exc)
+            elif response.status_code == 202:
+                item['status'] = 'InProgress'
+                item['location_url'] = response.headers.get('Location')
+                pending.append(item)
+            else:
+                self.complete_subscription(item, json.loads(response.text), start)
+
+        # poll often while subscriptions keep completing, back off while nothing happens
+        delay = MIN_POLL_INTERVAL
+        while pending and time.time() - start < self.timeout:
+            time.sleep(delay)
+            outcomes = self.run_concurrently(self.poll_subscription, pending, self.max_concurrency)
+            still_pending = []
+            for item, (response, exc) in zip(pending, outcomes):
+                if exc is not None:
+                    item['status'] = 'Failed'
+                    item['error'] = str(exc)
+                elif response.status_code == 202:
+                    still_pending.append(item)
+                else:
+                    self.complete_subscription(item, json.loads(response.text), start)
+            delay = MIN_POLL_INTERVAL if len(still_pending) < len(pending) else min(delay * 2, MAX_POLL_INTERVAL)
+            pending = still_pending
+
+        self.results['elapsed'] = time.time() - start
+        for item in items:
+            item.pop('location_url', None)
+
+        failed = [x['display_name'] for x in items if x['status'] != 'Succeeded']
+        if failed:
+            self.fail("Error creating subscriptions {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def submit_subscription(self, subscription):
+        '''
+        Submit creation of a single subscription. Runs on a worker thread.
+        '''
+        body = dict(displayName=subscription['display_name'])
+        if subscription['owners'] is not None:
+            body['owners'] = [dict(objectId=x['object_id']) for x in subscription['owners']]
+        if subscription['offer_type'] is not None:
+            body['offerType'] = subscription['offer_type']
+        if subscription['additional_parameters'] is not None:
+            body['additionalParameters'] = subscription['additional_parameters']
+        url = self.url
+        if subscription['enrollment_account_name'] is not None:
+            url = url.replace('/' + self.enrollment_account_name + '/', '/' + subscription['enrollment_account_name'] + '/')
+        return self.mgmt_client.query(url,
+                                      'POST',
+                                      self.query_parameters,
+                                      self.header_parameters,
+                                      body,
+                                      self.status_code,
+                                      0,
+                                      0)
+
+    def poll_subscription(self, item):
+        '''
+        Get status of a subscription creation. Runs on a worker thread.
+        '''
+        return self.mgmt_client.query(item['location_url'],
+                                      'GET',
+                                      {},
+                                      None,
+                                      None,
+                                      [200, 202],
+                                      0,
+                                      0)
+
+    def complete_subscription(self, item, response, start):
+        link = response.get('subscriptionLink')
+        item['status'] = 'Succeeded'
+        item['subscription_link'] = link
+        item['subscription_id'] = link.split('/')[-1] if link else None
+        item['elapsed'] = time.time() - start
+
     def create_update_resource(self):
         # self.log('Creating / Updating the SubscriptionFactory instance {0}'.format(self.))
 
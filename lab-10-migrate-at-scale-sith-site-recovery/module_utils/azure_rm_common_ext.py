@@ -3,9 +3,31 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 from ansible.module_utils.azure_rm_common import AzureRMModuleBase
+import copy
+import json
+import os
 import re
+import time
+import uuid
 from ansible.module_utils.common.dict_transformations import _camel_to_snake, _snake_to_camel
 from ansible.module_utils.six import string_types
+from multiprocessing.pool import ThreadPool
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+ASYNC_OPERATIONS_DIR = os.path.join('~', '.ansible', 'azure_async')
+
+ASYNC_TERMINAL_STATES = ['Succeeded', 'Failed', 'Canceled']
+
+RESOURCE_GROUP_CACHE = os.path.join('~', '.ansible', 'azure_cache', 'resource_groups.json')
+
+RESOURCE_GROUP_CACHE_TTL = 3600
+
+THROTTLE_RETRIES = 4
 
 
 class AzureRMModuleBaseExt(AzureRMModuleBase):
@@ -200,3 +222,297 @@ class AzureRMModuleBaseExt(AzureRMModuleBase):
                     return True
             else:
                 return True
+
+    def create_patch(self, modifiers, new, old, path, result):
+        '''
+        Compute minimal patch turning "old" into "new".
+
+        Dictionaries are compared key by key and only differing values are kept, any other
+        value (including lists, which Azure replaces as a whole) is compared with default_compare
+        and taken from "new" completely when different. None values in "new" are ignored.
+
+        :param modifiers: Optional dictionary of modifiers, where key is the path and value is dict of modifiers
+        :param new: New version
+        :param old: Old version
+        :param path: Path of compared values
+        :param result: Dictionary with "compare" list, differences will be appended there
+        :return: patch, or None if there is no difference
+        '''
+        if new is None:
+            return None
+        if isinstance(new, dict) and isinstance(old, dict):
+            patch = {}
+            for key, value in new.items():
+                item = self.create_patch(modifiers, value, old.get(key), path + '/' + key, result)
+                if item is not None:
+                    patch[key] = item
+            return patch or None
+        if self.default_compare(modifiers, copy.deepcopy(new), old, path, result):
+            return None
+        return new
+
+    def run_concurrently(self, func, items, max_workers=10):
+        '''
+        Call func for every item using a bounded pool of worker threads.
+
+        Exceptions raised by func are captured per item, so one failing item doesn't abort
+        the whole batch. func must raise rather than call self.fail(), as failing the module
+        from a worker thread is not supported.
+
+        :param func: callable taking a single item
+        :param items: list of items to process
+        :param max_workers: maximum number of items processed at the same time
+        :return: list of (result, exception) tuples in the same order as items
+        '''
+        def call(item):
+            try:
+                return (func(item), None)
+            except Exception as exc:
+                return (None, exc)
+
+        if not items:
+            return []
+        pool = ThreadPool(max(1, min(max_workers, len(items))))
+        try:
+            return pool.map(call, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def retry_throttled(self, func, *args, **kwargs):
+        '''
+        Call func, retrying requests rejected by ARM throttling (HTTP 429).
+
+        Waits for the time given in Retry-After header, or doubles the wait starting at 5 seconds.
+        Safe to use from worker threads.
+        '''
+        delay = 5
+        for attempt in range(THROTTLE_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                if getattr(exc, 'status_code', None) != 429 or attempt == THROTTLE_RETRIES:
+                    raise
+                response = getattr(exc, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+            time.sleep(int(retry_after) if retry_after and retry_after.isdigit() else delay)
+            delay *= 2
+
+    def trim_obj(self, obj, fields):
+        '''
+        Return a shallow copy of a model without top level attributes which can't contain any
+        of the requested paths, so large parts of the model like instance views or extensions
+        are never serialized when they are not asked for. Required attributes are kept, as
+        serialization validates them.
+
+        :param obj: model object
+        :param fields: list of dotted paths in serialized form
+        :return: model object
+        '''
+        trimmed = copy.copy(obj)
+        validation = getattr(obj, '_validation', {})
+        for attr, spec in getattr(obj, '_attribute_map', {}).items():
+            if validation.get(attr, {}).get('required'):
+                continue
+            key = spec['key'].replace('\\.', '.')
+            if not any(self.paths_overlap(key, field) for field in fields):
+                setattr(trimmed, attr, None)
+        return trimmed
+
+    def paths_overlap(self, first, second):
+        '''
+        Check if one dotted path is the same as or a prefix of the other.
+        '''
+        first = first.split('.')
+        second = second.split('.')
+        length = min(len(first), len(second))
+        return first[:length] == second[:length]
+
+    def project_fields(self, value, fields):
+        '''
+        Return a copy of value containing only paths listed in fields.
+
+        Paths are dotted keys, lists on the way are projected item by item and paths missing
+        in value are ignored.
+
+        :param value: dict to project
+        :param fields: list of dotted paths
+        :return: projected dict
+        '''
+        tree = {}
+        for field in fields:
+            node = tree
+            parts = field.split('.')
+            for part in parts[:-1]:
+                child = node.get(part, {})
+                if child is None:
+                    break
+                node = node.setdefault(part, child)
+            else:
+                # None marks a path selected as a whole
+                node[parts[-1]] = None
+
+        def project(value, tree):
+            if tree is None:
+                return value
+            if isinstance(value, list):
+                return [project(item, tree) for item in value]
+            if not isinstance(value, dict):
+                return value
+            return dict((key, project(value[key], subtree)) for key, subtree in tree.items() if key in value)
+
+        if value is None:
+            return None
+        return project(value, tree)
+
+    def get_resource_group_location(self, resource_group):
+        '''
+        Return location of a resource group, only fetching the resource group when it's not
+        in the cache shared by all modules running on the controller.
+
+        :param resource_group: name of the resource group
+        :return: location name
+        '''
+        path = os.path.expanduser(RESOURCE_GROUP_CACHE)
+        key = '{0}/{1}'.format(self.subscription_id, resource_group.lower())
+
+        cache = {}
+        try:
+            with open(path) as f:
+                cache = json.load(f)
+        except (IOError, ValueError):
+            pass
+
+        entry = cache.get(key)
+        if entry and time.time() - entry['time'] < RESOURCE_GROUP_CACHE_TTL:
+            return entry['location']
+
+        location = self.get_resource_group(resource_group).location
+        cache[key] = dict(location=location, time=time.time())
+        try:
+            write_json_file(path, cache)
+        except (IOError, OSError) as exc:
+            self.log('Failed to update resource group cache - {0}'.format(str(exc)))
+        return location
+
+    def save_async_operation(self, response, resource_url, method, api_version):
+        '''
+        Persist a started long running operation to a state file, so it can be tracked
+        by azure_rm_asyncoperation after the module returned.
+
+        :param response: raw response of the request which started the operation
+        :param resource_url: URL of the resource the operation runs on
+        :param method: HTTP method which started the operation
+        :param api_version: API version of the resource
+        :return: dict describing the operation
+        '''
+        operation = dict(
+            id=str(uuid.uuid4()),
+            method=method,
+            resource_url=resource_url,
+            api_version=api_version,
+            status_url=response.headers.get('Azure-AsyncOperation'),
+            location_url=response.headers.get('Location'),
+            started=time.time(),
+            status='InProgress'
+        )
+        path = get_async_operation_path(operation['id'])
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump(operation, f)
+        operation['state_file'] = path
+        return operation
+
+    def update_async_operation(self, operation, forget=True):
+        '''
+        Write current status of an operation to its state file, remove the file of a finished operation if forget is set.
+        '''
+        path = get_async_operation_path(operation['id'])
+        if operation['status'] in ASYNC_TERMINAL_STATES and forget:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with open(path, 'w') as f:
+            json.dump(dict((k, v) for k, v in operation.items() if k not in ['elapsed', 'state_file']), f)
+
+    def find_async_operation(self, resource_url):
+        '''
+        Return the most recently started unfinished operation recorded for a resource, or None.
+        '''
+        directory = os.path.expanduser(ASYNC_OPERATIONS_DIR)
+        if not os.path.isdir(directory):
+            return None
+        found = None
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    operation = json.load(f)
+            except (IOError, ValueError):
+                continue
+            if (operation.get('resource_url', '').lower() != resource_url.lower() or
+                    operation.get('status') in ASYNC_TERMINAL_STATES):
+                continue
+            if found is None or operation['started'] > found['started']:
+                found = operation
+        if found is not None:
+            found['state_file'] = get_async_operation_path(found['id'])
+        return found
+
+    def get_async_operation_status(self, operation):
+        '''
+        Get current status of an operation using self.mgmt_client. Safe to use from worker threads.
+
+        :return: tuple of (status, error message or None)
+        '''
+        def query(url, query_parameters, status_code):
+            return self.mgmt_client.query(url, 'GET', query_parameters, None, None, status_code, 0, 0)
+
+        if operation.get('status_url'):
+            response = query(operation['status_url'], {}, [200])
+            body = json.loads(response.text)
+            error = body.get('error')
+            return (body.get('status'), error.get('message') if isinstance(error, dict) else error)
+
+        if operation.get('location_url'):
+            try:
+                response = query(operation['location_url'], {}, [200, 201, 202, 204])
+            except CloudError as exc:
+                return ('Failed', str(exc))
+            return ('InProgress' if response.status_code == 202 else 'Succeeded', None)
+
+        # no operation URL was returned, look at the resource itself
+        try:
+            response = query(operation['resource_url'], {'api-version': operation['api_version']}, [200])
+        except CloudError as exc:
+            if operation['method'] == 'DELETE' and exc.status_code == 404:
+                return ('Succeeded', None)
+            raise
+        if operation['method'] == 'DELETE':
+            return ('InProgress', None)
+        state = json.loads(response.text).get('properties', {}).get('provisioningState', 'Succeeded')
+        return (state if state in ASYNC_TERMINAL_STATES else 'InProgress', None)
+
+
+def get_async_operation_path(operation_id):
+    '''
+    Return path of the state file of an asynchronous operation.
+    '''
+    return os.path.join(os.path.expanduser(ASYNC_OPERATIONS_DIR), operation_id + '.json')
+
+
+def write_json_file(path, value):
+    '''
+    Write value to a JSON file, creating its directory if needed.
+
+    Writes to a uniquely named temporary file first, so concurrent tasks never read
+    a partial file or overwrite each other's temporary file.
+    '''
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    temp_path = '{0}.{1}'.format(path, uuid.uuid4())
+    with open(temp_path, 'w') as f:
+        json.dump(value, f)
+    os.rename(temp_path, path)
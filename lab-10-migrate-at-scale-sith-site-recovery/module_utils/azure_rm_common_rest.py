@@ -52,8 +52,8 @@ class GenericRestClient(object):
 
         request = None
 
-        if header_parameters is None:
-            header_parameters = {}
+        # copy, callers share header dicts between worker threads
+        header_parameters = dict(header_parameters or {})
 
         header_parameters['x-ms-client-request-id'] = str(uuid.uuid1())
 
@@ -95,3 +95,19 @@ class GenericRestClient(object):
             return poller.result()
         except Exception as exc:
             raise
+
+    def query_paged(self, url, query_parameters, header_parameters, expected_status_codes):
+        '''
+        Send GET request to a collection url and follow nextLink until all pages are read.
+
+        :return: list of items from all pages
+        '''
+        items = []
+        while url:
+            response = self.query(url, 'GET', query_parameters, header_parameters, None, expected_status_codes, 0, 0)
+            result = json.loads(response.text)
+            items.extend(result.get('value', []))
+            url = result.get('nextLink')
+            # nextLink already contains all query parameters
+            query_parameters = {}
+        return items
@@ -0,0 +1,553 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_recoveryservicesfailover
+version_added: '2.9'
+short_description: Run Azure Site Recovery failover of many protected items in waves.
+description:
+  - 'Run test failover, test failover cleanup, unplanned failover or commit of Azure Site Recovery protected items.'
+  - >-
+    Items are split into waves. Items of a wave are processed at the same time. The next wave starts
+    when all items of the previous wave finished and passed the health gate, see I(health_gate) and I(max_failures).
+  - Items which don't currently allow the operation are skipped.
+options:
+  resource_group:
+    description:
+      - The name of the resource group of the Recovery Services vault.
+    required: true
+    type: str
+  vault_name:
+    description:
+      - The name of the Recovery Services vault.
+    required: true
+    type: str
+  fabric_name:
+    description:
+      - Name or friendly name of the Site Recovery fabric, usually the name of the configuration server.
+    required: true
+    type: str
+  protection_container_name:
+    description:
+      - Name of the protection container in the fabric.
+      - Defaults to the first protection container of the fabric.
+    type: str
+  action:
+    description:
+      - Operation to run on the protected items.
+    required: true
+    type: str
+    choices:
+      - test_failover
+      - test_failover_cleanup
+      - unplanned_failover
+      - commit
+  items:
+    description:
+      - Names or friendly names of protected items.
+      - Either I(items) or I(src) is required.
+    type: list
+  src:
+    description:
+      - Path to a CSV file listing protected items in column C(protected_item_name) or C(source_machine_name).
+    type: path
+  dest:
+    description:
+      - Path to a CSV file the result of every item is written to.
+    type: path
+  network_id:
+    description:
+      - Resource ID of the virtual network test failover virtual machines are connected to.
+      - Required for I(action=test_failover).
+    type: str
+  wave_size:
+    description:
+      - Number of items in a wave.
+    type: int
+    default: 20
+  max_concurrency:
+    description:
+      - Maximum number of items of a wave processed at the same time.
+    type: int
+    default: 10
+  max_failures:
+    description:
+      - Stop starting new waves when more items than this failed or were found unhealthy by the health gate.
+    type: int
+    default: 0
+  health_gate:
+    description:
+      - >-
+        Before starting the next wave, read health of items of the previous wave and count items in
+        C(Critical) health as failed. Replication health is checked after I(action=test_failover) and
+        I(action=test_failover_cleanup), failover health after I(action=unplanned_failover) and I(action=commit).
+    type: bool
+    default: true
+  wave_pause:
+    description:
+      - Time in seconds to wait between waves, before the health gate, so health of failed over machines can settle.
+    type: int
+    default: 0
+  timeout:
+    description:
+      - Maximum time in seconds a single item may take.
+    type: int
+    default: 3600
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Test failover of all machines in waves of 50
+  azure_rm_recoveryservicesfailover:
+    resource_group: myResourceGroup
+    vault_name: myVault
+    fabric_name: myConfigurationServer
+    action: test_failover
+    src: migration.csv
+    dest: test-failover.csv
+    network_id: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Network/virtualNetworks/myTestVnet
+    wave_size: 50
+    max_concurrency: 25
+    max_failures: 5
+'''
+
+RETURN = '''
+items:
+  description:
+    - Result for every item.
+  returned: always
+  type: complex
+  contains:
+    name:
+      description:
+        - Name of the protected item.
+      returned: always
+      type: str
+      sample: myvm1
+    wave:
+      description:
+        - Wave the item was processed in.
+      returned: always
+      type: int
+      sample: 1
+    status:
+      description:
+        - C(Succeeded), C(Failed), C(Skipped), C(NotStarted) when stopped by the health gate or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    health:
+      description:
+        - Health of the item read by the health gate, C(Normal), C(Warning) or C(Critical).
+      returned: when checked by the health gate
+      type: str
+      sample: Normal
+    elapsed:
+      description:
+        - Time in seconds the operation of the item took.
+      returned: when processed
+      type: float
+      sample: 412.7
+    error:
+      description:
+        - Error message if the operation failed.
+      returned: when failed
+      type: str
+waves:
+  description:
+    - Result of every started wave.
+  returned: always
+  type: complex
+  contains:
+    wave:
+      description:
+        - Wave number.
+      returned: always
+      type: int
+      sample: 1
+    succeeded:
+      description:
+        - Number of items which succeeded.
+      returned: always
+      type: int
+      sample: 49
+    failed:
+      description:
+        - Number of items which failed.
+      returned: always
+      type: int
+      sample: 1
+    unhealthy:
+      description:
+        - Number of succeeded items found in C(Critical) health, or which couldn't be read, by the health gate.
+      returned: when checked by the health gate
+      type: int
+      sample: 0
+    elapsed:
+      description:
+        - Time in seconds the wave took.
+      returned: always
+      type: float
+      sample: 655.0
+elapsed:
+  description:
+    - Time in seconds all waves took.
+  returned: always
+  type: float
+  sample: 2731.4
+'''
+
+import csv
+import json
+import time
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+# REST operation, matching entry of allowedOperations and health checked by the health gate for every action
+OPERATIONS = dict(
+    test_failover=('testFailover', 'TestFailover', 'replicationHealth'),
+    test_failover_cleanup=('testFailoverCleanup', 'TestFailoverCleanup', 'replicationHealth'),
+    unplanned_failover=('unplannedFailover', 'UnplannedFailover', 'failoverHealth'),
+    commit=('failoverCommit', 'Commit', 'failoverHealth')
+)
+
+ITEM_COLUMNS = ['name', 'wave', 'status', 'health', 'elapsed', 'error']
+
+
+class AzureRMRecoveryServicesFailover(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            vault_name=dict(
+                type='str',
+                required=True
+            ),
+            fabric_name=dict(
+                type='str',
+                required=True
+            ),
+            protection_container_name=dict(
+                type='str'
+            ),
+            action=dict(
+                type='str',
+                required=True,
+                choices=['test_failover', 'test_failover_cleanup', 'unplanned_failover', 'commit']
+            ),
+            items=dict(
+                type='list'
+            ),
+            src=dict(
+                type='path'
+            ),
+            dest=dict(
+                type='path'
+            ),
+            network_id=dict(
+                type='str'
+            ),
+            wave_size=dict(
+                type='int',
+                default=20
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            ),
+            max_failures=dict(
+                type='int',
+                default=0
+            ),
+            health_gate=dict(
+                type='bool',
+                default=True
+            ),
+            wave_pause=dict(
+                type='int',
+                default=0
+            ),
+            timeout=dict(
+                type='int',
+                default=3600
+            )
+        )
+
+        self.resource_group = None
+        self.vault_name = None
+        self.fabric_name = None
+        self.protection_container_name = None
+        self.action = None
+        self.items = None
+        self.src = None
+        self.dest = None
+        self.network_id = None
+        self.wave_size = None
+        self.max_concurrency = None
+        self.max_failures = None
+        self.health_gate = None
+        self.wave_pause = None
+        self.timeout = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.url = None
+        self.container_url = None
+        self.status_code = [200, 201, 202]
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2018-07-10'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMRecoveryServicesFailover, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                              supports_check_mode=True,
+                                                              supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        if self.items is None and self.src is None:
+            self.fail("Parameter error: either items or src must be specified.")
+        if self.action == 'test_failover' and not self.network_id:
+            self.fail("Parameter error: network_id is required for test_failover.")
+        if self.wave_size < 1:
+            self.fail("Parameter error: wave_size must be greater than 0.")
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        self.url = ('/subscriptions' +
+                    '/{{ subscription_id }}' +
+                    '/resourceGroups' +
+                    '/{{ resource_group }}' +
+                    '/providers' +
+                    '/Microsoft.RecoveryServices' +
+                    '/vaults' +
+                    '/{{ vault_name }}')
+        self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
+        self.url = self.url.replace('{{ resource_group }}', self.resource_group)
+        self.url = self.url.replace('{{ vault_name }}', self.vault_name)
+
+        names = self.items if self.items is not None else self.read_items()
+
+        try:
+            self.container_url = self.get_container_url()
+            protected = {}
+            for item in self.list(self.container_url + '/replicationProtectedItems'):
+                protected[item['name'].lower()] = item
+                protected[item['properties'].get('friendlyName', '').lower()] = item
+        except CloudError as exc:
+            self.fail("Error reading Site Recovery configuration of vault {0} - {1}".format(self.vault_name, str(exc)))
+
+        items = []
+        for name in names:
+            item = protected.get(name.lower())
+            if item is None:
+                self.fail("Protected item {0} not found in vault {1}".format(name, self.vault_name))
+            allowed = item['properties'].get('allowedOperations') or []
+            items.append(dict(name=item['name'],
+                              wave=None,
+                              status='Pending' if OPERATIONS[self.action][1] in allowed else 'Skipped'))
+
+        pending = [x for x in items if x['status'] == 'Pending']
+        waves = [pending[i:i + self.wave_size] for i in range(0, len(pending), self.wave_size)]
+        for number, wave in enumerate(waves, 1):
+            for item in wave:
+                item['wave'] = number
+
+        self.results['items'] = items
+        self.results['waves'] = []
+        self.results['elapsed'] = 0
+        self.results['changed'] = len(pending) > 0
+
+        if self.check_mode or not pending:
+            return self.results
+
+        start = time.time()
+        failures = 0
+        unhealthy = 0
+        previous = []
+        for number, wave in enumerate(waves, 1):
+            if previous and failures + unhealthy <= self.max_failures:
+                if self.wave_pause:
+                    time.sleep(self.wave_pause)
+                if self.health_gate:
+                    count = self.check_health(previous)
+                    self.results['waves'][-1]['unhealthy'] = count
+                    unhealthy += count
+            if failures + unhealthy > self.max_failures:
+                for item in wave:
+                    item['status'] = 'NotStarted'
+                continue
+            wave_start = time.time()
+            outcomes = self.run_concurrently(self.run_operation, wave, self.max_concurrency)
+            for item, (elapsed, exc) in zip(wave, outcomes):
+                if exc is not None:
+                    item['status'] = 'Failed'
+                    item['error'] = str(exc)
+                    failures += 1
+                else:
+                    item['status'] = 'Succeeded'
+                    item['elapsed'] = elapsed
+            previous = [x for x in wave if x['status'] == 'Succeeded']
+            self.results['waves'].append(dict(wave=number,
+                                              succeeded=len([x for x in wave if x['status'] == 'Succeeded']),
+                                              failed=len([x for x in wave if x['status'] == 'Failed']),
+                                              elapsed=time.time() - wave_start))
+        self.results['elapsed'] = time.time() - start
+
+        if self.dest is not None:
+            self.write_items(items)
+
+        stopped = len([x for x in items if x['status'] == 'NotStarted'])
+        if failures or stopped:
+            self.fail("{0} failed for {1} items, {2} items unhealthy, {3} items not started".format(self.action,
+                                                                                                    failures,
+                                                                                                    unhealthy,
+                                                                                                    stopped),
+                      **self.results)
+
+        return self.results
+
+    def read_items(self):
+        names = []
+        try:
+            with open(self.src) as f:
+                for row in csv.DictReader(f):
+                    row = dict((k.strip().lower(), (v or '').strip()) for k, v in row.items() if k)
+                    name = row.get('protected_item_name') or row.get('source_machine_name')
+                    if name:
+                        names.append(name)
+        except IOError as exc:
+            self.fail("Error reading {0} - {1}".format(self.src, str(exc)))
+        return names
+
+    def get_container_url(self):
+        fabric = None
+        for item in self.list(self.url + '/replicationFabrics'):
+            if self.fabric_name.lower() in [item['name'].lower(), item['properties'].get('friendlyName', '').lower()]:
+                fabric = item
+                break
+        if fabric is None:
+            self.fail("Site Recovery fabric {0} not found in vault {1}".format(self.fabric_name, self.vault_name))
+        url = self.url + '/replicationFabrics/' + fabric['name'] + '/replicationProtectionContainers'
+        if self.protection_container_name is not None:
+            return url + '/' + self.protection_container_name
+        containers = self.list(url)
+        if not containers:
+            self.fail("No protection container found in Site Recovery fabric {0}".format(self.fabric_name))
+        return url + '/' + containers[0]['name']
+
+    def list(self, url):
+        return self.retry_throttled(self.mgmt_client.query_paged,
+                                    url,
+                                    self.query_parameters,
+                                    self.header_parameters,
+                                    [200])
+
+    def get_operation_body(self):
+        details = dict(instanceType='InMageAzureV2')
+        if self.action == 'test_failover':
+            return dict(properties=dict(failoverDirection='PrimaryToRecovery',
+                                        networkType='VmNetworkAsInput',
+                                        networkId=self.network_id,
+                                        providerSpecificDetails=details))
+        if self.action == 'test_failover_cleanup':
+            return dict(properties=dict(comments='Test failover cleanup'))
+        if self.action == 'unplanned_failover':
+            return dict(properties=dict(failoverDirection='PrimaryToRecovery',
+                                        sourceSiteOperations='NotRequired',
+                                        providerSpecificDetails=details))
+        return None
+
+    def run_operation(self, item):
+        '''
+        Run the operation on a single item and wait for it to finish. Runs on a worker thread.
+        '''
+        start = time.time()
+        self.retry_throttled(self.mgmt_client.query,
+                             self.container_url + '/replicationProtectedItems/' + item['name'] + '/' + OPERATIONS[self.action][0],
+                             'POST',
+                             self.query_parameters,
+                             self.header_parameters,
+                             self.get_operation_body(),
+                             self.status_code,
+                             self.timeout,
+                             30)
+        return time.time() - start
+
+    def check_health(self, items):
+        '''
+        Read health of items, return number of items in Critical health or which couldn't be read.
+        '''
+        outcomes = self.run_concurrently(self.get_item, items, self.max_concurrency)
+        unhealthy = 0
+        for item, (response, exc) in zip(items, outcomes):
+            if exc is not None:
+                item['health'] = 'Unknown'
+                item['error'] = "Error reading health - {0}".format(str(exc))
+            else:
+                item['health'] = response['properties'].get(OPERATIONS[self.action][2])
+            if item['health'] in ['Critical', 'Unknown']:
+                unhealthy += 1
+        return unhealthy
+
+    def get_item(self, item):
+        '''
+        Read a protected item. Runs on a worker thread.
+        '''
+        response = self.retry_throttled(self.mgmt_client.query,
+                                        self.container_url + '/replicationProtectedItems/' + item['name'],
+                                        'GET',
+                                        self.query_parameters,
+                                        self.header_parameters,
+                                        None,
+                                        [200],
+                                        0,
+                                        0)
+        return json.loads(response.text)
+
+    def write_items(self, items):
+        try:
+            with open(self.dest, 'w') as f:
+                writer = csv.DictWriter(f, fieldnames=ITEM_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                for item in items:
+                    writer.writerow(item)
+        except IOError as exc:
+            self.fail("Error writing {0} - {1}".format(self.dest, str(exc)))
+
+
+def main():
+    AzureRMRecoveryServicesFailover()
+
+
+if __name__ == '__main__':
+    main()
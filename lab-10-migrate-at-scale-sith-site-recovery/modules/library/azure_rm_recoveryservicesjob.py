@@ -0,0 +1,435 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_recoveryservicesjob
+version_added: '2.9'
+short_description: Track Azure Site Recovery jobs.
+description:
+  - 'Get progress of, or wait for, Azure Site Recovery jobs of a Recovery Services vault.'
+  - >-
+    Known jobs are kept in a local state file. Jobs are discovered from a CSV file written by
+    M(azure_rm_recoveryservicesreplication), or by listing vault jobs with server side filters.
+    Only jobs which are not finished yet are read again.
+options:
+  resource_group:
+    description:
+      - The name of the resource group of the Recovery Services vault.
+    required: true
+    type: str
+  vault_name:
+    description:
+      - The name of the Recovery Services vault.
+    required: true
+    type: str
+  src:
+    description:
+      - Path to a CSV file with C(job_id) column listing jobs to track.
+      - If omitted, vault jobs matching I(job_name), I(job_status) and I(start_time) are tracked.
+    type: path
+  job_name:
+    description:
+      - Only track jobs of this operation, for example C(EnableDr), C(TestFailover) or C(UnplannedFailover).
+    type: str
+  job_status:
+    description:
+      - Only discover jobs in this state, for example C(InProgress).
+    type: str
+  start_time:
+    description:
+      - Only discover jobs started after this time, for example C(2019-10-01T00:00:00Z).
+    type: str
+  state_file:
+    description:
+      - Path to the file known jobs are kept in.
+      - Defaults to C(~/.ansible/azure_cache/asr_jobs_<subscription_id>_<resource_group>_<vault_name>.json).
+      - Not written in check mode.
+    type: path
+  dest:
+    description:
+      - Path to a CSV file the status of every job is written to, one row per machine.
+    type: path
+  wait:
+    description:
+      - Wait until all tracked jobs are finished.
+    type: bool
+    default: false
+  timeout:
+    description:
+      - Maximum time in seconds to wait for jobs.
+    type: int
+    default: 3600
+  max_concurrency:
+    description:
+      - Maximum number of jobs read at the same time.
+    type: int
+    default: 10
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Check status of replication jobs started by the migration
+  azure_rm_recoveryservicesjob:
+    resource_group: myResourceGroup
+    vault_name: myVault
+    src: migration-jobs.csv
+    dest: migration-status.csv
+
+- name: Wait for all test failovers started today
+  azure_rm_recoveryservicesjob:
+    resource_group: myResourceGroup
+    vault_name: myVault
+    job_name: TestFailover
+    start_time: "{{ ansible_date_time.date }}T00:00:00Z"
+    wait: yes
+'''
+
+RETURN = '''
+summary:
+  description:
+    - Number of tracked jobs by state.
+  returned: always
+  type: dict
+  sample: {"Succeeded": 950, "InProgress": 48, "Failed": 2}
+progress:
+  description:
+    - Percentage of finished jobs.
+  returned: always
+  type: float
+  sample: 95.2
+jobs:
+  description:
+    - Tracked jobs which are not finished or did not succeed.
+  returned: always
+  type: complex
+  contains:
+    job_id:
+      description:
+        - Name of the job.
+      returned: always
+      type: str
+      sample: 6b1e7a9b-9c0a-4bd4-9d18-62d3a7cf0ee2
+    machine:
+      description:
+        - Name of the machine the job runs on.
+      returned: always
+      type: str
+      sample: myVm1
+    scenario:
+      description:
+        - Operation of the job.
+      returned: always
+      type: str
+      sample: EnableDr
+    state:
+      description:
+        - State of the job.
+      returned: always
+      type: str
+      sample: InProgress
+    start_time:
+      description:
+        - Time the job started.
+      returned: always
+      type: str
+      sample: "2019-10-01T10:32:11.123Z"
+    end_time:
+      description:
+        - Time the job finished.
+      returned: always
+      type: str
+    error:
+      description:
+        - Error reported for the job.
+      returned: always
+      type: str
+'''
+
+import csv
+import json
+import os
+import time
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt, write_json_file
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+TERMINAL_STATES = ['Succeeded', 'Failed', 'Cancelled', 'Skipped', 'CompletedWithInformation']
+
+JOB_COLUMNS = ['job_id', 'machine', 'scenario', 'state', 'start_time', 'end_time', 'error']
+
+MIN_POLL_INTERVAL = 15
+
+MAX_POLL_INTERVAL = 120
+
+
+class AzureRMRecoveryServicesJob(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            vault_name=dict(
+                type='str',
+                required=True
+            ),
+            src=dict(
+                type='path'
+            ),
+            job_name=dict(
+                type='str'
+            ),
+            job_status=dict(
+                type='str'
+            ),
+            start_time=dict(
+                type='str'
+            ),
+            state_file=dict(
+                type='path'
+            ),
+            dest=dict(
+                type='path'
+            ),
+            wait=dict(
+                type='bool',
+                default=False
+            ),
+            timeout=dict(
+                type='int',
+                default=3600
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            )
+        )
+
+        self.resource_group = None
+        self.vault_name = None
+        self.src = None
+        self.job_name = None
+        self.job_status = None
+        self.start_time = None
+        self.state_file = None
+        self.dest = None
+        self.wait = None
+        self.timeout = None
+        self.max_concurrency = None
+        self.src_job_ids = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.url = None
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2018-07-10'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMRecoveryServicesJob, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                         supports_check_mode=True,
+                                                         supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        self.url = ('/subscriptions' +
+                    '/{{ subscription_id }}' +
+                    '/resourceGroups' +
+                    '/{{ resource_group }}' +
+                    '/providers' +
+                    '/Microsoft.RecoveryServices' +
+                    '/vaults' +
+                    '/{{ vault_name }}' +
+                    '/replicationJobs')
+        self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
+        self.url = self.url.replace('{{ resource_group }}', self.resource_group)
+        self.url = self.url.replace('{{ vault_name }}', self.vault_name)
+
+        if self.state_file is None:
+            name = 'asr_jobs_{0}_{1}_{2}.json'.format(self.subscription_id, self.resource_group.lower(), self.vault_name.lower())
+            self.state_file = os.path.join(os.path.expanduser('~'), '.ansible', 'azure_cache', name)
+
+        jobs = self.load_state()
+        if self.src is not None:
+            job_ids = self.read_job_ids()
+            for job_id in job_ids:
+                jobs.setdefault(job_id, dict(job_id=job_id, state=None))
+        else:
+            # only jobs matching filters of this run, the state file keeps jobs of earlier runs too
+            job_ids = set()
+            try:
+                for job in self.list_jobs():
+                    jobs[job['name']] = self.format_job(job)
+                    job_ids.add(job['name'])
+            except CloudError as exc:
+                self.fail("Error listing jobs of vault {0} - {1}".format(self.vault_name, str(exc)))
+
+        tracked = [x for x in jobs.values() if x['job_id'] in job_ids]
+        if self.src is None and self.job_name is not None:
+            tracked = [x for x in tracked if x.get('scenario') in [None, self.job_name]]
+
+        start = time.time()
+        delay = MIN_POLL_INTERVAL
+        # jobs discovered by listing were just read
+        fresh = self.src is None
+        polled = False
+        while True:
+            pending = [x for x in tracked if x['state'] not in TERMINAL_STATES]
+            if pending and not fresh:
+                polled = True
+                outcomes = self.run_concurrently(self.get_job, pending, self.max_concurrency)
+                for job, (response, exc) in zip(pending, outcomes):
+                    if exc is not None:
+                        self.fail("Error getting job {0} - {1}".format(job['job_id'], str(exc)))
+                    job.update(self.format_job(response))
+            fresh = False
+            still_pending = [x for x in pending if x['state'] not in TERMINAL_STATES]
+            if not still_pending or not self.wait or time.time() - start > self.timeout:
+                pending = still_pending
+                break
+            self.save_state(jobs)
+            # poll often while jobs keep finishing, back off while nothing happens
+            if polled:
+                delay = MIN_POLL_INTERVAL if len(still_pending) < len(pending) else min(delay * 2, MAX_POLL_INTERVAL)
+            time.sleep(delay)
+
+        self.save_state(jobs)
+
+        summary = {}
+        for job in tracked:
+            summary[job['state']] = summary.get(job['state'], 0) + 1
+        done = len([x for x in tracked if x['state'] in TERMINAL_STATES])
+        self.results['summary'] = summary
+        self.results['progress'] = round(100.0 * done / len(tracked), 1) if tracked else 100.0
+        self.results['jobs'] = sorted([x for x in tracked if x['state'] != 'Succeeded'], key=lambda x: x.get('machine') or '')
+
+        if self.dest is not None:
+            self.write_jobs(tracked)
+
+        if self.wait and pending:
+            self.fail("Timed out waiting for {0} jobs".format(len(pending)), **self.results)
+
+        return self.results
+
+    def read_job_ids(self):
+        self.src_job_ids = set()
+        try:
+            with open(self.src) as f:
+                for row in csv.DictReader(f):
+                    row = dict((k.strip().lower(), v) for k, v in row.items() if k)
+                    if row.get('job_id'):
+                        self.src_job_ids.add(row['job_id'].strip())
+        except IOError as exc:
+            self.fail("Error reading {0} - {1}".format(self.src, str(exc)))
+        return self.src_job_ids
+
+    def list_jobs(self):
+        filters = []
+        if self.start_time is not None:
+            filters.append("StartTime eq '{0}'".format(self.start_time))
+        if self.job_name is not None:
+            filters.append("JobName eq '{0}'".format(self.job_name))
+        if self.job_status is not None:
+            filters.append("JobStatus eq '{0}'".format(self.job_status))
+        query_parameters = dict(self.query_parameters)
+        if filters:
+            query_parameters['$filter'] = ' and '.join(filters)
+        return self.retry_throttled(self.mgmt_client.query_paged,
+                                    self.url,
+                                    query_parameters,
+                                    self.header_parameters,
+                                    [200])
+
+    def get_job(self, job):
+        '''
+        Read current state of a job. Runs on a worker thread.
+        '''
+        response = self.retry_throttled(self.mgmt_client.query,
+                                        self.url + '/' + job['job_id'],
+                                        'GET',
+                                        self.query_parameters,
+                                        self.header_parameters,
+                                        None,
+                                        [200],
+                                        0,
+                                        0)
+        return json.loads(response.text)
+
+    def format_job(self, job):
+        properties = job.get('properties', {})
+        errors = []
+        for error in properties.get('errors') or []:
+            for detail in error.get('serviceErrorDetails', {}), error.get('providerErrorDetails', {}):
+                if detail and detail.get('message'):
+                    errors.append(detail['message'])
+        return dict(job_id=job['name'],
+                    machine=properties.get('targetObjectName'),
+                    scenario=properties.get('scenarioName'),
+                    state=properties.get('state'),
+                    start_time=properties.get('startTime'),
+                    end_time=properties.get('endTime'),
+                    error='; '.join(errors) or None)
+
+    def load_state(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (IOError, ValueError) as exc:
+            self.log('Ignoring unreadable job state file - {0}'.format(str(exc)))
+            return {}
+
+    def save_state(self, jobs):
+        if self.check_mode:
+            return
+        try:
+            write_json_file(self.state_file, jobs)
+        except (IOError, OSError) as exc:
+            self.fail("Error writing job state file {0} - {1}".format(self.state_file, str(exc)))
+
+    def write_jobs(self, jobs):
+        try:
+            with open(self.dest, 'w') as f:
+                writer = csv.DictWriter(f, fieldnames=JOB_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                for job in sorted(jobs, key=lambda x: x.get('machine') or ''):
+                    writer.writerow(job)
+        except IOError as exc:
+            self.fail("Error writing {0} - {1}".format(self.dest, str(exc)))
+
+
+def main():
+    AzureRMRecoveryServicesJob()
+
+
+if __name__ == '__main__':
+    main()
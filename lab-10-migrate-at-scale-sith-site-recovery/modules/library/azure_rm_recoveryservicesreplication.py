@@ -0,0 +1,404 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_recoveryservicesreplication
+version_added: '2.9'
+short_description: Enable Azure Site Recovery replication for machines listed in a CSV file.
+description:
+  - 'Enable replication of VMware virtual machines or physical servers to Azure for every machine listed in a CSV file.'
+  - >-
+    Machines are streamed from the CSV file and processed several at the same time, requests rejected by throttling are retried.
+    A row with the replication job ID is written to the results CSV file as soon as replication of a machine is enabled.
+  - Machines which are already replicated are skipped.
+options:
+  resource_group:
+    description:
+      - The name of the resource group of the Recovery Services vault.
+    required: true
+    type: str
+  vault_name:
+    description:
+      - The name of the Recovery Services vault.
+    required: true
+    type: str
+  fabric_name:
+    description:
+      - Name or friendly name of the Site Recovery fabric, usually the name of the configuration server.
+    required: true
+    type: str
+  protection_container_name:
+    description:
+      - Name of the protection container in the fabric.
+      - Defaults to the first protection container of the fabric.
+    type: str
+  src:
+    description:
+      - Path to the CSV file listing machines to replicate.
+      - >-
+        Column names are case insensitive. Column C(source_machine_name) is required, other columns
+        override I(defaults) for the machine: C(policy_name) (required here or in I(defaults)), C(target_machine_name), C(process_server_id),
+        C(master_target_id), C(run_as_account_id), C(target_resource_group_id), C(target_storage_account_id),
+        C(log_storage_account_id), C(target_network_id), C(target_subnet_name), C(multi_vm_group_name).
+    required: true
+    type: path
+  dest:
+    description:
+      - Path to the results CSV file with columns C(source_machine_name), C(protected_item_name), C(status),
+        C(job_id), C(elapsed) and C(error).
+    required: true
+    type: path
+  defaults:
+    description:
+      - Values of CSV columns used for machines which don't specify them.
+    type: dict
+  max_concurrency:
+    description:
+      - Maximum number of machines processed at the same time.
+    type: int
+    default: 5
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Enable replication of all machines in the wave
+  azure_rm_recoveryservicesreplication:
+    resource_group: myResourceGroup
+    vault_name: myVault
+    fabric_name: myConfigurationServer
+    src: wave1.csv
+    dest: wave1-jobs.csv
+    defaults:
+      policy_name: myReplicationPolicy
+      process_server_id: 3c39b4e9-bd0e-4cbf-8f7c-0d3b4c9b5f2e
+      run_as_account_id: "1"
+      target_resource_group_id: /subscriptions/xxxx/resourceGroups/myTargetResourceGroup
+      log_storage_account_id: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Storage/storageAccounts/mycache
+      target_network_id: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Network/virtualNetworks/myVnet
+      target_subnet_name: default
+'''
+
+RETURN = '''
+summary:
+  description:
+    - Number of machines by status.
+  returned: always
+  type: dict
+  sample: {"Succeeded": 996, "Skipped": 2, "Failed": 2}
+failed:
+  description:
+    - Source machine names replication couldn't be enabled for.
+  returned: always
+  type: list
+  sample: ["myVm17", "myVm204"]
+elapsed:
+  description:
+    - Time in seconds all machines took.
+  returned: always
+  type: float
+  sample: 1843.2
+'''
+
+import csv
+import re
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+RESULT_COLUMNS = ['source_machine_name', 'protected_item_name', 'status', 'job_id', 'elapsed', 'error']
+
+
+class AzureRMRecoveryServicesReplication(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            vault_name=dict(
+                type='str',
+                required=True
+            ),
+            fabric_name=dict(
+                type='str',
+                required=True
+            ),
+            protection_container_name=dict(
+                type='str'
+            ),
+            src=dict(
+                type='path',
+                required=True
+            ),
+            dest=dict(
+                type='path',
+                required=True
+            ),
+            defaults=dict(
+                type='dict'
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=5
+            )
+        )
+
+        self.resource_group = None
+        self.vault_name = None
+        self.fabric_name = None
+        self.protection_container_name = None
+        self.src = None
+        self.dest = None
+        self.defaults = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.url = None
+        self.status_code = [200, 201, 202]
+        self.lock = threading.Lock()
+        self.writer = None
+        self.output = None
+        self.container_url = None
+        self.protectable = None
+        self.protected = None
+        self.summary = None
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2018-07-10'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMRecoveryServicesReplication, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                                 supports_check_mode=True,
+                                                                 supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        self.url = ('/subscriptions' +
+                    '/{{ subscription_id }}' +
+                    '/resourceGroups' +
+                    '/{{ resource_group }}' +
+                    '/providers' +
+                    '/Microsoft.RecoveryServices' +
+                    '/vaults' +
+                    '/{{ vault_name }}')
+        self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
+        self.url = self.url.replace('{{ resource_group }}', self.resource_group)
+        self.url = self.url.replace('{{ vault_name }}', self.vault_name)
+
+        # rows are checked before anything is changed, then read again one by one while processing
+        self.check_machines()
+
+        # everything needed to enable replication is looked up once for all machines
+        try:
+            self.container_url = self.get_container_url()
+            self.protectable = dict((x['properties']['friendlyName'].lower(), x['id'])
+                                    for x in self.list(self.container_url + '/replicationProtectableItems'))
+            self.protected = set()
+            for item in self.list(self.container_url + '/replicationProtectedItems'):
+                self.protected.add(item['name'].lower())
+                self.protected.add(item['properties'].get('friendlyName', '').lower())
+        except CloudError as exc:
+            self.fail("Error reading Site Recovery configuration of vault {0} - {1}".format(self.vault_name, str(exc)))
+
+        self.summary = dict(Succeeded=0, Skipped=0, Failed=0)
+        self.results['failed'] = []
+        self.results['elapsed'] = 0
+        if self.check_mode:
+            self.summary['Pending'] = 0
+            for machine in self.read_machines():
+                self.summary[machine['status']] += 1
+                if machine['status'] == 'Pending' and machine['protectable_item_id'] is None:
+                    self.results['failed'].append(machine['source_machine_name'])
+            self.results['summary'] = self.summary
+            self.results['changed'] = self.summary['Pending'] > 0
+            return self.results
+
+        start = time.time()
+        try:
+            with open(self.dest, 'w') as output:
+                self.output = output
+                self.writer = csv.DictWriter(output, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+                self.writer.writeheader()
+                self.process_machines(self.read_machines())
+        except IOError as exc:
+            self.fail("Error writing results to {0} - {1}".format(self.dest, str(exc)))
+        self.results['elapsed'] = time.time() - start
+        self.results['summary'] = self.summary
+        self.results['changed'] = self.summary['Succeeded'] + self.summary['Failed'] > 0
+
+        if self.results['failed']:
+            self.fail("Error enabling replication of {0} machines, see {1}".format(len(self.results['failed']), self.dest),
+                      **self.results)
+
+        return self.results
+
+    def process_machines(self, machines):
+        '''
+        Enable replication of machines as they are read, keeping at most max_concurrency in progress.
+        '''
+        pool = ThreadPool(max(1, self.max_concurrency))
+        slots = threading.BoundedSemaphore(max(1, self.max_concurrency))
+
+        def process(machine):
+            try:
+                if machine['status'] == 'Pending':
+                    self.enable_replication(machine)
+                else:
+                    self.write_result(machine)
+            finally:
+                slots.release()
+
+        try:
+            for machine in machines:
+                slots.acquire()
+                pool.apply_async(process, (machine,))
+        finally:
+            pool.close()
+            pool.join()
+
+    def check_machines(self):
+        defaults = dict((k.lower(), v) for k, v in (self.defaults or {}).items())
+        try:
+            with open(self.src) as f:
+                for index, row in enumerate(csv.DictReader(f)):
+                    row = dict((k.strip().lower(), (v or '').strip()) for k, v in row.items() if k)
+                    for column in ['source_machine_name', 'policy_name']:
+                        if not row.get(column) and not defaults.get(column):
+                            self.fail("Column {0} missing in row {1} of {2}".format(column, index + 2, self.src))
+        except IOError as exc:
+            self.fail("Error reading {0} - {1}".format(self.src, str(exc)))
+
+    def read_machines(self):
+        '''
+        Yield machines of the CSV file one by one, with status Pending or Skipped.
+        '''
+        defaults = dict((k.lower(), v) for k, v in (self.defaults or {}).items())
+        try:
+            with open(self.src) as f:
+                for row in csv.DictReader(f):
+                    machine = dict(defaults)
+                    machine.update((k.strip().lower(), v.strip()) for k, v in row.items() if k and v and v.strip())
+                    name = machine['source_machine_name'].lower()
+                    machine['protected_item_name'] = re.sub('[^a-z0-9-]', '-', name)
+                    machine['protectable_item_id'] = self.protectable.get(name)
+                    if name in self.protected or machine['protected_item_name'] in self.protected:
+                        machine['status'] = 'Skipped'
+                    else:
+                        machine['status'] = 'Pending'
+                    yield machine
+        except IOError as exc:
+            self.fail("Error reading {0} - {1}".format(self.src, str(exc)))
+
+    def get_container_url(self):
+        fabric = None
+        for item in self.list(self.url + '/replicationFabrics'):
+            if self.fabric_name.lower() in [item['name'].lower(), item['properties'].get('friendlyName', '').lower()]:
+                fabric = item
+                break
+        if fabric is None:
+            self.fail("Site Recovery fabric {0} not found in vault {1}".format(self.fabric_name, self.vault_name))
+        url = self.url + '/replicationFabrics/' + fabric['name'] + '/replicationProtectionContainers'
+        if self.protection_container_name is not None:
+            return url + '/' + self.protection_container_name
+        containers = self.list(url)
+        if not containers:
+            self.fail("No protection container found in Site Recovery fabric {0}".format(self.fabric_name))
+        return url + '/' + containers[0]['name']
+
+    def list(self, url):
+        return self.retry_throttled(self.mgmt_client.query_paged,
+                                    url,
+                                    self.query_parameters,
+                                    self.header_parameters,
+                                    [200])
+
+    def enable_replication(self, machine):
+        '''
+        Enable replication of a single machine and record the result. Runs on a worker thread.
+        '''
+        start = time.time()
+        try:
+            if machine['protectable_item_id'] is None:
+                raise Exception("Machine not discovered by the configuration server")
+            response = self.retry_throttled(self.mgmt_client.query,
+                                            self.container_url + '/replicationProtectedItems/' + machine['protected_item_name'],
+                                            'PUT',
+                                            self.query_parameters,
+                                            self.header_parameters,
+                                            self.get_replication_body(machine),
+                                            self.status_code,
+                                            0,
+                                            0)
+            job = re.search('/replicationJobs/([^/?]+)',
+                            response.headers.get('Azure-AsyncOperation') or response.headers.get('Location') or '')
+            machine['job_id'] = job.group(1) if job else None
+            machine['status'] = 'Succeeded'
+        except Exception as exc:
+            machine['status'] = 'Failed'
+            machine['error'] = str(exc)
+        machine['elapsed'] = round(time.time() - start, 1)
+        self.write_result(machine)
+
+    def get_replication_body(self, machine):
+        details = dict(instanceType='InMageAzureV2',
+                       processServerId=machine.get('process_server_id'),
+                       masterTargetId=machine.get('master_target_id', machine.get('process_server_id')),
+                       runAsAccountId=machine.get('run_as_account_id'),
+                       targetAzureVmName=machine.get('target_machine_name', machine['source_machine_name']),
+                       targetAzureV2ResourceGroupId=machine.get('target_resource_group_id'),
+                       storageAccountId=machine.get('target_storage_account_id'),
+                       logStorageAccountId=machine.get('log_storage_account_id'),
+                       targetAzureNetworkId=machine.get('target_network_id'),
+                       targetAzureSubnetId=machine.get('target_subnet_name'),
+                       multiVmGroupName=machine.get('multi_vm_group_name', machine['source_machine_name']))
+        return dict(properties=dict(policyId=self.url + '/replicationPolicies/' + machine['policy_name'],
+                                    protectableItemId=machine['protectable_item_id'],
+                                    providerSpecificDetails=dict((k, v) for k, v in details.items() if v is not None)))
+
+    def write_result(self, machine):
+        with self.lock:
+            self.writer.writerow(machine)
+            self.output.flush()
+            self.summary[machine['status']] += 1
+            if machine['status'] == 'Failed':
+                self.results['failed'].append(machine['source_machine_name'])
+
+
+def main():
+    AzureRMRecoveryServicesReplication()
+
+
+if __name__ == '__main__':
+    main()
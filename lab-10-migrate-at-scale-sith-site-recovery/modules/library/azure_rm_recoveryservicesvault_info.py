@@ -83,6 +83,22 @@ options:
     description:
       - The Sku name.
     required: true
+  subscriptions:
+    description:
+      - List vaults of these subscriptions instead of the current subscription.
+      - Subscriptions are listed concurrently.
+    type: list
+  expand:
+    description:
+      - Add replication summary of every vault, with protected item, job and health counts.
+      - Summaries of all vaults are read concurrently.
+    type: bool
+    default: false
+  max_concurrency:
+    description:
+      - Maximum number of requests sent at the same time.
+    type: int
+    default: 10
 extends_documentation_fragment:
   - azure
 author:
@@ -100,6 +116,12 @@ EXAMPLES = '''
   azure_rm_recoveryservicesvault_info:
     resource_group: myResourceGroup
     name: myVault
+- name: Replication summary of all vaults in several subscriptions
+  azure_rm_recoveryservicesvault_info:
+    subscriptions:
+      - 00000000-0000-0000-0000-000000000001
+      - 00000000-0000-0000-0000-000000000002
+    expand: yes
 
 '''
 
@@ -152,12 +174,59 @@ vaults:
           - The current state of the gallery.
         type: str
         sample: "Succeeded"
+    replication:
+      description:
+        - Replication summary of the vault.
+      returned: when I(expand) is C(true)
+      type: complex
+      contains:
+        protected_item_count:
+          description:
+            - Number of protected items.
+          type: int
+          sample: 120
+        recovery_plan_count:
+          description:
+            - Number of recovery plans.
+          type: int
+          sample: 4
+        registered_servers_count:
+          description:
+            - Number of registered servers.
+          type: int
+          sample: 2
+        unhealthy_vm_count:
+          description:
+            - Number of protected items with health issues.
+          type: int
+          sample: 3
+        failed_jobs:
+          description:
+            - Number of failed jobs.
+          type: int
+          sample: 1
+        in_progress_jobs:
+          description:
+            - Number of jobs in progress.
+          type: int
+          sample: 12
+        suspended_jobs:
+          description:
+            - Number of suspended jobs.
+          type: int
+          sample: 0
+summary:
+  description:
+    - Totals over all returned vaults.
+  returned: when I(expand) is C(true)
+  type: dict
+  sample: {"vaults": 52, "protected_item_count": 4210, "unhealthy_vm_count": 17, "failed_jobs": 3, "in_progress_jobs": 88}
 
 '''
 
 import time
 import json
-from ansible.module_utils.azure_rm_common import AzureRMModuleBase
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 from ansible.module_utils.azure_rm_common_rest import GenericRestClient
 from copy import deepcopy
 try:
@@ -167,7 +236,11 @@ except Exception:
     pass
 
 
-class AzureRMVaultsInfo(AzureRMModuleBase):
+# counters summed in the summary of all vaults
+SUMMARY_FIELDS = ['protected_item_count', 'unhealthy_vm_count', 'failed_jobs', 'in_progress_jobs', 'suspended_jobs']
+
+
+class AzureRMVaultsInfo(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
             resource_group=dict(
@@ -175,11 +248,25 @@ class AzureRMVaultsInfo(AzureRMModuleBase):
             ),
             name=dict(
                 type='str'
+            ),
+            subscriptions=dict(
+                type='list'
+            ),
+            expand=dict(
+                type='bool',
+                default=False
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
             )
         )
 
         self.resource_group = None
         self.name = None
+        self.subscriptions = None
+        self.expand = None
+        self.max_concurrency = None
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -205,12 +292,69 @@ class AzureRMVaultsInfo(AzureRMModuleBase):
 
         if (self.resource_group is not None and self.name is not None):
             self.results['vaults'] = self.get()
+        elif self.subscriptions is not None:
+            outcomes = self.run_concurrently(self.list_subscription, self.subscriptions, self.max_concurrency)
+            self.results['vaults'] = []
+            for subscription_id, (result, exc) in zip(self.subscriptions, outcomes):
+                if exc is not None:
+                    self.fail('Error listing vaults of subscription {0}: {1}'.format(subscription_id, str(exc)))
+                self.results['vaults'].extend(result)
         elif (self.resource_group is not None):
             self.results['vaults'] = self.listbyresourcegroup()
         else:
             self.results['vaults'] = self.listbysubscriptionid()
+
+        if self.expand:
+            vaults = self.results['vaults']
+            self.add_replication_summary(vaults if isinstance(vaults, list) else [vaults] if vaults else [])
         return self.results
 
+    def list_subscription(self, subscription_id):
+        url = '/subscriptions/' + subscription_id
+        if self.resource_group is not None:
+            url += '/resourceGroups/' + self.resource_group
+        items = self.retry_throttled(self.mgmt_client.query_paged,
+                                     url + '/providers/Microsoft.RecoveryServices/vaults',
+                                     self.query_parameters,
+                                     self.header_parameters,
+                                     self.status_code)
+        return [self.format_item(x) for x in items]
+
+    def add_replication_summary(self, vaults):
+        outcomes = self.run_concurrently(self.get_replication_summary, vaults, self.max_concurrency)
+        summary = dict((x, 0) for x in SUMMARY_FIELDS)
+        summary['vaults'] = len(vaults)
+        for vault, (result, exc) in zip(vaults, outcomes):
+            if exc is not None:
+                self.fail('Error getting replication summary of vault {0}: {1}'.format(vault['name'], str(exc)))
+            vault['replication'] = result
+            for field in SUMMARY_FIELDS:
+                summary[field] += result[field]
+        self.results['summary'] = summary
+
+    def get_replication_summary(self, vault):
+        response = self.retry_throttled(self.mgmt_client.query,
+                                        vault['id'] + '/replicationUsages',
+                                        'GET',
+                                        self.query_parameters,
+                                        self.header_parameters,
+                                        None,
+                                        self.status_code,
+                                        0,
+                                        0)
+        usages = json.loads(response.text).get('value') or [{}]
+        monitoring = usages[0].get('monitoringSummary') or {}
+        jobs = usages[0].get('jobsSummary') or {}
+        return {
+            'protected_item_count': usages[0].get('protectedItemCount', 0),
+            'recovery_plan_count': usages[0].get('recoveryPlanCount', 0),
+            'registered_servers_count': usages[0].get('registeredServersCount', 0),
+            'unhealthy_vm_count': monitoring.get('unHealthyVmCount', 0),
+            'failed_jobs': jobs.get('failedJobs', 0),
+            'in_progress_jobs': jobs.get('inProgressJobs', 0),
+            'suspended_jobs': jobs.get('suspendedJobs', 0)
+        }
+
     def get(self):
         response = None
         results = {}
@@ -244,8 +388,6 @@ class AzureRMVaultsInfo(AzureRMModuleBase):
         return self.format_item(results) if results else None
 
     def listbyresourcegroup(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -258,24 +400,17 @@ class AzureRMVaultsInfo(AzureRMModuleBase):
         self.url = self.url.replace('{{ resource_group }}', self.resource_group)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def listbysubscriptionid(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -285,20 +420,15 @@ class AzureRMVaultsInfo(AzureRMModuleBase):
         self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def format_item(self, item):
         d = {
@@ -0,0 +1,69 @@
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import copy
+
+
+# properties set by the service, not accepted back in a request
+READ_ONLY_PROPERTIES = ['provisioningState', 'clusterVersion', 'publicHostname', 'fqdn']
+
+READ_ONLY_ROUTER_PROPERTIES = ['publicSubdomain', 'fqdn']
+
+
+def get_pool_counts(cluster):
+    '''
+    Return dict of agent pool name to count of a cluster definition.
+    '''
+    profiles = cluster.get('properties', {}).get('agentPoolProfiles') or []
+    return dict((x['name'], x.get('count')) for x in profiles)
+
+
+def get_count_changes(cluster, counts):
+    '''
+    Return dict of agent pool name to (old count, new count) for pools whose count differs.
+
+    :param cluster: current cluster definition
+    :param counts: dict of agent pool name to desired count
+    '''
+    current = dict((k.lower(), (k, v)) for k, v in get_pool_counts(cluster).items())
+    changes = {}
+    for name, count in counts.items():
+        if name.lower() not in current:
+            raise ValueError("Agent pool {0} not found".format(name))
+        pool, old = current[name.lower()]
+        if old != count:
+            changes[pool] = (old, count)
+    return changes
+
+
+def get_scale_body(cluster, counts, auth_profile=None):
+    '''
+    Return request body changing only agent pool counts of a cluster.
+
+    The body is the current definition with read-only properties removed. Identity provider
+    secrets are never returned by the service, so the auth profile of the current definition
+    can't be sent back. The auth profile passed in is used instead, if any.
+
+    :param cluster: current cluster definition
+    :param counts: dict of agent pool name to desired count
+    :param auth_profile: auth profile in request format, including secrets
+    '''
+    counts = dict((k.lower(), v) for k, v in counts.items())
+    body = dict((k, copy.deepcopy(v)) for k, v in cluster.items() if k in ['location', 'tags', 'plan', 'properties'])
+    properties = body['properties']
+    for name in READ_ONLY_PROPERTIES:
+        properties.pop(name, None)
+    properties.pop('authProfile', None)
+    if auth_profile is not None:
+        properties['authProfile'] = copy.deepcopy(auth_profile)
+    for router in properties.get('routerProfiles') or []:
+        for name in READ_ONLY_ROUTER_PROPERTIES:
+            router.pop(name, None)
+    if properties.get('masterPoolProfile') is not None:
+        # the service validates the master pool name, which is not always returned
+        properties['masterPoolProfile'].setdefault('name', 'master')
+    for pool in properties.get('agentPoolProfiles') or []:
+        if pool['name'].lower() in counts:
+            pool['count'] = counts[pool['name'].lower()]
+    return body
@@ -0,0 +1,260 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_asyncoperation
+version_added: '2.9'
+short_description: Track Azure operations started in asynchronous mode.
+description:
+  - 'Get status of, or wait for, long running operations started by modules with I(async_operation=true).'
+  - Operations are read from state files in C(~/.ansible/azure_async).
+options:
+  operation_ids:
+    description:
+      - IDs of operations to track, as returned in I(async_operation.id).
+      - If omitted, all operations recorded in state files are tracked.
+    type: list
+  wait:
+    description:
+      - Wait until all tracked operations are finished.
+      - If C(false), current status is returned immediately.
+    type: bool
+    default: true
+  timeout:
+    description:
+      - Maximum time in seconds to wait for operations to finish.
+    type: int
+    default: 3600
+  polling_interval:
+    description:
+      - Time in seconds between status checks.
+    type: int
+    default: 30
+  max_concurrency:
+    description:
+      - Maximum number of operations checked at the same time.
+    type: int
+    default: 10
+  forget:
+    description:
+      - Remove state files of finished operations.
+      - Removed operations requested again in I(operation_ids) are returned in I(forgotten).
+      - State files are never changed in check mode.
+    type: bool
+    default: true
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Start image version builds without waiting
+  azure_rm_galleryimageversion:
+    resource_group: myResourceGroup
+    gallery_name: myGallery
+    gallery_image_name: myImage
+    name: "{{ item }}"
+    publishing_profile:
+      managed_image:
+        name: myImage
+        resource_group: myResourceGroup
+    async_operation: yes
+  loop:
+    - 1.0.0
+    - 1.1.0
+  register: builds
+
+- name: Wait for all builds to finish
+  azure_rm_asyncoperation:
+    operation_ids: "{{ builds.results | map(attribute='async_operation.id') | list }}"
+    timeout: 7200
+'''
+
+RETURN = '''
+operations:
+  description:
+    - Status of tracked operations.
+  returned: always
+  type: complex
+  contains:
+    id:
+      description:
+        - Operation ID.
+      returned: always
+      type: str
+      sample: 3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f
+    method:
+      description:
+        - HTTP method which started the operation.
+      returned: always
+      type: str
+      sample: PUT
+    resource_url:
+      description:
+        - URL of the resource the operation runs on.
+      returned: always
+      type: str
+      sample: /subscriptions/xxxx/resourceGroups/myResourceGroup/providers/Microsoft.Compute/snapshots/mySnapshot
+    status:
+      description:
+        - C(InProgress), C(Succeeded), C(Failed) or C(Canceled).
+      returned: always
+      type: str
+      sample: Succeeded
+    error:
+      description:
+        - Error reported for the operation.
+      returned: when operation failed
+      type: str
+    elapsed:
+      description:
+        - Time in seconds since the operation was started.
+      returned: always
+      type: float
+      sample: 1264.3
+forgotten:
+  description:
+    - Requested operations without state file, which finished and were forgotten by an earlier run.
+  returned: always
+  type: list
+  sample: ["3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f"]
+pending:
+  description:
+    - Number of operations still in progress.
+  returned: always
+  type: int
+  sample: 0
+'''
+
+import glob
+import json
+import os
+import time
+from ansible.module_utils.azure_rm_common_ext import (AzureRMModuleBaseExt, ASYNC_OPERATIONS_DIR, ASYNC_TERMINAL_STATES,
+                                                      get_async_operation_path)
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+
+
+class AzureRMAsyncOperation(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            operation_ids=dict(
+                type='list'
+            ),
+            wait=dict(
+                type='bool',
+                default=True
+            ),
+            timeout=dict(
+                type='int',
+                default=3600
+            ),
+            polling_interval=dict(
+                type='int',
+                default=30
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            ),
+            forget=dict(
+                type='bool',
+                default=True
+            )
+        )
+
+        self.operation_ids = None
+        self.wait = None
+        self.timeout = None
+        self.polling_interval = None
+        self.max_concurrency = None
+        self.forget = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+
+        super(AzureRMAsyncOperation, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                    supports_check_mode=True,
+                                                    supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        operations = self.load_operations()
+        self.results['operations'] = operations
+
+        start = time.time()
+        while True:
+            pending = [x for x in operations if x['status'] not in ASYNC_TERMINAL_STATES]
+            outcomes = self.run_concurrently(self.get_async_operation_status, pending, self.max_concurrency)
+            for operation, (status, exc) in zip(pending, outcomes):
+                if exc is not None:
+                    self.fail("Error getting status of operation {0} - {1}".format(operation['id'], str(exc)), **self.results)
+                operation['status'], error = status
+                if error:
+                    operation['error'] = error
+                if not self.check_mode:
+                    self.update_async_operation(operation, self.forget)
+
+            for operation in operations:
+                operation['elapsed'] = time.time() - operation['started']
+
+            self.results['pending'] = len([x for x in operations if x['status'] not in ASYNC_TERMINAL_STATES])
+            if not self.results['pending'] or not self.wait:
+                break
+            if time.time() - start > self.timeout:
+                self.fail("Timed out waiting for {0} operations".format(self.results['pending']), **self.results)
+            time.sleep(self.polling_interval)
+
+        failed = [x['id'] for x in operations if x['status'] in ['Failed', 'Canceled']]
+        if failed:
+            self.fail("Operations {0} did not succeed".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def load_operations(self):
+        if self.operation_ids is not None:
+            paths = [get_async_operation_path(x) for x in self.operation_ids]
+        else:
+            paths = sorted(glob.glob(os.path.join(os.path.expanduser(ASYNC_OPERATIONS_DIR), '*.json')))
+
+        operations = []
+        self.results['forgotten'] = []
+        for path in paths:
+            if self.operation_ids is not None and not os.path.exists(path):
+                # state of finished operations is removed unless forget is false
+                self.results['forgotten'].append(os.path.splitext(os.path.basename(path))[0])
+                continue
+            try:
+                with open(path) as f:
+                    operations.append(json.load(f))
+            except (IOError, ValueError) as exc:
+                self.fail("Error reading state of operation from {0} - {1}".format(path, str(exc)))
+        return operations
+
+
+def main():
+    AzureRMAsyncOperation()
+
+
+if __name__ == '__main__':
+    main()
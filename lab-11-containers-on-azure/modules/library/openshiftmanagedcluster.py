@@ -212,6 +212,20 @@ options:
     description:
       - Resource type
     type: str
+  async_operation:
+    description:
+      - Return as soon as the create, update or delete operation was accepted by Azure instead of waiting for it to complete.
+      - The operation is recorded in a state file and can be tracked with M(azure_rm_asyncoperation).
+    type: bool
+    default: false
+  timeout:
+    description:
+      - Maximum time in seconds to wait for a create, update or delete operation.
+      - >-
+        The operation is recorded in a state file. If it is still running when the module is run again,
+        the module waits for it instead of starting a new operation.
+    type: int
+    default: 7200
   state:
     description:
       - Assert the state of the OpenShiftManagedCluster.
@@ -535,14 +549,79 @@ properties:
               returned: always
               type: dict
               sample: null
+async_operation:
+  description:
+    - Operation started in asynchronous mode, pass I(id) to M(azure_rm_asyncoperation) to track it.
+  returned: when I(async_operation=true) and the resource was changed
+  type: complex
+  contains:
+    id:
+      description:
+        - Operation ID.
+      returned: always
+      type: str
+      sample: 3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f
+    state_file:
+      description:
+        - Path of the state file of the operation.
+      returned: always
+      type: str
+      sample: /home/user/.ansible/azure_async/3f1a3a6c-1f7e-4c76-a0d8-2f8c0b5d1e4f.json
+    status:
+      description:
+        - Operation status when the module returned.
+      returned: always
+      type: str
+      sample: InProgress
+phases:
+  description:
+    - Provisioning state transitions observed while waiting for the operation.
+  returned: when the module waited for an operation
+  type: complex
+  contains:
+    state:
+      description:
+        - Provisioning state of the cluster, or operation status.
+      returned: always
+      type: str
+      sample: Creating
+    time:
+      description:
+        - UTC time the state was first observed.
+      returned: always
+      type: str
+      sample: "2019-10-01T10:32:11Z"
+    elapsed:
+      description:
+        - Time in seconds since the operation was started.
+      returned: always
+      type: int
+      sample: 845
+scaled:
+  description:
+    - Agent pools scaled through the count only update, with old and new count.
+    - >-
+      When only agent pool counts differ from the current cluster, the current definition with new counts and
+      I(auth_profile) is sent instead of the full module input, see also M(openshiftmanagedclusterscale).
+  returned: when only agent pool counts were changed
+  type: dict
+  sample: {"compute": {"old": 4, "new": 8}}
+resumed:
+  description:
+    - Whether the module waited for an operation started by an earlier run.
+  returned: always
+  type: bool
+  sample: false
 
 '''
 
 import time
 import json
 import re
-from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from datetime import datetime
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt, ASYNC_TERMINAL_STATES
 from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+from ansible.module_utils.azure_rm_openshiftmanagedcluster_scale import get_count_changes, get_pool_counts, get_scale_body
 from copy import deepcopy
 try:
     from msrestazure.azure_exceptions import CloudError
@@ -555,6 +634,11 @@ class Actions:
     NoAction, Create, Update, Delete = range(4)
 
 
+MIN_POLL_INTERVAL = 15
+
+MAX_POLL_INTERVAL = 120
+
+
 class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
@@ -763,6 +847,14 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                     )
                 )
             ),
+            async_operation=dict(
+                type='bool',
+                default=False
+            ),
+            timeout=dict(
+                type='int',
+                default=7200
+            ),
             state=dict(
                 type='str',
                 default='present',
@@ -773,7 +865,11 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
         self.resource_group = None
         self.name = None
 
-        self.results = dict(changed=False)
+        self.async_operation = None
+        self.timeout = None
+        self.scale_counts = None
+
+        self.results = dict(changed=False, resumed=False)
         self.mgmt_client = None
         self.state = None
         self.url = None
@@ -805,10 +901,8 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
-        resource_group = self.get_resource_group(self.resource_group)
-
         if 'location' not in self.body:
-            self.body['location'] = resource_group.location
+            self.body['location'] = self.get_resource_group_location(self.resource_group)
 
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -822,6 +916,22 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
         self.url = self.url.replace('{{ resource_group }}', self.resource_group)
         self.url = self.url.replace('{{ open_shift_managed_cluster_name }}', self.name)
 
+        # an operation started by an earlier run may still be running, wait for it instead of starting another one
+        operation = self.find_async_operation(self.url)
+        if operation and operation['method'] == ('PUT' if self.state == 'present' else 'DELETE'):
+            self.log('Resuming {0} operation started {1:.0f}s ago'.format(operation['method'], time.time() - operation['started']))
+            self.results['changed'] = True
+            self.results['resumed'] = True
+            if self.check_mode:
+                return self.results
+            if self.async_operation:
+                self.results['async_operation'] = operation
+                return self.results
+            response = self.wait_for_operation(operation)
+            if response:
+                self.set_results(response)
+            return self.results
+
         old_response = self.get_resource()
 
         if not old_response:
@@ -842,8 +952,12 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                 self.results['modifiers'] = modifiers
                 self.results['compare'] = []
                 self.create_compare_modifiers(self.module_arg_spec, '', modifiers)
+                changes = self.get_count_only_changes(modifiers, old_response)
                 if not self.default_compare(modifiers, self.body, old_response, '', self.results):
                     self.to_do = Actions.Update
+                    if changes:
+                        self.scale_counts = dict((k, v[1]) for k, v in changes.items())
+                        self.results['scaled'] = dict((k, dict(old=v[0], new=v[1])) for k, v in changes.items())
 
         if (self.to_do == Actions.Create) or (self.to_do == Actions.Update):
             self.log('Need to Create / Update the OpenShiftManagedCluster instance')
@@ -852,7 +966,12 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                 self.results['changed'] = True
                 return self.results
 
-            response = self.create_update_resource()
+            if self.scale_counts:
+                response = self.create_update_resource(get_scale_body(old_response,
+                                                                      self.scale_counts,
+                                                                      self.body['properties'].get('authProfile')))
+            else:
+                response = self.create_update_resource()
 
             # if not old_response:
             self.results['changed'] = True
@@ -870,7 +989,7 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
 
             # make sure instance is actually deleted, for some Azure resources, instance is hanging around
             # for some time after deletion -- this should be really fixed in Azure
-            while self.get_resource():
+            while not self.async_operation and self.get_resource():
                 time.sleep(20)
         else:
             self.log('OpenShiftManagedCluster instance unchanged')
@@ -878,16 +997,44 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
             response = old_response
 
         if response:
-           self.results["id"] = response["id"]
-           self.results["name"] = response["name"]
-           self.results["type"] = response["type"]
-           self.results["location"] = response["location"]
-           self.results["tags"] = response["tags"]
-           self.results["properties"] = response["properties"]
+            self.set_results(response)
 
         return self.results
 
-    def create_update_resource(self):
+    def set_results(self, response):
+        self.results["id"] = response["id"]
+        self.results["name"] = response["name"]
+        self.results["type"] = response["type"]
+        self.results["location"] = response["location"]
+        self.results["tags"] = response.get("tags")
+        self.results["properties"] = response["properties"]
+
+    def get_count_only_changes(self, modifiers, old_response):
+        '''
+        Return agent pool count changes if nothing else differs from the current cluster, otherwise None.
+        '''
+        counts = dict((k, v) for k, v in get_pool_counts(self.body).items() if v is not None)
+        try:
+            changes = get_count_changes(old_response, counts)
+        except ValueError:
+            # new agent pool
+            return None
+        if not changes:
+            return None
+        old_counts = dict((k.lower(), v) for k, v in get_pool_counts(old_response).items())
+        candidate = deepcopy(self.body)
+        for pool in candidate['properties']['agentPoolProfiles']:
+            if pool.get('count') is not None:
+                pool['count'] = old_counts[pool['name'].lower()]
+        # secrets are never returned, so they can't be compared
+        for provider in (candidate['properties'].get('authProfile') or {}).get('identityProviders') or []:
+            if isinstance(provider.get('provider'), dict):
+                provider['provider'].pop('secret', None)
+        if not self.default_compare(modifiers, candidate, old_response, '', dict(compare=[])):
+            return None
+        return changes
+
+    def create_update_resource(self, body=None):
         # self.log('Creating / Updating the OpenShiftManagedCluster instance {0}'.format(self.))
 
         try:
@@ -895,15 +1042,20 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                                               'PUT',
                                               self.query_parameters,
                                               self.header_parameters,
-                                              self.body,
+                                              body or self.body,
                                               self.status_code,
-                                              600,
-                                              30)
+                                              0,
+                                              0)
         except CloudError as exc:
             self.log('Error attempting to create the OpenShiftManagedCluster instance.')
             self.fail('Error creating the OpenShiftManagedCluster instance: {0}'.format(str(self.body)))
             self.fail('Error creating the OpenShiftManagedCluster instance: {0}'.format(str(exc)))
 
+        operation = self.save_async_operation(response, self.url, 'PUT', self.query_parameters['api-version'])
+        if not self.async_operation:
+            return self.wait_for_operation(operation)
+        self.results['async_operation'] = operation
+
         try:
             response = json.loads(response.text)
         except Exception:
@@ -921,14 +1073,70 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                                               self.header_parameters,
                                               None,
                                               self.status_code,
-                                              600,
-                                              30)
+                                              0,
+                                              0)
         except CloudError as e:
             self.log('Error attempting to delete the OpenShiftManagedCluster instance.')
             self.fail('Error deleting the OpenShiftManagedCluster instance: {0}'.format(str(e)))
 
+        operation = self.save_async_operation(response, self.url, 'DELETE', self.query_parameters['api-version'])
+        if self.async_operation:
+            self.results['async_operation'] = operation
+        else:
+            self.wait_for_operation(operation)
+
         return True
 
+    def wait_for_operation(self, operation):
+        '''
+        Wait for a create, update or delete operation, recording provisioning state transitions.
+
+        Polls often after every transition and backs off while nothing changes, so long cluster
+        deployments are not bound by a fixed polling timeout.
+
+        :return: the cluster after a create or update operation
+        '''
+        start = time.time()
+        delay = MIN_POLL_INTERVAL
+        phase = None
+        resource = None
+        self.results['phases'] = []
+        while True:
+            try:
+                status, error = self.get_async_operation_status(operation)
+            except CloudError as exc:
+                self.fail('Error getting status of the OpenShiftManagedCluster operation: {0}'.format(str(exc)))
+            operation['status'] = status
+            if error:
+                operation['error'] = error
+            self.update_async_operation(operation)
+
+            if operation['method'] == 'PUT':
+                resource = self.get_resource()
+            state = resource['properties'].get('provisioningState') if resource else None
+            current = status if status in ASYNC_TERMINAL_STATES else state or status
+            if current != phase:
+                phase = current
+                delay = MIN_POLL_INTERVAL
+                self.results['phases'].append(dict(state=phase,
+                                                   time=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                                   elapsed=int(time.time() - operation['started'])))
+                self.log('OpenShiftManagedCluster {0} operation: {1}'.format(operation['method'], phase))
+            else:
+                delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+            if status in ASYNC_TERMINAL_STATES:
+                break
+            if time.time() - start > self.timeout:
+                self.fail('Timed out waiting for the OpenShiftManagedCluster operation, it is still running, '
+                          'run the task again to resume waiting', **self.results)
+            time.sleep(delay)
+
+        if status != 'Succeeded':
+            self.fail('OpenShiftManagedCluster {0} operation {1}: {2}'.format(operation['method'], status, operation.get('error')),
+                      **self.results)
+        return resource
+
     def get_resource(self):
         # self.log('Checking if the OpenShiftManagedCluster instance {0} is present'.format(self.))
         found = False
@@ -943,6 +1151,7 @@ class AzureRMOpenShiftManagedClusters(AzureRMModuleBaseExt):
                                               30)
             found = True
             self.log("Response : {0}".format(response))
+            response = json.loads(response.text)
             # self.log("OpenShiftManagedCluster instance : {0} found".format(response.name))
         except CloudError as e:
             self.log('Did not find the OpenShiftManagedCluster instance.')
@@ -210,6 +210,29 @@ options:
             description:
               - Configuration of the provider.
             type: dict
+  subscriptions:
+    description:
+      - List clusters of all these subscriptions at the same time, instead of the current subscription.
+      - Can be combined with I(resource_group) but not with I(name).
+    type: list
+  return_fields:
+    description:
+      - Dotted paths of cluster fields to return, for example C(properties.agentPoolProfiles.count).
+      - All fields are returned when not set.
+    type: list
+  cache_ttl:
+    description:
+      - >-
+        Time in seconds cluster lists of a subscription are reused from the cache in
+        C(~/.ansible/azure_cache/openshift_clusters.json) instead of listed again.
+      - Only used with I(subscriptions). C(0) disables the cache.
+    type: int
+    default: 0
+  max_concurrency:
+    description:
+      - Maximum number of subscriptions listed at the same time.
+    type: int
+    default: 10
 extends_documentation_fragment:
   - azure
 author:
@@ -227,6 +250,20 @@ EXAMPLES = '''
   azure.rm.openshiftmanagedcluster_info:
     resource_group: myResourceGroup
     name: myOpenShiftManagedCluster
+- name: Fleet inventory
+  azure.rm.openshiftmanagedcluster_info:
+    subscriptions:
+      - xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx
+      - yyyyyyyy-yyyy-yyyy-yyyy-yyyyyyyyyyyy
+    return_fields:
+      - id
+      - name
+      - properties.openShiftVersion
+      - properties.clusterVersion
+      - properties.provisioningState
+      - properties.agentPoolProfiles.name
+      - properties.agentPoolProfiles.count
+    cache_ttl: 60
 
 '''
 
@@ -312,12 +349,20 @@ open_shift_managed_clusters:
           returned: always
           type: dict
           sample: null
+cached_subscriptions:
+  description:
+    - Subscriptions whose clusters were taken from the cache.
+  returned: when I(subscriptions) is set
+  type: list
+  sample: ["xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"]
 
 '''
 
+import os
 import time
 import json
-from ansible.module_utils.azure_rm_common import AzureRMModuleBase
+import uuid
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
 from ansible.module_utils.azure_rm_common_rest import GenericRestClient
 from copy import deepcopy
 try:
@@ -327,7 +372,10 @@ except ImportError:
     pass
 
 
-class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
+CLUSTER_CACHE = os.path.join('~', '.ansible', 'azure_cache', 'openshift_clusters.json')
+
+
+class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBaseExt):
     def __init__(self):
         self.module_arg_spec = dict(
             resource_group=dict(
@@ -335,11 +383,29 @@ class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
             ),
             name=dict(
                 type='str'
+            ),
+            subscriptions=dict(
+                type='list'
+            ),
+            return_fields=dict(
+                type='list'
+            ),
+            cache_ttl=dict(
+                type='int',
+                default=0
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
             )
         )
 
         self.resource_group = None
         self.name = None
+        self.subscriptions = None
+        self.return_fields = None
+        self.cache_ttl = None
+        self.max_concurrency = None
         self.location = None
         self.tags = None
         self.plan = None
@@ -367,15 +433,84 @@ class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
         self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
                                                     base_url=self._cloud_environment.endpoints.resource_manager)
 
+        if self.subscriptions is not None and self.name is not None:
+            self.fail("Parameter error: name can't be used with subscriptions.")
+
         if (self.resource_group is not None and
             self.name is not None):
             self.results['open_shift_managed_clusters'] = self.get()
+        elif self.subscriptions is not None:
+            self.results['open_shift_managed_clusters'] = self.list_subscriptions()
         elif (self.resource_group is not None):
             self.results['open_shift_managed_clusters'] = self.listbyresourcegroup()
         else:
             self.results['open_shift_managed_clusters'] = self.list()
+
+        if self.return_fields:
+            clusters = self.results['open_shift_managed_clusters']
+            if isinstance(clusters, list):
+                clusters = [self.project_fields(x, self.return_fields) for x in clusters]
+            elif clusters:
+                clusters = self.project_fields(clusters, self.return_fields)
+            self.results['open_shift_managed_clusters'] = clusters
         return self.results
 
+    def list_subscriptions(self):
+        path = os.path.expanduser(CLUSTER_CACHE)
+        cache = {}
+        if self.cache_ttl:
+            try:
+                with open(path) as f:
+                    cache = json.load(f)
+            except (IOError, ValueError):
+                pass
+
+        keys = dict((x, '{0}/{1}'.format(x, (self.resource_group or '').lower())) for x in self.subscriptions)
+        now = time.time()
+        cached = [x for x in self.subscriptions
+                  if keys[x] in cache and now - cache[keys[x]]['time'] < self.cache_ttl]
+        pending = [x for x in self.subscriptions if x not in cached]
+
+        outcomes = self.run_concurrently(self.list_subscription, pending, self.max_concurrency)
+        for subscription_id, (result, exc) in zip(pending, outcomes):
+            if exc is not None:
+                self.fail('Error listing clusters of subscription {0}: {1}'.format(subscription_id, str(exc)))
+            cache[keys[subscription_id]] = dict(clusters=result, time=now)
+
+        if self.cache_ttl and pending:
+            self.save_cache(path, cache)
+
+        self.results['cached_subscriptions'] = cached
+        clusters = []
+        for subscription_id in self.subscriptions:
+            clusters.extend(cache[keys[subscription_id]]['clusters'])
+        return clusters
+
+    def list_subscription(self, subscription_id):
+        url = '/subscriptions/' + subscription_id
+        if self.resource_group is not None:
+            url += '/resourceGroups/' + self.resource_group
+        items = self.retry_throttled(self.mgmt_client.query_paged,
+                                     url + '/providers/Microsoft.ContainerService/openShiftManagedClusters',
+                                     self.query_parameters,
+                                     self.header_parameters,
+                                     self.status_code)
+        return [self.format_item(x) for x in items]
+
+    def save_cache(self, path, cache):
+        # expired entries of other subscriptions are dropped as well
+        cache = dict((k, v) for k, v in cache.items() if time.time() - v['time'] < self.cache_ttl)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            # write to a temporary file first, so concurrent tasks never read a partial cache
+            temp_path = '{0}.{1}'.format(path, uuid.uuid4())
+            with open(temp_path, 'w') as f:
+                json.dump(cache, f)
+            os.rename(temp_path, path)
+        except (IOError, OSError) as exc:
+            self.log('Failed to update cluster cache - {0}'.format(str(exc)))
+
     def get(self):
         response = None
         results = {}
@@ -409,8 +544,6 @@ class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
         return self.format_item(results)
 
     def listbyresourcegroup(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -423,24 +556,17 @@ class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
         self.url = self.url.replace('{{ resource_group }}', self.resource_group)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def list(self):
-        response = None
-        results = {}
         # prepare url
         self.url = ('/subscriptions' +
                     '/{{ subscription_id }}' +
@@ -448,24 +574,17 @@ class AzureRMOpenShiftManagedClustersInfo(AzureRMModuleBase):
                     '/Microsoft.ContainerService' +
                     '/openShiftManagedClusters')
         self.url = self.url.replace('{{ subscription_id }}', self.subscription_id)
-        self.url = self.url.replace('{{ resource_group }}', self.resource_group)
-        self.url = self.url.replace('{{ open_shift_managed_cluster_name }}', self.name)
 
         try:
-            response = self.mgmt_client.query(self.url,
-                                              'GET',
-                                              self.query_parameters,
-                                              self.header_parameters,
-                                              None,
-                                              self.status_code,
-                                              600,
-                                              30)
-            results = json.loads(response.text)
-            # self.log('Response : {0}'.format(response))
+            results = self.mgmt_client.query_paged(self.url,
+                                                   self.query_parameters,
+                                                   self.header_parameters,
+                                                   self.status_code)
         except CloudError as e:
             self.log('Could not get info for @(Model.ModuleOperationNameUpper).')
+            results = []
 
-        return [self.format_item(x) for x in results['value']] if results['value'] else []
+        return [self.format_item(x) for x in results]
 
     def format_item(self, item):
         d = {
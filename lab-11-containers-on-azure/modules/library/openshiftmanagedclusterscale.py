@@ -0,0 +1,357 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2019 Zim Kalinowski, (@zikalino)
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: openshiftmanagedclusterscale
+version_added: '2.9'
+short_description: Scale agent pools of Azure OpenShiftManagedCluster instances.
+description:
+  - 'Change agent pool node counts of one or more Azure OpenShiftManagedCluster instances.'
+  - >-
+    Only node counts are changed, the rest of the current cluster definition is sent back unchanged,
+    except the auth profile, see I(auth_profile). Clusters are scaled at the same time.
+options:
+  clusters:
+    description:
+      - Clusters to scale.
+    required: true
+    type: list
+    suboptions:
+      resource_group:
+        description:
+          - The name of the resource group.
+        required: true
+        type: str
+      name:
+        description:
+          - Resource name
+        required: true
+        type: str
+      agent_pool_profiles:
+        description:
+          - Desired node counts of agent pools, pools not listed keep their count.
+        required: true
+        type: list
+        suboptions:
+          name:
+            description:
+              - Unique name of the pool profile in the context of the subscription and resource group.
+            required: true
+            type: str
+          count:
+            description:
+              - Number of agents (VMs) to host docker containers.
+            required: true
+            type: int
+      auth_profile:
+        description:
+          - Configures OpenShift authentication, as I(auth_profile) of M(openshiftmanagedcluster).
+          - >-
+            The request replaces the whole cluster definition, but identity provider secrets are never returned
+            by the service, so the current auth profile can't be sent back. Set it, including secrets, for clusters
+            using an identity provider. It's left out of the request otherwise.
+        type: dict
+        suboptions:
+          identity_providers:
+            description:
+              - Type of authentication profile to use.
+            type: list
+            suboptions:
+              name:
+                description:
+                  - Name of the provider.
+                type: str
+              provider:
+                description:
+                  - Configuration of the provider.
+                type: dict
+  max_concurrency:
+    description:
+      - Maximum number of clusters scaled at the same time.
+    type: int
+    default: 5
+  timeout:
+    description:
+      - Time in seconds to wait for a single cluster to finish scaling.
+    type: int
+    default: 3600
+extends_documentation_fragment:
+  - azure
+author:
+  - Zim Kalinowski (@zikalino)
+
+'''
+
+EXAMPLES = '''
+- name: Scale compute pools
+  openshiftmanagedclusterscale:
+    clusters:
+      - resource_group: myResourceGroup
+        name: myCluster1
+        agent_pool_profiles:
+          - name: compute
+            count: 6
+      - resource_group: myResourceGroup
+        name: myCluster2
+        agent_pool_profiles:
+          - name: compute
+            count: 4
+'''
+
+RETURN = '''
+clusters:
+  description:
+    - Result for every cluster, in order of I(clusters).
+  returned: always
+  type: complex
+  contains:
+    resource_group:
+      description:
+        - The name of the resource group.
+      returned: always
+      type: str
+      sample: myResourceGroup
+    name:
+      description:
+        - Resource name
+      returned: always
+      type: str
+      sample: myCluster1
+    changes:
+      description:
+        - Agent pools with count changed, with old and new count.
+      returned: when cluster was found
+      type: dict
+      sample: {"compute": {"old": 4, "new": 6}}
+    status:
+      description:
+        - C(Succeeded), C(Failed), C(Unchanged) or C(Pending) in check mode.
+      returned: always
+      type: str
+      sample: Succeeded
+    elapsed:
+      description:
+        - Time in seconds the cluster took to scale.
+      returned: always
+      type: float
+      sample: 612.4
+    error:
+      description:
+        - Error message if the cluster failed to scale.
+      returned: when scaling failed
+      type: str
+elapsed:
+  description:
+    - Time in seconds all clusters took.
+  returned: always
+  type: float
+  sample: 640.1
+'''
+
+import time
+import json
+from ansible.module_utils.azure_rm_common_ext import AzureRMModuleBaseExt
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+from ansible.module_utils.azure_rm_openshiftmanagedcluster_scale import get_count_changes, get_scale_body
+
+
+pool_spec = dict(
+    name=dict(
+        type='str',
+        required=True
+    ),
+    count=dict(
+        type='int',
+        required=True
+    )
+)
+
+
+cluster_spec = dict(
+    resource_group=dict(
+        type='str',
+        required=True
+    ),
+    name=dict(
+        type='str',
+        required=True
+    ),
+    agent_pool_profiles=dict(
+        type='list',
+        elements='dict',
+        options=pool_spec,
+        required=True
+    ),
+    auth_profile=dict(
+        type='dict',
+        options=dict(
+            identity_providers=dict(
+                type='list',
+                elements='dict',
+                options=dict(
+                    name=dict(
+                        type='str'
+                    ),
+                    provider=dict(
+                        type='dict'
+                    )
+                )
+            )
+        )
+    )
+)
+
+
+class AzureRMOpenShiftManagedClusterScale(AzureRMModuleBaseExt):
+    def __init__(self):
+        self.module_arg_spec = dict(
+            clusters=dict(
+                type='list',
+                elements='dict',
+                options=cluster_spec,
+                required=True
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=5
+            ),
+            timeout=dict(
+                type='int',
+                default=3600
+            )
+        )
+
+        self.clusters = None
+        self.max_concurrency = None
+        self.timeout = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.status_code = [200, 201, 202]
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2019-04-30'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMOpenShiftManagedClusterScale, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                                  supports_check_mode=True,
+                                                                  supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        seen = set()
+        for cluster in self.clusters:
+            key = (cluster['resource_group'].lower(), cluster['name'].lower())
+            if key in seen:
+                self.fail("Parameter error: cluster {0} specified more than once.".format(cluster['name']))
+            seen.add(key)
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        items = [dict(resource_group=x['resource_group'],
+                      name=x['name'],
+                      counts=dict((p['name'], p['count']) for p in x['agent_pool_profiles']),
+                      auth_profile=get_auth_profile(x['auth_profile']),
+                      status='Pending') for x in self.clusters]
+
+        start = time.time()
+        outcomes = self.run_concurrently(self.scale, items, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for item, (elapsed, exc) in zip(items, outcomes):
+            item.pop('counts')
+            # contains secrets
+            item.pop('auth_profile')
+            if exc is not None:
+                item['status'] = 'Failed'
+                item['error'] = str(exc)
+                failed.append(item['name'])
+            if item.get('changes'):
+                self.results['changed'] = True
+        self.results['clusters'] = items
+
+        if failed:
+            self.fail("Error scaling OpenShiftManagedCluster instances {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def scale(self, item):
+        '''
+        Scale agent pools of a single cluster. Runs on a worker thread.
+        '''
+        start = time.time()
+        item['elapsed'] = 0
+        url = ('/subscriptions/{{ subscription_id }}' +
+               '/resourceGroups/{{ resource_group }}' +
+               '/providers/Microsoft.ContainerService' +
+               '/openShiftManagedClusters/{{ open_shift_managed_cluster_name }}')
+        url = url.replace('{{ subscription_id }}', self.subscription_id)
+        url = url.replace('{{ resource_group }}', item['resource_group'])
+        url = url.replace('{{ open_shift_managed_cluster_name }}', item['name'])
+
+        response = self.retry_throttled(self.mgmt_client.query,
+                                        url,
+                                        'GET',
+                                        self.query_parameters,
+                                        self.header_parameters,
+                                        None,
+                                        [200],
+                                        600,
+                                        30)
+        cluster = json.loads(response.text)
+        changes = get_count_changes(cluster, item['counts'])
+        item['changes'] = dict((k, dict(old=v[0], new=v[1])) for k, v in changes.items())
+        if not changes:
+            item['status'] = 'Unchanged'
+            return 0
+        if self.check_mode:
+            return 0
+
+        self.retry_throttled(self.mgmt_client.query,
+                             url,
+                             'PUT',
+                             self.query_parameters,
+                             self.header_parameters,
+                             get_scale_body(cluster, dict((k, v[1]) for k, v in changes.items()), item['auth_profile']),
+                             self.status_code,
+                             self.timeout,
+                             30)
+        item['status'] = 'Succeeded'
+        item['elapsed'] = time.time() - start
+        return item['elapsed']
+
+
+def get_auth_profile(auth_profile):
+    '''
+    Return auth profile in request format.
+    '''
+    if auth_profile is None:
+        return None
+    return dict(identityProviders=[dict(name=x['name'], provider=x['provider'])
+                                   for x in auth_profile['identity_providers'] or []])
+
+
+def main():
+    AzureRMOpenShiftManagedClusterScale()
+
+
+if __name__ == '__main__':
+    main()
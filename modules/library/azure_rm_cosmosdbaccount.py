@@ -20,6 +20,8 @@ version_added: "2.8"
 short_description: Manage Azure Database Account instance.
 description:
     - Create, update and delete instance of Azure Database Account.
+    - "When an existing account only needs region changes, regions are changed with dedicated operations: all removed regions in one update,
+       all added regions in one update and failover priorities through a failover priority change, ordered so that the write region can be moved."
 
 options:
     resource_group:
@@ -178,6 +180,18 @@ EXAMPLES = '''
         default_consistency_level: bounded_staleness
         max_staleness_prefix: 10
         max_interval_in_seconds: 1000
+
+  - name: Move write region to westus and replace southcentralus with eastus
+    azure_rm_cosmosdbaccount:
+      resource_group: myResourceGroup
+      name: myDatabaseAccount
+      location: westus
+      geo_rep_locations:
+        - name: westus
+          failover_priority: 0
+        - name: eastus
+          failover_priority: 1
+      database_account_offer_type: Standard
 '''
 
 RETURN = '''
@@ -188,6 +202,72 @@ id:
     type: str
     sample: "/subscriptions/xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx/resourceGroups/myResourceGroup/providers/Microsoft.DocumentDB/databaseAccounts/myData
              baseAccount"
+compare:
+    description:
+        - All differences between module parameters and the existing account, also reported in check mode.
+    returned: when the account exists
+    type: complex
+    contains:
+        path:
+            description:
+                - Path of the changed value in the request body, list items are identified by name.
+            returned: always
+            type: str
+            sample: /locations/eastus
+        new:
+            description:
+                - Requested value, null when the list item is removed.
+            returned: always
+            type: raw
+            sample: {"location_name": "eastus", "failover_priority": 1}
+        old:
+            description:
+                - Current value, null when the value or list item doesn't exist yet.
+            returned: always
+            type: raw
+            sample: null
+regions:
+    description:
+        - Region changes applied to an existing account, in order.
+    returned: when regions of an existing account were changed
+    type: complex
+    contains:
+        name:
+            description:
+                - The name of the region.
+            returned: always
+            type: str
+            sample: eastus
+        action:
+            description:
+                - C(add), C(remove) or C(failover_priority).
+            returned: always
+            type: str
+            sample: add
+        failover_priority:
+            description:
+                - Failover priority of the region after the step.
+            returned: when action is add or failover_priority
+            type: int
+            sample: 1
+        step:
+            description:
+                - Operation the change was part of, changes of the same step are applied by a single operation.
+            returned: always
+            type: int
+            sample: 2
+        status:
+            description:
+                - C(Succeeded), C(Failed), C(Skipped) when an earlier step failed or C(Pending) in check mode.
+            returned: always
+            type: str
+            sample: Succeeded
+        elapsed:
+            description:
+                - Time in seconds the step took.
+            returned: when applied
+            type: float
+            sample: 1520.4
 '''
 
 import time
@@ -312,6 +392,8 @@ class AzureRMCosmosDBAccount(AzureRMModuleBase):
         self.resource_group = None
         self.name = None
         self.parameters = dict()
+        self.region_steps = None
+        self.update_properties = False
 
         self.results = dict(changed=False)
         self.mgmt_client = None
@@ -331,17 +413,7 @@ class AzureRMCosmosDBAccount(AzureRMModuleBase):
             elif kwargs[key] is not None:
                 self.parameters[key] = kwargs[key]
 
-        kind = self.parameters.get('kind')
-        if kind == 'global_document_db':
-            self.parameters['kind'] = 'GlobalDocumentDB'
-        elif kind == 'mongo_db':
-            self.parameters['kind'] = 'MongoDB'
-        elif kind == 'parse':
-            self.parameters['kind'] = 'Parse'
-
-        dict_camelize(self.parameters, ['consistency_policy', 'default_consistency_level'], True)
-        dict_rename(self.parameters, ['geo_rep_locations', 'name'], 'location_name')
-        dict_rename(self.parameters, ['geo_rep_locations'], 'locations')
+        transform(self.parameters, PARAMETER_TRANSFORMS)
         self.parameters['capabilities'] = []
         if self.parameters.pop('enable_cassandra', False):
             self.parameters['capabilities'].append({'name': 'EnableCassandra'})
@@ -386,17 +458,29 @@ class AzureRMCosmosDBAccount(AzureRMModuleBase):
                 self.to_do = Actions.Delete
             elif self.state == 'present':
                 old_response['locations'] = old_response['failover_policies']
-                if not default_compare(self.parameters, old_response, '', self.results):
+                differences = get_diff(self.parameters, old_response, '', [])
+                self.results['compare'] = differences
+                regions = [x for x in differences if x['path'] == '/locations' or x['path'].startswith('/locations/')]
+                if regions and self.parameters.get('locations'):
+                    self.region_steps = get_region_steps(old_response['failover_policies'], self.parameters['locations'])
+                self.update_properties = len(differences) > len(regions)
+                if self.update_properties or self.region_steps:
                     self.to_do = Actions.Update
 
         if (self.to_do == Actions.Create) or (self.to_do == Actions.Update):
             self.log("Need to Create / Update the Database Account instance")
 
+            if self.region_steps:
+                self.results['regions'] = get_region_changes(self.region_steps)
+
             if self.check_mode:
                 self.results['changed'] = True
                 return self.results
 
-            response = self.create_update_databaseaccount()
+            if self.region_steps:
+                response = self.update_regions()
+            if self.to_do == Actions.Create or self.update_properties:
+                response = self.create_update_databaseaccount()
 
             self.results['changed'] = True
             self.log("Creation / Update done")
@@ -437,6 +521,43 @@ class AzureRMCosmosDBAccount(AzureRMModuleBase):
             self.fail("Error creating the Database Account instance: {0}".format(str(exc)))
         return response.as_dict()
 
+    def update_regions(self):
+        '''
+        Applies region changes of an existing Database Account step by step.
+
+        :return: deserialized Database Account instance state dictionary
+        '''
+        response = None
+        for index, step in enumerate(self.region_steps):
+            changes = [x for x in self.results['regions'] if x['step'] == index + 1]
+            self.log("Changing regions of the Database Account instance {0}: {1}".format(self.name, step['action']))
+            start = time.time()
+            try:
+                if step['action'] == 'failover_priority':
+                    poller = self.mgmt_client.database_accounts.failover_priority_change(resource_group_name=self.resource_group,
+                                                                                         account_name=self.name,
+                                                                                         failover_policies=step['locations'])
+                    self.get_poller_result(poller)
+                else:
+                    # other changed properties go with the first update
+                    parameters = dict(self.parameters, locations=step['locations'])
+                    poller = self.mgmt_client.database_accounts.create_or_update(resource_group_name=self.resource_group,
+                                                                                 account_name=self.name,
+                                                                                 create_update_parameters=parameters)
+                    response = self.get_poller_result(poller).as_dict()
+                    self.update_properties = False
+            except CloudError as exc:
+                for change in changes:
+                    change['status'] = 'Failed'
+                for change in self.results['regions']:
+                    if change['step'] > index + 1:
+                        change['status'] = 'Skipped'
+                self.fail("Error changing regions of the Database Account instance: {0}".format(str(exc)), **self.results)
+            for change in changes:
+                change['status'] = 'Succeeded'
+                change['elapsed'] = time.time() - start
+        return response or self.get_databaseaccount()
+
     def delete_databaseaccount(self):
         '''
         Deletes specified Database Account instance in the specified subscription and resource group.
@@ -479,110 +600,170 @@ class AzureRMCosmosDBAccount(AzureRMModuleBase):
         return False
 
 
-def default_compare(new, old, path, result):
+# conversions of module parameters into the request body, applied in a single pass
+PARAMETER_TRANSFORMS = {
+    'kind': {
+        'values': {
+            'global_document_db': 'GlobalDocumentDB',
+            'mongo_db': 'MongoDB',
+            'parse': 'Parse'
+        }
+    },
+    'consistency_policy': {
+        'children': {
+            'default_consistency_level': {'camelize': True}
+        }
+    },
+    'geo_rep_locations': {
+        'rename': 'locations',
+        'children': {
+            'name': {'rename': 'location_name'}
+        }
+    }
+}
+
+# keys identifying items of lists of dicts when comparing
+LIST_ITEM_KEYS = ['id', 'name', 'location_name']
+
+
+def transform(d, spec):
+    '''
+    Renames and converts values of d in place, walking it once. Lists are transformed item by item.
+
+    :param d: dict or list of dicts
+    :param spec: dict of key to rule, rule may have values (mapping), camelize, upper, rename and children
+    :return: d
+    '''
+    if isinstance(d, list):
+        for item in d:
+            transform(item, spec)
+    elif isinstance(d, dict):
+        for key, rule in spec.items():
+            value = d.pop(key, None)
+            if value is None:
+                continue
+            if 'children' in rule:
+                transform(value, rule['children'])
+            if 'values' in rule:
+                value = rule['values'].get(value, value)
+            if rule.get('camelize'):
+                value = _snake_to_camel(value, True)
+            if rule.get('upper'):
+                value = value.upper()
+            d[rule.get('rename', key)] = value
+    return d
+
+
+def normalize_key(value):
+    return str(value).replace(' ', '').lower()
+
+
+def get_diff(new, old, path, differences):
+    '''
+    Compares new values with old ones and collects all differences.
+
+    Values not set in new are not compared. Lists of dicts are matched by id, name or location_name,
+    other lists are compared ignoring order.
+
+    :return: differences, list of dicts with path, new and old
+    '''
     if new is None:
-        return True
-    elif isinstance(new, dict):
+        return differences
+    if isinstance(new, dict):
         if not isinstance(old, dict):
-            result['compare'] = 'changed [' + path + '] old dict is null'
-            return False
-        for k in new.keys():
-            if not default_compare(new.get(k), old.get(k, None), path + '/' + k, result):
-                return False
-        return True
+            differences.append(dict(path=path, new=new, old=old))
+            return differences
+        for k in sorted(new.keys()):
+            get_diff(new[k], old.get(k), path + '/' + k, differences)
     elif isinstance(new, list):
-        if not isinstance(old, list) or len(new) != len(old):
-            result['compare'] = 'changed [' + path + '] length is different or null'
-            return False
-        elif len(old) == 0:
-            return True
-        elif isinstance(old[0], dict):
-            key = None
-            if 'id' in old[0] and 'id' in new[0]:
-                key = 'id'
-            elif 'name' in old[0] and 'name' in new[0]:
-                key = 'name'
-            else:
-                key = list(old[0])[0]
-            new = sorted(new, key=lambda x: x.get(key, ''))
-            old = sorted(old, key=lambda x: x.get(key, ''))
-        else:
-            new = sorted(new)
-            old = sorted(old)
-        for i in range(len(new)):
-            if not default_compare(new[i], old[i], path + '/*', result):
-                return False
-        return True
+        key = None
+        if new and isinstance(new[0], dict):
+            key = next((x for x in LIST_ITEM_KEYS if x in new[0]), None)
+        if not isinstance(old, list):
+            differences.append(dict(path=path, new=new, old=old))
+        elif key is not None:
+            old_items = dict((normalize_key(x.get(key)), x) for x in old if isinstance(x, dict))
+            new_keys = set()
+            for item in new:
+                new_keys.add(normalize_key(item.get(key)))
+                get_diff(item, old_items.get(normalize_key(item.get(key))), '{0}/{1}'.format(path, item.get(key)), differences)
+            for item_key, item in sorted(old_items.items()):
+                if item_key not in new_keys:
+                    differences.append(dict(path='{0}/{1}'.format(path, item.get(key)), new=None, old=item))
+        elif len(new) != len(old) or sorted(new, key=str) != sorted(old, key=str):
+            differences.append(dict(path=path, new=new, old=old))
     else:
-        if path == '/location' or path.endswith('location_name'):
-            new = new.replace(' ', '').lower()
-            old = new.replace(' ', '').lower()
-        if new == old:
-            return True
-        else:
-            result['compare'] = 'changed [' + path + '] ' + str(new) + ' != ' + str(old)
-            return False
-
-
-def dict_camelize(d, path, camelize_first):
-    if isinstance(d, list):
-        for i in range(len(d)):
-            dict_camelize(d[i], path, camelize_first)
-    elif isinstance(d, dict):
-        if len(path) == 1:
-            old_value = d.get(path[0], None)
-            if old_value is not None:
-                d[path[0]] = _snake_to_camel(old_value, camelize_first)
-        else:
-            sd = d.get(path[0], None)
-            if sd is not None:
-                dict_camelize(sd, path[1:], camelize_first)
-
-
-def dict_upper(d, path):
-    if isinstance(d, list):
-        for i in range(len(d)):
-            dict_upper(d[i], path)
-    elif isinstance(d, dict):
-        if len(path) == 1:
-            old_value = d.get(path[0], None)
-            if old_value is not None:
-                d[path[0]] = old_value.upper()
-        else:
-            sd = d.get(path[0], None)
-            if sd is not None:
-                dict_upper(sd, path[1:])
-
-
-def dict_rename(d, path, new_name):
-    if isinstance(d, list):
-        for i in range(len(d)):
-            dict_rename(d[i], path, new_name)
-    elif isinstance(d, dict):
-        if len(path) == 1:
-            old_value = d.pop(path[0], None)
-            if old_value is not None:
-                d[new_name] = old_value
-        else:
-            sd = d.get(path[0], None)
-            if sd is not None:
-                dict_rename(sd, path[1:], new_name)
-
-
-def dict_expand(d, path, outer_dict_name):
-    if isinstance(d, list):
-        for i in range(len(d)):
-            dict_expand(d[i], path, outer_dict_name)
-    elif isinstance(d, dict):
-        if len(path) == 1:
-            old_value = d.pop(path[0], None)
-            if old_value is not None:
-                d[outer_dict_name] = d.get(outer_dict_name, {})
-                d[outer_dict_name] = old_value
-        else:
-            sd = d.get(path[0], None)
-            if sd is not None:
-                dict_expand(sd, path[1:], outer_dict_name)
+        new_value = new
+        old_value = old
+        if (path == '/location' or path.endswith('/location_name')) and old is not None:
+            new_value = normalize_key(new)
+            old_value = normalize_key(old)
+        if new_value != old_value:
+            differences.append(dict(path=path, new=new, old=old))
+    return differences
+
+
+def region_key(name):
+    return name.replace(' ', '').lower()
+
+
+def get_region_steps(current, desired):
+    '''
+    Computes operations turning current regions of an account into desired ones.
+
+    Regions can't be added or removed together with a failover priority change, and the write region
+    can't be removed. Removed and added regions are each changed by a single update, failover priority
+    changes are only used where needed to move the write region or to reach the desired order.
+
+    :param current: current failover policies, dicts with location_name and failover_priority
+    :param desired: desired locations, dicts with location_name and failover_priority
+    :return: list of steps with action, regions and locations to send
+    '''
+    names = {}
+    for x in current + desired:
+        names.setdefault(region_key(x['location_name']), x['location_name'])
+    state = [region_key(x['location_name']) for x in sorted(current, key=lambda x: x['failover_priority'])]
+    target = [region_key(x['location_name']) for x in sorted(desired, key=lambda x: x['failover_priority'])]
+    adds = [x for x in target if x not in state]
+    removes = [x for x in state if x not in target]
+    steps = []
+
+    def locations(order):
+        return [dict(location_name=names[x], failover_priority=i) for i, x in enumerate(order)]
+
+    def add_step(order, action, regions):
+        steps.append(dict(action=action, regions=[names[x] for x in regions], locations=locations(order)))
+        return order
+
+    if state and state[0] in removes:
+        if target[0] not in state:
+            # new write region has to exist before the old one can be removed
+            state = add_step(state + adds, 'add', adds)
+            adds = []
+        order = [x for x in target if x in state] + [x for x in state if x in removes]
+        state = add_step(order, 'failover_priority', [x for i, x in enumerate(order) if state[i] != x])
+    if removes:
+        state = add_step([x for x in state if x not in removes], 'remove', removes)
+    if adds:
+        state = add_step(state + adds, 'add', adds)
+    if state != target:
+        state = add_step(target, 'failover_priority', [x for i, x in enumerate(target) if state[i] != x])
+    return steps
+
+
+def get_region_changes(steps):
+    '''
+    Returns list of changed regions of every step, used to report progress.
+    '''
+    changes = []
+    for index, step in enumerate(steps):
+        priorities = dict((x['location_name'], x['failover_priority']) for x in step['locations'])
+        for name in step['regions']:
+            change = dict(name=name, action=step['action'], step=index + 1, status='Pending')
+            if name in priorities:
+                change['failover_priority'] = priorities[name]
+            changes.append(change)
+    return changes
 
 
 def main():
@@ -0,0 +1,458 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2018 Zim Kalinowski, <zikalino@microsoft.com>
+#
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+---
+module: azure_rm_cosmosdbthroughput
+version_added: "2.8"
+short_description: Manage throughput of Azure Cosmos DB databases and containers.
+description:
+    - Set manual or autoscale throughput (RU/s) of databases and containers of a Cosmos DB account.
+    - Resources are changed at the same time, switching between manual and autoscale throughput when needed.
+    - Target throughput can be computed from peak consumption read from a metrics file.
+
+options:
+    resource_group:
+        description:
+            - Name of an Azure resource group.
+        required: True
+    account_name:
+        description:
+            - Cosmos DB database account name.
+        required: True
+    api:
+        description:
+            - API of the account.
+            - Detected from kind of the account when not set.
+        choices:
+            - 'sql'
+            - 'mongo_db'
+    resources:
+        description:
+            - Databases and containers to change.
+        type: list
+        suboptions:
+            database:
+                description:
+                    - Name of the database.
+                required: True
+            container:
+                description:
+                    - Name of the container, or collection of a MongoDB account.
+                    - Throughput of the database is changed when not set.
+            throughput:
+                description:
+                    - Manual throughput in RU/s.
+                    - Mutually exclusive with I(max_throughput).
+                type: int
+            max_throughput:
+                description:
+                    - Maximum autoscale throughput in RU/s.
+                    - Mutually exclusive with I(throughput).
+                type: int
+    metrics_file:
+        description:
+            - "CSV file with columns C(database), C(container) and C(peak_ru), peak consumed RU/s of every resource, for example
+               exported from Azure Monitor. Target throughput of these resources is the peak plus I(headroom), rounded up."
+            - Resources also listed in I(resources) use the throughput given there.
+    headroom:
+        description:
+            - Percentage added to peak consumption from I(metrics_file).
+        type: int
+        default: 20
+    autoscale:
+        description:
+            - Use autoscale throughput for targets computed from I(metrics_file).
+        type: bool
+        default: False
+    max_concurrency:
+        description:
+            - Maximum number of resources changed at the same time.
+        type: int
+        default: 10
+
+extends_documentation_fragment:
+    - azure
+
+author:
+    - "Zim Kalinowski (@zikalino)"
+
+'''
+
+EXAMPLES = '''
+  - name: Scale up before load test
+    azure_rm_cosmosdbthroughput:
+      resource_group: myResourceGroup
+      account_name: myDatabaseAccount
+      resources:
+        - database: webratings
+          max_throughput: 10000
+        - database: todo
+          container: items
+          throughput: 2000
+
+  - name: Size containers from last load test
+    azure_rm_cosmosdbthroughput:
+      resource_group: myResourceGroup
+      account_name: myDatabaseAccount
+      metrics_file: peak-ru.csv
+      headroom: 30
+      autoscale: yes
+'''
+
+RETURN = '''
+resources:
+    description:
+        - Result for every database and container.
+    returned: always
+    type: complex
+    contains:
+        database:
+            description:
+                - Name of the database.
+            returned: always
+            type: str
+            sample: webratings
+        container:
+            description:
+                - Name of the container.
+            returned: when set
+            type: str
+            sample: items
+        old:
+            description:
+                - Throughput before the change, with I(throughput) or I(max_throughput).
+            returned: when throughput was read
+            type: dict
+            sample: {"throughput": 400}
+        new:
+            description:
+                - Requested throughput, with I(throughput) or I(max_throughput).
+            returned: always
+            type: dict
+            sample: {"max_throughput": 10000}
+        status:
+            description:
+                - C(Succeeded), C(Failed), C(Unchanged) or C(Pending) in check mode.
+            returned: always
+            type: str
+            sample: Succeeded
+        elapsed:
+            description:
+                - Time in seconds the change took.
+            returned: always
+            type: float
+            sample: 12.5
+        error:
+            description:
+                - Error message if the change failed.
+            returned: when change failed
+            type: str
+elapsed:
+    description:
+        - Time in seconds all changes took.
+    returned: always
+    type: float
+    sample: 20.3
+'''
+
+import csv
+import json
+import time
+from multiprocessing.pool import ThreadPool
+from ansible.module_utils.azure_rm_common import AzureRMModuleBase
+from ansible.module_utils.azure_rm_common_rest import GenericRestClient
+
+try:
+    from msrestazure.azure_exceptions import CloudError
+except ImportError:
+    # This is handled in azure_rm_common
+    pass
+
+
+# path segments of databases and containers of every API
+API_PATHS = {
+    'sql': ('sqlDatabases', 'containers'),
+    'mongo_db': ('mongodbDatabases', 'collections')
+}
+
+# smallest manual throughput and step of computed targets
+MIN_THROUGHPUT = 400
+THROUGHPUT_STEP = 100
+
+# smallest autoscale maximum and step of computed targets
+MIN_MAX_THROUGHPUT = 1000
+MAX_THROUGHPUT_STEP = 1000
+
+
+class AzureRMCosmosDBThroughput(AzureRMModuleBase):
+    """Configuration class for throughput of Azure Cosmos DB databases and containers"""
+
+    def __init__(self):
+        self.module_arg_spec = dict(
+            resource_group=dict(
+                type='str',
+                required=True
+            ),
+            account_name=dict(
+                type='str',
+                required=True
+            ),
+            api=dict(
+                type='str',
+                choices=['sql', 'mongo_db']
+            ),
+            resources=dict(
+                type='list',
+                elements='dict',
+                options=dict(
+                    database=dict(
+                        type='str',
+                        required=True
+                    ),
+                    container=dict(
+                        type='str'
+                    ),
+                    throughput=dict(
+                        type='int'
+                    ),
+                    max_throughput=dict(
+                        type='int'
+                    )
+                )
+            ),
+            metrics_file=dict(
+                type='str'
+            ),
+            headroom=dict(
+                type='int',
+                default=20
+            ),
+            autoscale=dict(
+                type='bool',
+                default=False
+            ),
+            max_concurrency=dict(
+                type='int',
+                default=10
+            )
+        )
+
+        self.resource_group = None
+        self.account_name = None
+        self.api = None
+        self.resources = None
+        self.metrics_file = None
+        self.headroom = None
+        self.autoscale = None
+        self.max_concurrency = None
+
+        self.results = dict(changed=False)
+        self.mgmt_client = None
+        self.url = None
+        self.status_code = [200, 202]
+
+        self.query_parameters = {}
+        self.query_parameters['api-version'] = '2021-04-15'
+        self.header_parameters = {}
+        self.header_parameters['Content-Type'] = 'application/json; charset=utf-8'
+
+        super(AzureRMCosmosDBThroughput, self).__init__(derived_arg_spec=self.module_arg_spec,
+                                                        supports_check_mode=True,
+                                                        supports_tags=False)
+
+    def exec_module(self, **kwargs):
+        """Main module execution method"""
+
+        for key in list(self.module_arg_spec.keys()):
+            setattr(self, key, kwargs[key])
+
+        if not self.resources and not self.metrics_file:
+            self.fail("Parameter error: resources or metrics_file is required.")
+
+        targets = {}
+        if self.metrics_file:
+            for item in self.read_metrics():
+                targets[(item['database'].lower(), (item['container'] or '').lower())] = item
+        for item in self.resources or []:
+            if not item.get('database'):
+                self.fail("Parameter error: database is required in every item of resources.")
+            if (item.get('throughput') is None) == (item.get('max_throughput') is None):
+                self.fail("Parameter error: set either throughput or max_throughput of {0}.".format(format_name(item)))
+            targets[(item['database'].lower(), (item.get('container') or '').lower())] = dict(database=item['database'],
+                                                                                              container=item.get('container') or None,
+                                                                                              throughput=item.get('throughput'),
+                                                                                              max_throughput=item.get('max_throughput'))
+
+        self.mgmt_client = self.get_mgmt_svc_client(GenericRestClient,
+                                                    base_url=self._cloud_environment.endpoints.resource_manager)
+
+        self.url = ('/subscriptions/' + self.subscription_id +
+                    '/resourceGroups/' + self.resource_group +
+                    '/providers/Microsoft.DocumentDB/databaseAccounts/' + self.account_name)
+
+        if self.api is None:
+            try:
+                response = self.mgmt_client.query(self.url, 'GET', self.query_parameters, self.header_parameters,
+                                                  None, [200], 0, 0)
+            except CloudError as exc:
+                self.fail("Error getting the Database Account instance {0}: {1}".format(self.account_name, str(exc)))
+            self.api = 'mongo_db' if json.loads(response.text).get('kind') == 'MongoDB' else 'sql'
+
+        items = []
+        for key in sorted(targets):
+            target = targets[key]
+            item = dict(database=target['database'],
+                        new=dict((k, target[k]) for k in ['throughput', 'max_throughput'] if target[k] is not None),
+                        status='Pending',
+                        elapsed=0)
+            if target['container']:
+                item['container'] = target['container']
+            items.append(item)
+
+        start = time.time()
+        outcomes = run_concurrently(self.update_throughput, items, self.max_concurrency)
+        self.results['elapsed'] = time.time() - start
+
+        failed = []
+        for item, (result, exc) in zip(items, outcomes):
+            if exc is not None:
+                item['status'] = 'Failed'
+                item['error'] = str(exc)
+                failed.append(format_name(item))
+            elif item['status'] != 'Unchanged':
+                self.results['changed'] = True
+        self.results['resources'] = items
+
+        if failed:
+            self.fail("Error changing throughput of {0}".format(', '.join(failed)), **self.results)
+
+        return self.results
+
+    def read_metrics(self):
+        '''
+        Reads peak consumption from the metrics file and computes target throughput.
+
+        :return: list of dicts with database, container, throughput and max_throughput
+        '''
+        targets = []
+        try:
+            with open(self.metrics_file) as f:
+                for row in csv.DictReader(f):
+                    row = dict((k.strip().lower(), (v or '').strip()) for k, v in row.items() if k)
+                    if not row.get('database') or not row.get('peak_ru'):
+                        self.fail("Column database or peak_ru missing in row {0} of {1}".format(len(targets) + 2, self.metrics_file))
+                    try:
+                        peak = float(row['peak_ru'])
+                    except ValueError:
+                        self.fail("Invalid peak_ru in row {0} of {1}".format(len(targets) + 2, self.metrics_file))
+                    target = dict(database=row['database'], container=row.get('container') or None, throughput=None, max_throughput=None)
+                    if self.autoscale:
+                        # autoscale scales between 10% and 100% of the maximum
+                        target['max_throughput'] = round_up(peak * (100 + self.headroom) / 100, MAX_THROUGHPUT_STEP, MIN_MAX_THROUGHPUT)
+                    else:
+                        target['throughput'] = round_up(peak * (100 + self.headroom) / 100, THROUGHPUT_STEP, MIN_THROUGHPUT)
+                    targets.append(target)
+        except IOError as exc:
+            self.fail("Error reading {0} - {1}".format(self.metrics_file, str(exc)))
+        return targets
+
+    def update_throughput(self, item):
+        '''
+        Changes throughput of a single database or container. Runs on a worker thread.
+        '''
+        start = time.time()
+        database_path, container_path = API_PATHS[self.api]
+        url = self.url + '/' + database_path + '/' + item['database']
+        if item.get('container'):
+            url += '/' + container_path + '/' + item['container']
+        url += '/throughputSettings/default'
+        # query sets the request id on headers, don't share them between threads
+        headers = dict(self.header_parameters)
+
+        response = self.mgmt_client.query(url, 'GET', self.query_parameters, headers,
+                                          None, [200], 0, 0)
+        resource = json.loads(response.text).get('properties', {}).get('resource', {})
+        autoscale = resource.get('autoscaleSettings')
+        if autoscale:
+            item['old'] = dict(max_throughput=autoscale.get('maxThroughput'))
+        else:
+            item['old'] = dict(throughput=resource.get('throughput'))
+
+        if item['old'] == item['new']:
+            item['status'] = 'Unchanged'
+            return 0
+        if self.check_mode:
+            return 0
+
+        # switching between manual and autoscale is a separate operation
+        if 'max_throughput' in item['new'] and not autoscale:
+            self.mgmt_client.query(url + '/migrateToAutoscale', 'POST', self.query_parameters, headers,
+                                   None, self.status_code, 600, 10)
+        elif 'throughput' in item['new'] and autoscale:
+            self.mgmt_client.query(url + '/migrateToManualThroughput', 'POST', self.query_parameters, headers,
+                                   None, self.status_code, 600, 10)
+
+        if 'max_throughput' in item['new']:
+            body = dict(properties=dict(resource=dict(autoscaleSettings=dict(maxThroughput=item['new']['max_throughput']))))
+        else:
+            body = dict(properties=dict(resource=dict(throughput=item['new']['throughput'])))
+        self.mgmt_client.query(url, 'PUT', self.query_parameters, headers,
+                               body, self.status_code, 600, 10)
+
+        item['status'] = 'Succeeded'
+        item['elapsed'] = time.time() - start
+        return item['elapsed']
+
+
+def round_up(value, step, minimum):
+    return max(minimum, int(-(-value // step) * step))
+
+
+def format_name(item):
+    if item.get('container'):
+        return '{0}/{1}'.format(item['database'], item['container'])
+    return item['database']
+
+
+def run_concurrently(func, items, max_workers):
+    '''
+    Calls func for every item using a bounded pool of worker threads.
+
+    :return: list of (result, exception) tuples in the same order as items
+    '''
+    def call(item):
+        try:
+            return (func(item), None)
+        except Exception as exc:
+            return (None, exc)
+
+    if not items:
+        return []
+    pool = ThreadPool(max(1, min(max_workers, len(items))))
+    try:
+        return pool.map(call, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    """Main execution"""
+    AzureRMCosmosDBThroughput()
+
+
+if __name__ == '__main__':
+    main()